@@ -0,0 +1,302 @@
+"""
+A module containing the CostModel class.
+
+The weights given to weighted partitioning functions (like WeightBalanced or
+SortedStride) are often crude guesses, such as the size of the file that
+each task reads.  A CostModel records how long each task actually took
+(measured, for example, with a TimeKeeper on each rank), together with a
+few numeric 'features' of the task (such as the file size, or the number of
+time steps), and fits a simple linear model of the duration of a task as a
+function of its features.  The model then predicts the weights of the tasks
+of the next run.
+
+The records are kept in a local file, so that the model improves from one
+run to the next.  A typical use looks like::
+
+    model = CostModel('costs.json')
+    data = model.weights(tasks, features=task_features)
+    part = comm.partition(data, func=WeightBalanced(), involved=True)
+
+    tk = TimeKeeper()
+    for task in part:
+        tk.start(task)
+        run(task)
+        tk.stop(task)
+    model.record_times(tk, dict((t, task_features(t)) for t in part))
+    model.gather(comm)
+    if comm.is_manager():
+        model.save()
+
+Copyright 2015, University Corporation for Atmospheric Research
+See the LICENSE.txt file for details
+"""
+
+import os
+import json
+
+# Try importing the Numpy module (used only for the least-squares fit)
+try:
+    import numpy
+except:
+    numpy = None
+
+
+#==============================================================================
+# CostModel - A persistent model of the duration of each kind of task
+#==============================================================================
+class CostModel(object):
+
+    """
+    A persistent model of the duration of tasks, given their features.
+
+    The records are kept separately for each 'kind' of task, and a separate
+    model is fit for each kind.  The duration of a task is modeled as a
+    linear function of its features (plus a constant), fit by least squares
+    with Numpy.  If the Numpy module is not available, or there are too few
+    records for a least-squares fit, the mean duration of the recorded tasks
+    of the same kind is predicted instead.
+
+    Attributes:
+        filename (str): The name of the file in which the records are kept
+            (or None if the records are kept only in memory)
+        max_records (int): The largest number of records kept for each kind
+            of task (the oldest records are dropped first)
+        _records (dict): The list of (features, duration) records for each
+            kind of task
+        _added (dict): The list of records of each kind of task added since
+            the records were last loaded (or gathered)
+        _fits (dict): The fitted coefficients for each kind of task, or None
+            if the mean duration is predicted
+    """
+
+    def __init__(self, filename=None, max_records=10000):
+        """
+        Constructor.
+
+        If the file exists, the records are loaded from it.
+
+        Keyword Arguments:
+            filename (str): The name of the file in which the records are
+                kept.  If None, the records are kept only in memory.
+            max_records (int): The largest number of records kept for each
+                kind of task
+        """
+        self.filename = filename
+        self.max_records = max_records
+        self._records = {}
+        self._added = {}
+        self._fits = {}
+        if filename is not None and os.path.exists(filename):
+            self.load()
+
+    @staticmethod
+    def _as_features(features):
+        """
+        Convert the features of a task to a list of floats.
+
+        Parameters:
+            features: A number, or a sequence of numbers
+
+        Returns:
+            list: The list of features
+        """
+        if hasattr(features, '__len__'):
+            return [float(x) for x in features]
+        else:
+            return [float(features)]
+
+    def record(self, features, duration, kind='default'):
+        """
+        Record the duration of a task.
+
+        Parameters:
+            features: A number, or a sequence of numbers, describing the task
+            duration (float): The duration of the task, in seconds
+
+        Keyword Arguments:
+            kind (str): The kind of task
+        """
+        record = (self._as_features(features), float(duration))
+        for records in (self._records.setdefault(kind, []),
+                        self._added.setdefault(kind, [])):
+            records.append(record)
+            if len(records) > self.max_records:
+                del records[:len(records) - self.max_records]
+        self._fits.pop(kind, None)
+
+    def record_times(self, timekeeper, features, kind='default'):
+        """
+        Record the durations of tasks timed with a TimeKeeper.
+
+        Parameters:
+            timekeeper: The TimeKeeper object with one timer for each task
+            features (dict): The features of each task, keyed by the name
+                of its timer.  Timers not in this dictionary are ignored.
+
+        Keyword Arguments:
+            kind (str): The kind of the tasks
+        """
+        times = timekeeper.get_all_times()
+        for name in timekeeper.get_names():
+            if name in features:
+                self.record(features[name], times[name], kind=kind)
+
+    def merge(self, records):
+        """
+        Add the records of another CostModel to this one.
+
+        Parameters:
+            records (dict): The list of (features, duration) records for
+                each kind of task, as returned by the get_records method
+        """
+        for kind in records:
+            for (features, duration) in records[kind]:
+                self.record(features, duration, kind=kind)
+
+    def get_records(self):
+        """
+        Returns the records of this CostModel.
+
+        Returns:
+            dict: The list of (features, duration) records for each kind of
+                task
+        """
+        return self._records
+
+    def gather(self, comm, tag=0):
+        """
+        Gather the records from every rank onto the 'manager' rank.
+
+        The records added on each 'worker' rank since its records were
+        loaded (or last gathered) are sent to the 'manager' rank (with the
+        SimpleComm *collect* method) and merged into the model on the
+        'manager' rank.  (The records loaded from the file are already on
+        the 'manager' rank, so they are not sent again.)  This call must be
+        made by all ranks.
+
+        Parameters:
+            comm: The SimpleComm object on which the tasks were run
+
+        Keyword Arguments:
+            tag (int): A user-defined integer tag to uniquely specify the
+                messages sent
+        """
+        if comm.is_manager():
+            for _ in xrange(comm.get_size() - 1):
+                (_, records) = comm.collect(tag=tag)
+                self.merge(records)
+        else:
+            comm.collect(self._added, tag=tag)
+            self._added = {}
+
+    def fit(self, kind='default'):
+        """
+        Fit the model of the duration of one kind of task.
+
+        Parameters:
+            kind (str): The kind of task
+
+        Returns:
+            list: The fitted constant and coefficient of each feature, or
+                None if the mean duration is predicted instead
+        """
+        if kind in self._fits:
+            return self._fits[kind]
+        records = self._records.get(kind, [])
+        coeffs = None
+        nfeatures = len(records[0][0]) if records else 0
+        if numpy is not None and len(records) > nfeatures + 1 and \
+                all(len(f) == nfeatures for (f, _) in records):
+            a = numpy.ones((len(records), nfeatures + 1))
+            a[:, 1:] = [f for (f, _) in records]
+            b = numpy.array([d for (_, d) in records])
+            coeffs = numpy.linalg.lstsq(a, b, rcond=-1)[0].tolist()
+        self._fits[kind] = coeffs
+        return coeffs
+
+    def predict(self, features, kind='default', default=1.0):
+        """
+        Predict the duration of a task.
+
+        Parameters:
+            features: A number, or a sequence of numbers, describing the task
+
+        Keyword Arguments:
+            kind (str): The kind of task
+            default (float): The duration predicted if no task of the same
+                kind has been recorded
+
+        Returns:
+            float: The predicted duration of the task (never negative)
+        """
+        records = self._records.get(kind, [])
+        if not records:
+            return default
+        coeffs = self.fit(kind)
+        features = self._as_features(features)
+        if coeffs is None or len(features) + 1 != len(coeffs):
+            return sum(d for (_, d) in records) / len(records)
+        prediction = coeffs[0] + sum(c * x for (c, x)
+                                     in zip(coeffs[1:], features))
+        return max(prediction, 0.0)
+
+    def weights(self, items, features, kind='default', default=1.0):
+        """
+        Pair each item with its predicted duration, for partitioning.
+
+        The result can be given directly to a weighted partitioning function,
+        like WeightBalanced or SortedStride.
+
+        Parameters:
+            items: A list of items (tasks)
+            features: A function returning the features of an item
+
+        Keyword Arguments:
+            kind (str): The kind of the tasks
+            default (float): The duration predicted if no task of the same
+                kind has been recorded
+
+        Returns:
+            list: A list of (item, predicted duration) pairs
+        """
+        return [(item, self.predict(features(item), kind=kind,
+                                    default=default)) for item in items]
+
+    def load(self, filename=None):
+        """
+        Load the records from a file, replacing the current records.
+
+        Keyword Arguments:
+            filename (str): The name of the file.  If None, the filename
+                attribute is used.
+        """
+        filename = filename or self.filename
+        with open(filename) as f:
+            stored = json.load(f)
+        self._records = {}
+        self._fits = {}
+        self.merge(stored.get('records', {}))
+        self._added = {}
+
+    def save(self, filename=None):
+        """
+        Save the records to a file.
+
+        The records are first written to a temporary file, which then
+        replaces the file, so that the file is never left half-written.
+
+        Keyword Arguments:
+            filename (str): The name of the file.  If None, the filename
+                attribute is used.
+
+        Raises:
+            ValueError: If no filename is given and the filename attribute
+                is None
+        """
+        filename = filename or self.filename
+        if filename is None:
+            raise ValueError('No filename given for the cost model')
+        tmpname = '{0}.{1}.tmp'.format(filename, os.getpid())
+        with open(tmpname, 'w') as f:
+            json.dump({'version': 1, 'records': self._records}, f)
+        os.rename(tmpname, filename)
@@ -0,0 +1,386 @@
+"""
+A module containing a concurrent.futures Executor built on SimpleComm.
+
+The CommExecutor class lets code written against the standard
+'concurrent.futures' interface run its tasks on the 'worker' ranks of a
+SimpleComm communicator.  Every rank creates the CommExecutor together.  On
+the 'worker' ranks, the constructor enters a loop that requests tasks from
+the 'manager' rank (with the SimpleComm *ration* method), runs them, and
+sends the results back (with the SimpleComm *collect* method).  The loop
+ends, and the constructor returns, when the 'manager' rank shuts the
+executor down.  On the 'manager' rank, the constructor returns immediately,
+and the *submit*, *map*, and *shutdown* methods behave as they do for any
+other Executor.  Hence, a typical use looks like::
+
+    with CommExecutor(comm) as executor:
+        if comm.is_manager():
+            results = list(executor.map(func, data, chunksize=10))
+
+On the 'manager' rank, a background thread hands the submitted tasks out
+to the 'worker' ranks and completes the Futures as the results arrive, so
+the 'concurrent.futures.as_completed' and 'concurrent.futures.wait'
+functions work as expected.
+
+If the communicator is serial (or has only 1 rank), there are no 'worker'
+ranks, and the tasks are run on a local ThreadPoolExecutor instead.
+
+As with any other message sent with SimpleComm, the submitted functions and
+their arguments must be picklable.  Each task is pickled on the 'manager'
+rank before it is handed out, and each result (or exception) is pickled on
+the 'worker' rank before it is sent back, so a task that cannot be pickled,
+or whose result or exception cannot be pickled, fails only its own Future.
+If the background thread on the 'manager' rank fails, every pending Future
+fails with the same exception, and the 'worker' ranks are dismissed.
+
+Copyright 2015, University Corporation for Atmospheric Research
+See the LICENSE.txt file for details
+"""
+
+import sys
+import threading
+import cPickle as pickle
+
+from time import sleep
+from itertools import izip
+from collections import deque
+
+try:
+    from concurrent import futures
+except:
+    err_msg = 'The concurrent.futures module could not be found.'
+    raise ImportError(err_msg)
+
+
+def _apply_chunk(fn, chunk):
+    """
+    Apply a function to each tuple of arguments in a chunk.
+
+    Parameters:
+        fn: The function to apply
+        chunk (list): A list of tuples of positional arguments
+
+    Returns:
+        list: The results of the function applied to each tuple of arguments
+    """
+    return [fn(*args) for args in chunk]
+
+
+def _chunks(iterables, chunksize):
+    """
+    Group the zipped arguments of a map call into lists of a given size.
+
+    Parameters:
+        iterables (tuple): The iterables passed to the map call
+        chunksize (int): The number of argument tuples in each chunk
+
+    Returns:
+        A generator yielding lists of argument tuples
+    """
+    chunk = []
+    for args in izip(*iterables):
+        chunk.append(args)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+#==============================================================================
+# CommExecutor - concurrent.futures Executor running on a SimpleComm
+#==============================================================================
+class CommExecutor(futures.Executor):
+
+    """
+    An Executor that runs submitted tasks on the 'worker' ranks of a SimpleComm.
+
+    Attributes:
+        _comm: The SimpleComm object on which the tasks are run
+        _tag (int): The user-defined tag used for all messages
+        _pool: The local ThreadPoolExecutor used for serial communicators
+        _queue (deque): The submitted (Future, fn, args, kwargs) tuples that
+            have not yet been handed out
+        _running (dict): The Futures of the tasks handed out to 'worker'
+            ranks, keyed by task ID
+        _dismissed (int): The number of 'worker' ranks dismissed
+        _next_id (int): The ID of the next task handed out
+        _shutdown (bool): Whether the executor has been shut down
+        _lock: The lock protecting the task queue and shutdown flag
+        _thread: The background thread on the 'manager' rank
+    """
+
+    def __init__(self, comm, max_workers=None, tag=0):
+        """
+        Constructor.
+
+        On 'worker' ranks, this runs the tasks sent by the 'manager' rank,
+        and it does not return until the 'manager' rank shuts down the
+        executor.
+
+        Parameters:
+            comm: The SimpleComm object on which to run the tasks
+
+        Keyword Arguments:
+            max_workers (int): The number of threads in the local pool used
+                if the communicator has only 1 rank.  (Ignored otherwise.)
+                If None, the ThreadPoolExecutor default is used (5 times
+                the number of processors, with the futures package).
+            tag (int): A user-defined integer tag to uniquely specify the
+                messages sent by this executor
+        """
+        self._comm = comm
+        self._tag = tag
+        self._pool = None
+        self._queue = deque()
+        self._running = {}
+        self._dismissed = 0
+        self._next_id = 0
+        self._shutdown = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+        if comm.get_size() == 1:
+            self._pool = futures.ThreadPoolExecutor(max_workers)
+        elif comm.is_manager():
+            self._thread = threading.Thread(target=self._manage)
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self._work()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Submit a callable to be executed with the given arguments.
+
+        This call can only be made on the 'manager' rank.
+
+        Parameters:
+            fn: The callable to execute
+
+        Returns:
+            Future: A Future representing the execution of the callable
+
+        Raises:
+            RuntimeError: If called on a 'worker' rank or after shutdown
+        """
+        if self._pool is not None:
+            return self._pool.submit(fn, *args, **kwargs)
+        if not self._comm.is_manager():
+            err_msg = 'Tasks can only be submitted on the manager rank'
+            raise RuntimeError(err_msg)
+        with self._lock:
+            if self._shutdown:
+                err_msg = 'Cannot submit new tasks after shutdown'
+                raise RuntimeError(err_msg)
+            future = futures.Future()
+            self._queue.append((future, fn, args, kwargs))
+        return future
+
+    def map(self, fn, *iterables, **kwargs):
+        """
+        Return an iterator equivalent to map(fn, *iterables).
+
+        The arguments are grouped into chunks, and each chunk is sent to a
+        'worker' rank as a single task, which reduces the number of messages
+        for large numbers of short tasks.
+
+        Parameters:
+            fn: The callable to apply to each tuple of arguments
+
+        Keyword Arguments:
+            timeout (float): The largest number of seconds, from the time
+                of this call, to wait for the results.  If None, there is
+                no limit.
+            chunksize (int): The number of argument tuples in each chunk
+
+        Returns:
+            An iterator over the results, in the order of the arguments
+
+        Raises:
+            ValueError: If the chunk size is less than 1
+            TimeoutError: If a result is not available within the timeout
+        """
+        timeout = kwargs.get('timeout', None)
+        chunksize = kwargs.get('chunksize', 1)
+        if chunksize < 1:
+            raise ValueError('Chunk size must be at least 1')
+        chunks = list(_chunks(iterables, chunksize))
+        chunk_results = super(CommExecutor, self).map(
+            _apply_chunk, [fn] * len(chunks), chunks, timeout=timeout)
+        return (result for chunk in chunk_results for result in chunk)
+
+    def shutdown(self, wait=True):
+        """
+        Signal the executor to free its resources when the tasks are done.
+
+        On the 'manager' rank, the 'worker' ranks are dismissed as soon as
+        all submitted tasks have finished.
+
+        Keyword Arguments:
+            wait (bool): If True, do not return until all submitted tasks
+                have finished and the 'worker' ranks have been dismissed
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            return
+        with self._lock:
+            self._shutdown = True
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def _manage(self):
+        """
+        Hand out tasks and collect results on the 'manager' rank.
+
+        This runs in a background thread until the executor is shut down and
+        all tasks have finished, and then dismisses every 'worker' rank by
+        rationing it False.  If anything fails, every pending Future fails
+        with the same exception, and the 'worker' ranks are dismissed.
+        """
+        try:
+            self._serve()
+        except BaseException:
+            exc = sys.exc_info()[1]
+            with self._lock:
+                self._shutdown = True
+                queued = [f for (f, _, _, _) in self._queue]
+                running = self._running.values()
+                self._queue.clear()
+                self._running.clear()
+            for future in queued:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+            for future in running:
+                future.set_exception(exc)
+            self._dismiss()
+
+    def _serve(self):
+        """
+        Answer the requests and collect the results of the 'worker' ranks.
+
+        Returns when the executor has been shut down, all tasks have
+        finished, and every 'worker' rank has been dismissed.
+        """
+        comm = self._comm
+        mpicomm = comm._comm
+        req_tag = comm._tag_offset(comm.RATN_TAG, comm.REQ_TAG, self._tag)
+        msg_tag = comm._tag_offset(comm.CLCT_TAG, comm.MSG_TAG, self._tag)
+        source = comm._mpi.ANY_SOURCE
+        while self._dismissed < comm.get_size() - 1:
+            idle = True
+
+            # Collect any finished results and complete their Futures
+            if mpicomm.Iprobe(source=source, tag=msg_tag):
+                idle = False
+                _, (task_id, reply) = comm.collect(tag=self._tag)
+                future = self._running.pop(task_id)
+                try:
+                    ok, result = pickle.loads(reply)
+                except BaseException:
+                    future.set_exception(sys.exc_info()[1])
+                else:
+                    if ok:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(result)
+
+            # Answer a request for work with a task or a dismissal
+            if mpicomm.Iprobe(source=source, tag=req_tag):
+                task = self._next_task()
+                if task is not None:
+                    idle = False
+                    comm.ration(task, tag=self._tag)
+                elif self._shutdown and not self._queue and \
+                        not self._running:
+                    idle = False
+                    comm.ration(False, tag=self._tag)
+                    self._dismissed += 1
+
+            if idle:
+                sleep(0.001)
+
+    def _dismiss(self):
+        """
+        Dismiss the remaining 'worker' ranks after a failure.
+
+        Any results still sent by the 'worker' ranks are received and
+        discarded, and each request for work is answered with a dismissal.
+        If this fails too, the remaining 'worker' ranks cannot be reached,
+        and nothing more is done.
+        """
+        comm = self._comm
+        mpicomm = comm._comm
+        req_tag = comm._tag_offset(comm.RATN_TAG, comm.REQ_TAG, self._tag)
+        msg_tag = comm._tag_offset(comm.CLCT_TAG, comm.MSG_TAG, self._tag)
+        source = comm._mpi.ANY_SOURCE
+        try:
+            while self._dismissed < comm.get_size() - 1:
+                idle = True
+                if mpicomm.Iprobe(source=source, tag=msg_tag):
+                    idle = False
+                    comm.collect(tag=self._tag)
+                if mpicomm.Iprobe(source=source, tag=req_tag):
+                    idle = False
+                    comm.ration(False, tag=self._tag)
+                    self._dismissed += 1
+                if idle:
+                    sleep(0.001)
+        except BaseException:
+            pass
+
+    def _next_task(self):
+        """
+        Get the next task that has not been cancelled.
+
+        Each task is pickled before it is handed out.  If a task cannot be
+        pickled, its Future fails with the pickling error, and the next task
+        is taken instead.
+
+        Returns:
+            tuple: A (task ID, pickled (fn, args, kwargs) tuple) tuple, or
+                None if there are no more tasks in the queue
+        """
+        with self._lock:
+            while self._queue:
+                future, fn, args, kwargs = self._queue.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    task = pickle.dumps((fn, args, kwargs),
+                                        pickle.HIGHEST_PROTOCOL)
+                except BaseException:
+                    future.set_exception(sys.exc_info()[1])
+                    continue
+                task_id = self._next_id
+                self._next_id += 1
+                self._running[task_id] = future
+                return (task_id, task)
+        return None
+
+    def _work(self):
+        """
+        Run the tasks handed out by the 'manager' rank on a 'worker' rank.
+
+        The result (or exception) of each task is pickled before it is sent
+        back.  If it cannot be pickled, a RuntimeError describing it is sent
+        back instead.
+        """
+        while True:
+            task = self._comm.ration(tag=self._tag)
+            if task is False:
+                break
+            task_id, task = task
+            try:
+                fn, args, kwargs = pickle.loads(task)
+                reply = (True, fn(*args, **kwargs))
+            except BaseException:
+                reply = (False, sys.exc_info()[1])
+            try:
+                reply = pickle.dumps(reply, pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                err_msg = 'Task {0} could not be pickled: {1!r}'.format(
+                    'result' if reply[0] else 'exception', reply[1])
+                reply = pickle.dumps((False, RuntimeError(err_msg)),
+                                     pickle.HIGHEST_PROTOCOL)
+            self._comm.collect((task_id, reply), tag=self._tag)
+        self._shutdown = True
@@ -10,12 +10,99 @@ function is to return a subset of the data corresponding to the given index.
 By design, partitioning functions should keep the data "unchanged" except for
 subselecting parts of the data.
 
+Every PartitionFunction object also has a *plan* method that takes the data
+and the number of partitions, and returns the list of all of the parts at
+once.  Since many partitioning algorithms (like sorting the data, or
+greedily assigning weighted items to partitions) must do the same work no
+matter which part is requested, computing all of the parts in a single pass
+is much cheaper than calling the function once per part.
+
+Every PartitionFunction object also has an *indices* method that computes
+only the positions of the items in each part (as a slice object, or as a
+list or Numpy NDArray of integer positions), and a *select* method that
+takes the parts from the data, one at a time, given their positions.  This
+allows the parts to be sent (or used) directly from the original data,
+without first building all of the parts in memory.
+
+The *evaluate* function measures how well a partitioning function would
+balance some data (the number of items and total weight of each part, the
+imbalance, and the predicted makespan) without running anything, and the
+*compare* function ranks several partitioning functions on the same data.
+
+The data given to a partitioning function may also be a mapping (like a
+dict of {name: metadata}).  A mapping is partitioned by its keys, in a
+stable order (sorted, unless the mapping is an OrderedDict), and each part
+is an OrderedDict of the keys in that part to their values, in that order.  If every value of
+the mapping is a number, weighted partitioning functions use the values as
+the weights of the keys (otherwise, each key has a weight of 1).
+
+Any partitioning function can be wrapped in a *Cached* object, which
+remembers the parts computed for each data (identified by a fingerprint of
+the data) and number of partitions, in memory and, optionally, on disk.
+
 Copyright 2015, University Corporation for Atmospheric Research
 See the LICENSE.txt file for details
 """
 
 from abc import ABCMeta, abstractmethod
 from operator import itemgetter
+from heapq import heapify, heappush, heappop, heapreplace
+from bisect import bisect_left, bisect_right, insort
+from time import time
+from zlib import crc32
+from numbers import Integral, Number
+from hashlib import md5
+from cPickle import dump, dumps, load, HIGHEST_PROTOCOL
+from collections import OrderedDict, Mapping
+from functools import wraps
+from inspect import getargspec
+import os
+
+# Try importing the Numpy module (used only for optional fast paths)
+try:
+    import numpy
+except:
+    numpy = None
+
+
+#==============================================================================
+# _accepts_mappings - Let a partitioning method take a mapping as its data
+#==============================================================================
+def _accepts_mappings(method):
+    """
+    Decorate a method of a PartitionFunction so that it accepts mappings.
+
+    The __call__, plan, and indices methods are applied to the keys of the
+    mapping (or the (key, value) pairs, for weighted partitioning functions
+    and numeric values), as given by the _mapping_items method.  The parts
+    returned by the __call__ and plan methods are then converted back into
+    mappings of their keys, and the select method takes these mappings
+    directly from the original data.
+
+    Parameters:
+        method: The __call__, plan, indices, or select method
+
+    Returns:
+        The decorated method
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, data, *args, **kwargs):
+        if not PartitionFunction._is_mapping(data):
+            return method(self, data, *args, **kwargs)
+        if name == 'select':
+            return PartitionFunction._select_mapping(data, *args, **kwargs)
+        result = method(self, self._mapping_items(data), *args, **kwargs)
+        if name == '__call__':
+            return PartitionFunction._submapping(data, result)
+        elif name == 'plan':
+            return [PartitionFunction._submapping(data, part)
+                    for part in result]
+        else:
+            return result
+
+    return wrapper
 
 
 #==============================================================================
@@ -32,9 +119,48 @@ class PartitionFunction(object):
     second argument is the index of the partition (or part) requested, and 
     third argument is the number of partitions to assume when dividing
     the data.
+
+    A PartitionFunction object also has a plan method that takes two
+    arguments, the data and the number of partitions, and returns a list of
+    all of the parts.  The part at index i of this list is the same as the
+    part returned by the __call__ method with index i.
+
+    A PartitionFunction object may also have an indices method that takes
+    the same arguments as the plan method, but returns only the positions of
+    the items of each part, and a select method that takes the parts from
+    the data given their positions.
+
+    If the data is a mapping, the keys are partitioned (see _mapping_items),
+    and each part is a mapping of its keys to their values.  The positions
+    returned by the indices method are then the positions of the keys in
+    the stable order given by _mapping_keys.
     """
     __metaclass__ = ABCMeta
 
+    # Whether the parts are taken from the items of (item, weight) pairs
+    _WEIGHTED = False
+
+    @staticmethod
+    def _check_size(size):
+        """
+        Check the type and value of the size argument.
+
+        Parameters:
+            size (int): The number of partitions to make
+
+        Raises:
+            TypeError: The size argument is not an int
+            IndexError: The size argument is less than 1
+        """
+
+        # Check the type of the size
+        if type(size) is not int:
+            raise TypeError('Partition size must be an integer')
+
+        # Check the value of size
+        if size < 1:
+            raise IndexError('Partition size less than 1 is invalid')
+
     @staticmethod
     def _check_types(data, index, size):
         """
@@ -67,6 +193,35 @@ class PartitionFunction(object):
         if size < 1:
             raise IndexError('Partition size less than 1 is invalid')
 
+    @staticmethod
+    def _capacity_list(capacities, size):
+        """
+        Check the per-partition capacities against the number of partitions.
+
+        Parameters:
+            capacities: A sequence of positive numbers, one for each
+                partition, or None if all partitions are identical
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The capacity of each partition, or None if all partitions
+                are identical
+
+        Raises:
+            ValueError: If the number of capacities is not the number of
+                partitions, or any capacity is not positive
+        """
+        if capacities is None:
+            return None
+        capacities = list(capacities)
+        if len(capacities) != size:
+            err_msg = ('Capacities given for {0} partitions, but {1} '
+                       'partitions requested').format(len(capacities), size)
+            raise ValueError(err_msg)
+        if any(c <= 0 for c in capacities):
+            raise ValueError('Partition capacities must be positive')
+        return capacities
+
     @staticmethod
     def _is_indexable(data):
         """
@@ -83,6 +238,113 @@ class PartitionFunction(object):
         else:
             return False
 
+    @staticmethod
+    def _is_mapping(data):
+        """
+        Check if the data object is a mapping (like a dict).
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            bool: True, if data is a mapping. False, otherwise.
+        """
+        return isinstance(data, Mapping)
+
+    @staticmethod
+    def _mapping_keys(data):
+        """
+        Get the keys of a mapping in a stable order.
+
+        The keys of an OrderedDict keep their order.  The keys of any other
+        mapping are sorted, so that the order is the same in every process
+        (and every run), no matter how the mapping was built.
+
+        Parameters:
+            data: A mapping
+
+        Returns:
+            list: The keys of the mapping
+        """
+        if isinstance(data, OrderedDict):
+            return list(data.keys())
+        try:
+            return sorted(data.keys())
+        except TypeError:
+            return sorted(data.keys(), key=repr)
+
+    @staticmethod
+    def _mapping_weights(data):
+        """
+        Get the weights of the keys of a mapping with numeric values.
+
+        Parameters:
+            data: A mapping
+
+        Returns:
+            list: The values of the mapping, in the order of its keys (see
+                _mapping_keys), if every value is a number.  None, otherwise.
+        """
+        keys = PartitionFunction._mapping_keys(data)
+        values = [data[k] for k in keys]
+        if values and all(isinstance(v, Number) and not isinstance(v, bool)
+                          for v in values):
+            return values
+        else:
+            return None
+
+    def _mapping_items(self, data):
+        """
+        Get the items to partition in place of a mapping.
+
+        Parameters:
+            data: A mapping
+
+        Returns:
+            list: The list of keys, in a stable order (see _mapping_keys), if
+                the partitioning function is not weighted.  Otherwise, a
+                list of (key, weight) pairs, where the weight of each key is
+                its value, if every value is a number, or 1.
+        """
+        keys = self._mapping_keys(data)
+        if not self._WEIGHTED:
+            return keys
+        weights = self._mapping_weights(data) or [1] * len(keys)
+        return zip(keys, weights)
+
+    @staticmethod
+    def _submapping(data, keys):
+        """
+        Build the part of a mapping with the given keys.
+
+        Parameters:
+            data: A mapping
+            keys: The keys of the part
+
+        Returns:
+            OrderedDict: The part, with its keys in the given order (so that
+                the part iterates in the same order as its positions)
+        """
+        return OrderedDict((k, data[k]) for k in keys)
+
+    @staticmethod
+    def _select_mapping(data, indices):
+        """
+        Take the parts of a mapping given the positions of their keys.
+
+        Parameters:
+            data: A mapping
+            indices (list): The positions of the keys of each part, in the
+                order given by _mapping_keys
+
+        Returns:
+            An iterator over the parts of the mapping, in index order
+        """
+        keys = PartitionFunction._mapping_keys(data)
+        for index in indices:
+            yield PartitionFunction._submapping(
+                data, PartitionFunction._select(keys, index))
+
     @staticmethod
     def _are_pairs(data):
         """
@@ -95,12 +357,192 @@ class PartitionFunction(object):
             bool: True, if data is an indexable list of pairs.
                 False, otherwise.
         """
-        if PartitionFunction._is_indexable(data):
-            return all(map(lambda i: PartitionFunction._is_indexable(i)
-                           and len(i) == 2, data))
+        if PartitionFunction._is_ndarray(data) and data.dtype != object:
+            return data.ndim >= 2 and data.shape[1] == 2
+        elif PartitionFunction._is_indexable(data):
+            return all(hasattr(i, '__len__') and hasattr(i, '__getitem__')
+                       and len(i) == 2 for i in data)
         else:
             return False
 
+    @staticmethod
+    def _is_ndarray(data):
+        """
+        Check if the data object is a Numpy NDArray.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            bool: True, if data is a Numpy NDArray.  False otherwise, or if
+                the Numpy module could not be imported.
+        """
+        return numpy is not None and isinstance(data, numpy.ndarray)
+
+    @staticmethod
+    def _are_items_and_weights(data):
+        """
+        Check if the data object is a tuple of separate items and weights.
+
+        The items may be any indexable object, but the weights must be a
+        1D Numpy NDArray of the same length as the items.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            bool: True, if data is an (items, weights) tuple.
+                False, otherwise.
+        """
+        return (type(data) is tuple and len(data) == 2 and
+                PartitionFunction._is_ndarray(data[1]) and
+                data[1].ndim == 1 and
+                PartitionFunction._is_indexable(data[0]) and
+                len(data[0]) == len(data[1]))
+
+    @staticmethod
+    def _take(items, indices):
+        """
+        Select items from an indexable object by a list of indices.
+
+        Parameters:
+            items: An indexable object
+            indices: A list (or Numpy NDArray) of integer indices
+
+        Returns:
+            A Numpy NDArray, if the items are a Numpy NDArray.  A list,
+            otherwise.
+        """
+        if PartitionFunction._is_ndarray(items):
+            return items[indices]
+        else:
+            return [items[i] for i in indices]
+
+    @staticmethod
+    def _weights_of(data):
+        """
+        Get the weights of weighted data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            The list (or Numpy NDArray) of weights, if the data is a list (or
+            Numpy NDArray) of (item, weight) pairs or an (items, weights)
+            tuple.  None, otherwise.
+        """
+        if PartitionFunction._are_items_and_weights(data):
+            return data[1]
+        elif PartitionFunction._is_ndarray(data) and \
+                PartitionFunction._are_pairs(data):
+            return data[:, 1]
+        elif PartitionFunction._are_pairs(data):
+            return [pair[1] for pair in data]
+        else:
+            return None
+
+    @staticmethod
+    def _positions(data):
+        """
+        Get the positions of the items of the data.
+
+        Parameters:
+            data: The data to be partitioned (or its list of weights)
+
+        Returns:
+            A Numpy NDArray of the integer positions of the items, if the
+            data is a Numpy NDArray.  A list, otherwise.
+        """
+        if PartitionFunction._is_ndarray(data):
+            return numpy.arange(len(data))
+        else:
+            return range(len(data))
+
+    @staticmethod
+    def _select(data, index):
+        """
+        Take a part of the data given the positions of its items.
+
+        Parameters:
+            data: An indexable object
+            index: A slice (or tuple of slices), or a list (or Numpy
+                NDArray) of integer positions
+
+        Returns:
+            The part of the data
+        """
+        if isinstance(index, (slice, tuple)):
+            return data[index]
+        else:
+            return PartitionFunction._take(data, index)
+
+    @staticmethod
+    def _select_items(data, index):
+        """
+        Take a part of the items of weighted data given their positions.
+
+        Parameters:
+            data: A list (or Numpy NDArray) of (item, weight) pairs, or an
+                (items, weights) tuple
+            index: A slice, or a list (or Numpy NDArray) of integer positions
+
+        Returns:
+            The part of the items (without their weights)
+        """
+        if type(data) is tuple:
+            return PartitionFunction._select(data[0], index)
+        elif PartitionFunction._is_ndarray(data):
+            return data[index, 0]
+        else:
+            return [pair[0] for pair in PartitionFunction._select(data, index)]
+
+    @staticmethod
+    def _group(items, order, bins, size):
+        """
+        Group the items into partitions, given the partition of each item.
+
+        Within each partition, the items keep the order in which they
+        were assigned.
+
+        Parameters:
+            items: The indexable items
+            order: The indices of the items, in the order they were assigned
+            bins (list): The partition index assigned to each item in order
+            size (int): The number of partitions
+
+        Returns:
+            list: The list of all size parts of the items
+        """
+        if PartitionFunction._is_ndarray(order):
+            bins = numpy.asarray(bins, dtype=int)
+            grouped = order[numpy.argsort(bins, kind='mergesort')]
+            ends = numpy.cumsum(numpy.bincount(bins, minlength=size))
+            begs = ends - numpy.bincount(bins, minlength=size)
+            return [PartitionFunction._take(items, grouped[b:e])
+                    for (b, e) in zip(begs, ends)]
+        else:
+            partitions = [[] for _ in xrange(size)]
+            for (i, k) in zip(order, bins):
+                partitions[k].append(items[i])
+            return partitions
+
+    def _item_weights(self, data):
+        """
+        Get the weights of the items of the data, as this function reads them.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            The list (or Numpy NDArray) of the weight of each item (in the
+            order of the positions returned by the indices method), or None
+            if the data is not weighted
+        """
+        if self._is_mapping(data):
+            return self._mapping_weights(data)
+        else:
+            return self._weights_of(data)
+
     @abstractmethod
     def __call__(self):
         """
@@ -108,6 +550,78 @@ class PartitionFunction(object):
         """
         return
 
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        By default, this calls the partition function once for each part.
+        Subclasses override this to avoid repeating work for each part.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+        return [self(data, index=i, size=size) for i in xrange(size)]
+
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        For each part, this returns a slice object (with an explicit start,
+        stop, and step), a tuple of slice objects (one for each axis of a
+        Numpy NDArray), or a list (or Numpy NDArray) of the integer positions
+        of the items of the part in the data.  (For a list of (item, weight)
+        pairs, these are the positions of the pairs.)  The parts can then be
+        taken from the data, one at a time, with the select method.
+
+        By default, this returns None, meaning that the positions cannot be
+        computed, and the parts must be computed with the plan method.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if they cannot be computed
+        """
+        self._check_size(size)
+        return None
+
+    @_accepts_mappings
+    def select(self, data, indices):
+        """
+        Take the parts of the data given the positions of their items.
+
+        The parts are taken one at a time, as they are needed, and are views
+        of the data wherever possible (i.e., for slices of a Numpy NDArray).
+        Each part is the same as the part (with the same index) returned by
+        the plan method.
+
+        Parameters:
+            data: The data to be partitioned
+            indices (list): The positions of the items of each part, as
+                returned by the indices method
+
+        Returns:
+            An iterator over the parts of the data, in index order
+        """
+        weighted = self._WEIGHTED and \
+            (self._are_items_and_weights(data) or self._are_pairs(data))
+        for index in indices:
+            if weighted:
+                yield self._select_items(data, index)
+            else:
+                yield self._select(data, index)
+
 
 #==============================================================================
 # Duplicate Partitioning Function -
@@ -141,6 +655,45 @@ class Duplicate(PartitionFunction):
 
         return data
 
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        return [data] * size
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        if self._is_indexable(data):
+            return [slice(0, len(data), 1)] * size
+        else:
+            return None
+
 
 #==============================================================================
 # EqualLength Partitioning Function -
@@ -156,8 +709,28 @@ class EqualLength(PartitionFunction):
     data, then it will return an empty list for 'empty' partitions.  If the 
     data is not indexable, then it will return the data for index=0 only, and 
     an empty list otherwise.  
+
+    If capacities are given (for example, the relative speeds of the ranks
+    that will receive the partitions), the length of each sublist is
+    instead in proportion to the capacity of its partition.
+
+    Attributes:
+        capacities (list): The capacity of each partition (or None if all
+            partitions are identical)
     """
 
+    def __init__(self, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            capacities (list): The capacity of each partition, such as the
+                relative speed of the rank that receives it.  If None, all
+                partitions are identical.
+        """
+        self.capacities = capacities
+
+    @_accepts_mappings
     def __call__(self, data, index=0, size=1):
         """
         Define the common interface for all partitioning functions.
@@ -179,10 +752,7 @@ class EqualLength(PartitionFunction):
         self._check_types(data, index, size)
 
         if self._is_indexable(data):
-            (lenpart, remdata) = divmod(len(data), size)
-            psizes = [lenpart] * size
-            for i in xrange(remdata):
-                psizes[i] += 1
+            psizes = self._lengths(len(data), size)
             ibeg = 0
             for i in xrange(index):
                 ibeg += psizes[i]
@@ -194,9 +764,91 @@ class EqualLength(PartitionFunction):
             else:
                 return []
 
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
 
-#==============================================================================
-# EqualStride Partitioning Function -
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if self._is_indexable(data):
+            parts = []
+            ibeg = 0
+            for lenpart in self._lengths(len(data), size):
+                iend = ibeg + lenpart
+                parts.append(data[ibeg:iend])
+                ibeg = iend
+            return parts
+        else:
+            return [[data]] + [[] for _ in xrange(size - 1)]
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The slice of the data for each of the size parts, in index
+                order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return None
+        slices = []
+        ibeg = 0
+        for lenpart in self._lengths(len(data), size):
+            iend = ibeg + lenpart
+            slices.append(slice(ibeg, iend, 1))
+            ibeg = iend
+        return slices
+
+    def _lengths(self, length, size):
+        """
+        Compute the length of each partition.
+
+        The lengths are in proportion to the capacities, rounded by giving
+        the leftover items to the partitions with the largest remainders
+        (the lowest index, in case of a tie).  Without capacities, the first
+        partitions are one item longer than the rest, if needed.
+
+        Parameters:
+            length (int): The number of items to partition
+            size (int): The number of partitions
+
+        Returns:
+            list: The length of each partition, in index order
+        """
+        capacities = self._capacity_list(self.capacities, size)
+        if capacities is None:
+            capacities = [1] * size
+        total = float(sum(capacities))
+        quotas = [length * c / total for c in capacities]
+        lengths = [int(q) for q in quotas]
+        remainders = sorted(xrange(size),
+                            key=lambda i: lengths[i] - quotas[i])
+        for i in remainders[:length - sum(lengths)]:
+            lengths[i] += 1
+        return lengths
+
+
+#==============================================================================
+# EqualStride Partitioning Function -
 # Grab parts of a list-like object with equal lengths
 #==============================================================================
 class EqualStride(PartitionFunction):
@@ -211,6 +863,7 @@ class EqualStride(PartitionFunction):
     return the data for index=0 only, and an empty list otherwise.
     """
 
+    @_accepts_mappings
     def __call__(self, data, index=0, size=1):
         """
         Define the common interface for all partitioning functions.
@@ -242,6 +895,49 @@ class EqualStride(PartitionFunction):
             else:
                 return []
 
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if self._is_indexable(data):
+            return [data[i::size] if i < len(data) else []
+                    for i in xrange(size)]
+        else:
+            return [[data]] + [[] for _ in xrange(size - 1)]
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The slice of the data for each of the size parts, in index
+                order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return None
+        return [slice(i, max(i, len(data)), size) for i in xrange(size)]
+
 
 #==============================================================================
 # SortedStride PartitionFunction -
@@ -261,6 +957,9 @@ class SortedStride(PartitionFunction):
     total weight.  However, equal length is prioritized over total weight.
     """
 
+    _WEIGHTED = True
+
+    @_accepts_mappings
     def __call__(self, data, index=0, size=1):
         """
         Define the common interface for all partitioning functions.
@@ -281,12 +980,60 @@ class SortedStride(PartitionFunction):
         """
         self._check_types(data, index, size)
 
-        if self._are_pairs(data):
-            subdata = [q[0] for q in sorted(data, key=itemgetter(1))]
-            return EqualStride()(subdata, index=index, size=size)
+        if self._weights_of(data) is not None:
+            return self.plan(data, size=size)[index]
         else:
             return EqualStride()(data, index=index, size=size)
 
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        The data is sorted only once for all of the parts.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if self._weights_of(data) is not None:
+            return list(self.select(data, self.indices(data, size=size)))
+        else:
+            return EqualStride().plan(data, size=size)
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        weights = self._weights_of(data)
+        if weights is None:
+            return EqualStride().indices(data, size=size)
+        if self._is_ndarray(weights):
+            order = numpy.argsort(weights, kind='mergesort')
+        else:
+            order = sorted(xrange(len(weights)), key=weights.__getitem__)
+        return [order[i::size] for i in xrange(size)]
+
 
 #==============================================================================
 # WeightBalanced PartitionFunction -
@@ -306,8 +1053,57 @@ class WeightBalanced(PartitionFunction):
     The results are partitions of roughly equal length and roughly equal
     total weight.  However, equal total weight is prioritized over length.
 
+    The items are taken in order of decreasing weight, and each is put into
+    the partition with the smallest total weight so far (the lowest index,
+    in case of a tie).  The lightest partition is found with a heap, so
+    the binning takes O(N log P) time for N items and P partitions.
+
+    Instead of a list of pairs, the data can also be a tuple of the items
+    and a separate 1D Numpy NDArray of weights, in which case the sorting
+    and grouping are done with Numpy.  (A 2D Numpy NDArray with 2 columns
+    is treated as an array of pairs in the same way.)  If the items are a
+    Numpy NDArray, each partition is returned as a Numpy NDArray.
+
+    If a time limit is given, the greedy partitions are improved with a
+    local search that moves (or swaps) items between the heaviest and
+    lightest partitions until no move helps or the time limit is reached.
+    After each call, the total weight of the heaviest partition (i.e., the
+    'makespan') is stored in the *makespan* attribute.
+
+    If capacities are given (for example, the relative speeds of the ranks
+    that will receive the partitions), each item is instead put into the
+    partition that would finish it first, i.e., the partition for which the
+    total weight (including the item) divided by its capacity is smallest.
+    This takes O(N P) time, and no local search is done.  The makespan is
+    then the largest total weight divided by its capacity.
+
+    Attributes:
+        time_limit (float): The largest number of seconds spent improving
+            the partitions with local search (or None for no local search)
+        capacities (list): The capacity of each partition (or None if all
+            partitions are identical)
+        makespan: The total weight of the heaviest partition from the last
+            call (or None if the data had no weights)
     """
 
+    _WEIGHTED = True
+
+    def __init__(self, time_limit=None, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            time_limit (float): The largest number of seconds to spend
+                improving the partitions with local search.  If None, no
+                local search is done.
+            capacities (list): The capacity of each partition, such as the
+                relative speed of the rank that receives it.  If None, all
+                partitions are identical.
+        """
+        self.time_limit = time_limit
+        self.capacities = capacities
+        self.makespan = None
+
     def __call__(self, data, index=0, size=1):
         """
         Define the common interface for all partitioning functions.
@@ -328,15 +1124,3198 @@ class WeightBalanced(PartitionFunction):
         """
         self._check_types(data, index, size)
 
-        if self._are_pairs(data):
-            sorted_pairs = sorted(data, key=itemgetter(1), reverse=True)
-            partition = []
-            weights = [0] * size
-            for (item, weight) in sorted_pairs:
-                k = min(enumerate(weights), key=itemgetter(1))[0]
-                if k == index:
-                    partition.append(item)
-                weights[k] += weight
-            return partition
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        The greedy binning is done only once, filling all of the parts.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if self._weights_of(data) is not None:
+            return list(self.select(data, self.indices(data, size=size)))
         else:
-            return EqualStride()(data, index=index, size=size)
+            self.makespan = None
+            return EqualStride().plan(data, size=size)
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        weights = self._weights_of(data)
+        if weights is None:
+            self.makespan = None
+            return EqualStride().indices(data, size=size)
+
+        order = self._sort_descending(weights)
+        if self._is_ndarray(weights):
+            sorted_weights = weights[order].tolist()
+        else:
+            sorted_weights = [weights[i] for i in order]
+        capacities = self._capacity_list(self.capacities, size)
+        if capacities is None:
+            bins = self._bins(sorted_weights, size)
+            if self.time_limit is not None:
+                bins = self._improve(
+                    sorted_weights, bins, size, self.time_limit)
+            self.makespan = max(self._loads(sorted_weights, bins, size))
+        else:
+            bins = self._capacity_bins(sorted_weights, capacities)
+            loads = self._loads(sorted_weights, bins, size)
+            self.makespan = max(float(l) / c
+                                for (l, c) in zip(loads, capacities))
+        return self._group(self._positions(weights), order, bins, size)
+
+    def _bins(self, weights, size):
+        """
+        Assign each weight to a partition.
+
+        Subclasses override this method to use a different binning algorithm.
+
+        Parameters:
+            weights (list): The weights, in order from largest to smallest
+            size (int): The number of partitions
+
+        Returns:
+            list: The partition index assigned to each weight
+        """
+        return self._greedy_bins(weights, size)
+
+    @staticmethod
+    def _loads(weights, bins, size):
+        """
+        Compute the total weight of each partition.
+
+        Parameters:
+            weights (list): The weights
+            bins (list): The partition index assigned to each weight
+            size (int): The number of partitions
+
+        Returns:
+            list: The total weight of each partition
+        """
+        loads = [0] * size
+        for (weight, k) in zip(weights, bins):
+            loads[k] += weight
+        return loads
+
+    @staticmethod
+    def _improve(weights, bins, size, time_limit):
+        """
+        Improve the partitions with a time-bounded local search.
+
+        Each step takes the heaviest and the lightest partitions and either
+        moves one item from the heaviest to the lightest, or swaps one item
+        between them, choosing the move that brings their totals closest
+        together.  Every step strictly reduces the spread of the totals, so
+        the search ends when no move helps or the time limit is reached.
+
+        Parameters:
+            weights (list): The weights
+            bins (list): The partition index assigned to each weight
+            size (int): The number of partitions
+            time_limit (float): The largest number of seconds to search
+
+        Returns:
+            list: The improved partition index assigned to each weight
+        """
+        bins = list(bins)
+        if size < 2 or len(weights) == 0:
+            return bins
+        loads = WeightBalanced._loads(weights, bins, size)
+        members = [[] for _ in xrange(size)]
+        for (i, k) in enumerate(bins):
+            insort(members[k], (weights[i], i))
+
+        deadline = time() + time_limit
+        while time() < deadline:
+            hi = max(xrange(size), key=loads.__getitem__)
+            lo = min(xrange(size), key=loads.__getitem__)
+            diff = loads[hi] - loads[lo]
+
+            # Any transfer of weight 0 < d < diff reduces the spread, and
+            # the best transfer is the one closest to diff / 2
+            best = None
+            for (j, (w_h, i_h)) in enumerate(members[hi]):
+                if 0 < w_h < diff:
+                    gain = abs(diff - 2 * w_h)
+                    if best is None or gain < best[0]:
+                        best = (gain, j, None)
+                lows = members[lo]
+                m = bisect_left(lows, (w_h - 0.5 * diff,))
+                for l in (m - 1, m):
+                    if 0 <= l < len(lows):
+                        d = w_h - lows[l][0]
+                        if 0 < d < diff:
+                            gain = abs(diff - 2 * d)
+                            if best is None or gain < best[0]:
+                                best = (gain, j, l)
+            if best is None:
+                break
+
+            (_, j, l) = best
+            (w_h, i_h) = members[hi].pop(j)
+            if l is not None:
+                (w_l, i_l) = members[lo].pop(l)
+                insort(members[hi], (w_l, i_l))
+                bins[i_l] = hi
+                loads[lo] -= w_l
+                loads[hi] += w_l
+            insort(members[lo], (w_h, i_h))
+            bins[i_h] = lo
+            loads[hi] -= w_h
+            loads[lo] += w_h
+        return bins
+
+    @staticmethod
+    def _sort_descending(weights):
+        """
+        Find the order of the weights from largest to smallest.
+
+        The sort is stable, so items of equal weight keep their order.
+
+        Parameters:
+            weights: A list (or 1D Numpy NDArray) of numeric weights
+
+        Returns:
+            The list (or Numpy NDArray) of indices of the weights in order
+        """
+        if PartitionFunction._is_ndarray(weights):
+            n = len(weights)
+            rorder = numpy.argsort(weights[::-1], kind='mergesort')
+            return (n - 1) - rorder[::-1]
+        else:
+            return sorted(xrange(len(weights)), key=weights.__getitem__,
+                          reverse=True)
+
+    @staticmethod
+    def _capacity_bins(weights, capacities):
+        """
+        Assign each weight to the partition that would finish it first.
+
+        Parameters:
+            weights (list): The weights, in the order they are assigned
+            capacities (list): The capacity of each partition
+
+        Returns:
+            list: The partition index assigned to each weight
+        """
+        loads = [0] * len(capacities)
+        ranks = range(len(capacities))
+        bins = []
+        for weight in weights:
+            k = min(ranks, key=lambda r:
+                    float(loads[r] + weight) / capacities[r])
+            loads[k] += weight
+            bins.append(k)
+        return bins
+
+    @staticmethod
+    def _greedy_bins(weights, size):
+        """
+        Greedily assign each weight to the partition with the least weight.
+
+        Parameters:
+            weights (list): The weights, in the order they are assigned
+            size (int): The number of partitions
+
+        Returns:
+            list: The partition index assigned to each weight
+        """
+        heap = [(0, k) for k in xrange(size)]
+        bins = []
+        for weight in weights:
+            (total, k) = heap[0]
+            heapreplace(heap, (total + weight, k))
+            bins.append(k)
+        return bins
+
+
+#==============================================================================
+# ContiguousWeighted -
+# Split an ordered list of pairs into contiguous ranges of balanced weight
+#==============================================================================
+class ContiguousWeighted(PartitionFunction):
+
+    """
+    Partition an indexable list of pairs into contiguous ranges by weight.
+
+    The data has the same form as for the WeightBalanced partitioning
+    function, but the order of the items is kept.  Each partition is a
+    contiguous range of the items, and the ranges are chosen to make the
+    total weight of the heaviest range as small as possible.
+
+    The weights are summed once into a prefix sum (with Numpy, if the
+    weights are a Numpy NDArray).  For a given weight limit, the ranges are
+    then found by binary search in the prefix sum, making each range (from
+    first to last) as long as the limit allows.  The smallest limit for
+    which this covers all of the items is itself found by bisection, so the
+    partitioning takes O(N + P log(N) log(W)) time for N items, P partitions,
+    and W the precision of the weights.  Some of the last partitions may be
+    empty.
+
+    If the data is a tuple of items and a separate 1D Numpy NDArray of
+    weights, each partition is a slice of the items (a view, if the items
+    are a Numpy NDArray).  If the data has no weights, it is partitioned like the
+    EqualLength partitioning function.
+
+    If capacities are given (for example, the relative speeds of the ranks
+    that will receive the partitions), the limit applies to the total weight
+    of each range divided by its capacity, so each range gets weight in
+    proportion to its capacity.  The makespan is then the largest total
+    weight divided by its capacity.
+
+    Attributes:
+        capacities (list): The capacity of each partition (or None if all
+            partitions are identical)
+        makespan: The total weight of the heaviest partition from the last
+            call (or None if the data had no weights)
+    """
+
+    _WEIGHTED = True
+
+    def __init__(self, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            capacities (list): The capacity of each partition, such as the
+                relative speed of the rank that receives it.  If None, all
+                partitions are identical.
+        """
+        self.capacities = capacities
+        self.makespan = None
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if self._weights_of(data) is not None:
+            return list(self.select(data, self.indices(data, size=size)))
+        else:
+            self.makespan = None
+            return EqualLength(self.capacities).plan(data, size=size)
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The slice of the items for each of the size parts, in index
+                order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        weights = self._weights_of(data)
+        if weights is None:
+            self.makespan = None
+            return EqualLength(self.capacities).indices(data, size=size)
+        cuts = self._cuts(weights, size)
+        return [slice(b, e, 1) for (b, e) in zip(cuts[:-1], cuts[1:])]
+
+    def _cuts(self, weights, size):
+        """
+        Find the boundaries of the contiguous ranges of balanced weight.
+
+        Parameters:
+            weights: A list (or 1D Numpy NDArray) of non-negative weights
+            size (int): The number of ranges
+
+        Returns:
+            list: The size + 1 boundaries of the ranges, such that range k
+                spans the indices from cuts[k] up to (but not including)
+                cuts[k + 1]
+        """
+        capacities = self._capacity_list(self.capacities, size)
+        if capacities is None:
+            scales = [1] * size
+        else:
+            scales = [float(c) for c in capacities]
+        if len(weights) == 0:
+            self.makespan = 0
+            return [0] * (size + 1)
+
+        if self._is_ndarray(weights):
+            prefix = numpy.zeros(len(weights) + 1, dtype=numpy.result_type(
+                weights.dtype, numpy.int64))
+            numpy.cumsum(weights, out=prefix[1:])
+            heaviest_item = weights.max().item()
+            prefix = prefix.tolist()
+        else:
+            prefix = [0]
+            for weight in weights:
+                prefix.append(prefix[-1] + weight)
+            heaviest_item = max(weights)
+        total = prefix[-1]
+
+        # A limit letting any range hold the total weight always works, and
+        # no limit can be less than the largest weight (in the largest
+        # range) or the average total per range
+        lower = max(float(total) / sum(scales),
+                    float(heaviest_item) / max(scales))
+        (upper, cuts) = self._fill(prefix, scales, total / min(scales))
+        if upper > lower:
+            for _ in xrange(64):
+                limit = 0.5 * (lower + upper)
+                if not lower < limit < upper:
+                    break
+                (heaviest, trial) = self._fill(prefix, scales, limit)
+                if trial is None:
+                    lower = limit
+                else:
+                    (upper, cuts) = (heaviest, trial)
+        self.makespan = upper
+        return cuts
+
+    @staticmethod
+    def _fill(prefix, scales, limit):
+        """
+        Fill each range, in order, with as many items as the limit allows.
+
+        Parameters:
+            prefix (list): The prefix sum of the weights, starting with 0
+            scales (list): The capacity of each range (all 1, if the ranges
+                are identical)
+            limit: The largest total weight, divided by its capacity,
+                allowed in each range
+
+        Returns:
+            tuple: The largest total weight of a range, divided by its
+                capacity, and the list of boundaries of the ranges, or
+                (None, None) if the items do not fit into the ranges
+        """
+        n = len(prefix) - 1
+        cuts = [0]
+        heaviest = 0
+        for scale in scales:
+            ibeg = cuts[-1]
+            iend = bisect_right(prefix, prefix[ibeg] + limit * scale) - 1
+            heaviest = max(heaviest, (prefix[iend] - prefix[ibeg]) / scale)
+            cuts.append(iend)
+        if cuts[-1] < n:
+            return (None, None)
+        return (heaviest, cuts)
+
+
+#==============================================================================
+# BlockND -
+# Split a Numpy NDArray into blocks across several axes
+#==============================================================================
+class BlockND(PartitionFunction):
+
+    """
+    Partition a Numpy NDArray into blocks across several axes at once.
+
+    The partitions are arranged in a 'process grid' with one dimension for
+    each chosen axis of the data, and the number of partitions along each
+    axis is chosen to make the blocks as close to square as possible.  (The
+    prime factors of the number of partitions are assigned, from largest
+    to smallest, to the axis with the longest blocks so far.)  Along each
+    axis, the data is then chopped into roughly equal length pieces, like
+    the EqualLength partitioning function.  The partitions are numbered in
+    row-major (C) order of the process grid.
+
+    Each partition is a tuple of the global offsets of the block (the index
+    of its first element along every axis of the data) and the block itself,
+    which is a view into the data (not a copy).  If the number of partitions
+    along an axis is greater than the length of the axis, some blocks will
+    be empty.
+
+    If the data is not a Numpy NDArray, it is partitioned like the
+    EqualLength partitioning function.
+
+    Attributes:
+        axes (tuple): The axes of the data along which to partition, or None
+            to partition along all axes
+    """
+
+    def __init__(self, axes=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            axes (tuple): The axes of the data along which to partition.  If
+                None, the data is partitioned along all of its axes.
+        """
+        self.axes = None if axes is None else tuple(axes)
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        if self._is_ndarray(data):
+            bounds = self._bounds(data.shape, size)
+            return self._block(data, bounds, index)
+        else:
+            return EqualLength()(data, index=index, size=size)
+
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if self._is_ndarray(data):
+            bounds = self._bounds(data.shape, size)
+            return [self._block(data, bounds, i) for i in xrange(size)]
+        else:
+            return EqualLength().plan(data, size=size)
+
+    def _item_weights(self, data):
+        """
+        Get the weights of the items of the data, as this function reads them.
+
+        The elements of a Numpy NDArray are not weighted.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            None
+        """
+        return None
+
+    def grid(self, shape, size):
+        """
+        Choose the number of partitions along each axis of the data.
+
+        Parameters:
+            shape (tuple): The shape of the data
+            size (int): The number of partitions
+
+        Returns:
+            tuple: The number of partitions along each axis of the data (1
+                for the axes not partitioned), whose product is size
+        """
+        ndim = len(shape)
+        axes = range(ndim) if self.axes is None else \
+            [axis % ndim for axis in self.axes]
+        dims = [1] * ndim
+        if not axes:
+            return tuple(dims)
+        for factor in self._prime_factors(size):
+            axis = max(axes, key=lambda a: float(shape[a]) / dims[a])
+            dims[axis] *= factor
+        return tuple(dims)
+
+    @staticmethod
+    def _prime_factors(n):
+        """
+        Factor an integer into primes.
+
+        Parameters:
+            n (int): The integer to factor
+
+        Returns:
+            list: The prime factors of n, from largest to smallest
+        """
+        factors = []
+        p = 2
+        while p * p <= n:
+            while n % p == 0:
+                factors.append(p)
+                n //= p
+            p += 1
+        if n > 1:
+            factors.append(n)
+        return factors[::-1]
+
+    def _bounds(self, shape, size):
+        """
+        Find the boundaries of the blocks along each axis of the data.
+
+        Parameters:
+            shape (tuple): The shape of the data
+            size (int): The number of partitions
+
+        Returns:
+            list: For each axis, the list of boundaries of the pieces along
+                that axis (one more than the number of pieces)
+        """
+        bounds = []
+        for (length, pieces) in zip(shape, self.grid(shape, size)):
+            (lenpart, remdata) = divmod(length, pieces)
+            axis_bounds = [0]
+            for i in xrange(pieces):
+                axis_bounds.append(
+                    axis_bounds[-1] + lenpart + (1 if i < remdata else 0))
+            bounds.append(axis_bounds)
+        return bounds
+
+    @staticmethod
+    def _block(data, bounds, index):
+        """
+        Get one block of the data, with its global offsets.
+
+        Parameters:
+            data: The Numpy NDArray to be partitioned
+            bounds (list): The boundaries of the pieces along each axis
+            index (int): The partition index, in row-major order of the grid
+
+        Returns:
+            tuple: The tuple of the global offsets of the block, and the
+                block itself (a view into the data)
+        """
+        coords = []
+        for axis_bounds in reversed(bounds):
+            (index, coord) = divmod(index, len(axis_bounds) - 1)
+            coords.append(coord)
+        coords.reverse()
+        offsets = tuple(b[c] for (b, c) in zip(bounds, coords))
+        slices = tuple(slice(b[c], b[c + 1]) for (b, c) in zip(bounds, coords))
+        return (offsets, data[slices])
+
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The tuple of slices (one for each axis) of the block for
+                each of the size parts, in index order, or None if the data
+                is not indexable
+        """
+        self._check_size(size)
+
+        if not self._is_ndarray(data):
+            return EqualLength().indices(data, size=size)
+        bounds = self._bounds(data.shape, size)
+        indices = []
+        for i in xrange(size):
+            (offsets, block) = self._block(data, bounds, i)
+            indices.append(tuple(slice(o, o + n, 1)
+                                 for (o, n) in zip(offsets, block.shape)))
+        return indices
+
+    def select(self, data, indices):
+        """
+        Take the parts of the data given the positions of their items.
+
+        Parameters:
+            data: The data to be partitioned
+            indices (list): The positions of the items of each part, as
+                returned by the indices method
+
+        Returns:
+            An iterator over the parts of the data, in index order
+        """
+        for index in indices:
+            if self._is_ndarray(data):
+                yield (tuple(s.start for s in index), data[index])
+            else:
+                yield self._select(data, index)
+
+
+#==============================================================================
+# SpaceFillingCurve -
+# Order items along a Morton or Hilbert curve through their coordinates
+#==============================================================================
+class SpaceFillingCurve(PartitionFunction):
+
+    """
+    Partition items by cutting a space-filling curve through their coordinates.
+
+    The data must be a tuple of the items (any indexable object) and a 2D
+    Numpy NDArray of their coordinates, with one row for each item and one
+    column for each dimension, or a tuple of the items, their coordinates,
+    and a 1D Numpy NDArray of their weights.  The coordinates are scaled
+    onto an integer grid with 2^bits points along each dimension, and each
+    item is given the key of its grid point along a Morton (Z-order) or
+    Hilbert curve.  The keys are computed with Numpy, for all of the items
+    at once.  The items are then sorted by key, and the curve is cut into
+    contiguous pieces of roughly equal length (or, if weights are given,
+    the cuts are chosen like the ContiguousWeighted partitioning function).
+
+    Since nearby points on the curve are nearby in space, each partition
+    holds items that are close together.  (The Hilbert curve keeps better
+    locality than the Morton curve, but its keys take longer to compute.)
+
+    If the data is not in one of these forms, it is partitioned like the
+    EqualLength partitioning function.
+
+    If capacities are given, the pieces of the curve are in proportion to
+    the capacity of each partition (see the EqualLength and
+    ContiguousWeighted partitioning functions).
+
+    Attributes:
+        curve (str): The name of the curve, either 'hilbert' or 'morton'
+        bits (int): The number of bits of the grid along each dimension, or
+            None to use as many bits as fit into a 63-bit key
+        capacities (list): The capacity of each partition (or None if all
+            partitions are identical)
+    """
+
+    CURVES = ('hilbert', 'morton')
+
+    def __init__(self, curve='hilbert', bits=None, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            curve (str): The name of the curve, either 'hilbert' or 'morton'
+            bits (int): The number of bits of the grid along each dimension.
+                If None, as many bits as fit into a 63-bit key (but no more
+                than 32) are used.
+            capacities (list): The capacity of each partition, such as the
+                relative speed of the rank that receives it.  If None, all
+                partitions are identical.
+
+        Raises:
+            ValueError: If the curve name is not recognized
+        """
+        if curve not in self.CURVES:
+            err_msg = 'Space-filling curve must be one of {0}'.format(
+                ', '.join(self.CURVES))
+            raise ValueError(err_msg)
+        self.curve = curve
+        self.bits = bits
+        self.capacities = capacities
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if not self._are_items_and_coords(data):
+            return EqualLength(self.capacities).plan(data, size=size)
+        return list(self.select(data, self.indices(data, size=size)))
+
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        if not self._are_items_and_coords(data):
+            return EqualLength(self.capacities).indices(data, size=size)
+
+        items = data[0]
+        coords = data[1].reshape(len(items), -1)
+        order = numpy.argsort(self.keys(coords), kind='mergesort')
+        if len(data) == 3:
+            cuts = ContiguousWeighted(self.capacities)._cuts(
+                data[2][order], size)
+        else:
+            cuts = [0]
+            for lenpart in EqualLength(self.capacities)._lengths(
+                    len(items), size):
+                cuts.append(cuts[-1] + lenpart)
+        return [order[b:e] for (b, e) in zip(cuts[:-1], cuts[1:])]
+
+    def select(self, data, indices):
+        """
+        Take the parts of the data given the positions of their items.
+
+        Parameters:
+            data: The data to be partitioned
+            indices (list): The positions of the items of each part, as
+                returned by the indices method
+
+        Returns:
+            An iterator over the parts of the data, in index order
+        """
+        items = data[0] if self._are_items_and_coords(data) else data
+        for index in indices:
+            yield self._select(items, index)
+
+    @staticmethod
+    def _are_items_and_coords(data):
+        """
+        Check if the data object is a tuple of items, coordinates and weights.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            bool: True, if data is an (items, coords) or (items, coords,
+                weights) tuple.  False, otherwise.
+        """
+        if not (type(data) is tuple and len(data) in (2, 3) and
+                PartitionFunction._is_indexable(data[0]) and
+                PartitionFunction._is_ndarray(data[1]) and
+                data[1].ndim in (1, 2) and len(data[1]) == len(data[0])):
+            return False
+        if len(data) == 3:
+            return (PartitionFunction._is_ndarray(data[2]) and
+                    data[2].ndim == 1 and len(data[2]) == len(data[0]))
+        return True
+
+    def _item_weights(self, data):
+        """
+        Get the weights of the items of the data, as this function reads them.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            The Numpy NDArray of weights of an (items, coords, weights)
+            tuple, None for an (items, coords) tuple, or the weights of any
+            other data (see the PartitionFunction _item_weights method)
+        """
+        if self._are_items_and_coords(data):
+            return data[2] if len(data) == 3 else None
+        return super(SpaceFillingCurve, self)._item_weights(data)
+
+    def keys(self, coords):
+        """
+        Compute the keys of points along the space-filling curve.
+
+        Parameters:
+            coords: A 2D Numpy NDArray of coordinates, with one row for each
+                point and one column for each dimension
+
+        Returns:
+            A 1D Numpy NDArray of the (unsigned 64-bit integer) keys
+        """
+        (npoints, ndims) = coords.shape
+        bits = self.bits if self.bits else min(32, 63 // max(ndims, 1))
+        grid = self._quantize(coords, bits)
+        if self.curve == 'hilbert':
+            self._hilbert_transpose(grid, bits)
+        return self._interleave(grid, bits)
+
+    @staticmethod
+    def _quantize(coords, bits):
+        """
+        Scale coordinates onto an integer grid.
+
+        Parameters:
+            coords: A 2D Numpy NDArray of coordinates
+            bits (int): The number of bits along each dimension
+
+        Returns:
+            A 2D Numpy NDArray of unsigned 64-bit integer grid coordinates
+        """
+        coords = numpy.asarray(coords, dtype=numpy.float64)
+        if coords.size == 0:
+            return numpy.zeros(coords.shape, dtype=numpy.uint64)
+        lower = coords.min(axis=0)
+        extent = coords.max(axis=0) - lower
+        extent[extent == 0] = 1
+        scaled = (coords - lower) / extent * ((1 << bits) - 1)
+        return numpy.rint(scaled).astype(numpy.uint64)
+
+    @staticmethod
+    def _hilbert_transpose(grid, bits):
+        """
+        Convert grid coordinates into the 'transposed' Hilbert index, in place.
+
+        This is Skilling's algorithm ("Programming the Hilbert curve", 2004),
+        applied to all of the points at once.  Interleaving the bits of the
+        transposed index (like a Morton key) gives the Hilbert key.
+
+        Parameters:
+            grid: A 2D Numpy NDArray of unsigned 64-bit grid coordinates
+            bits (int): The number of bits along each dimension
+        """
+        ndims = grid.shape[1]
+        one = numpy.uint64(1)
+        q = one << numpy.uint64(bits - 1)
+        while q > one:
+            p = q - one
+            for i in xrange(ndims):
+                high = (grid[:, i] & q) != 0
+                if i == 0:
+                    grid[high, 0] ^= p
+                else:
+                    t = (grid[:, 0] ^ grid[:, i]) & p
+                    t[high] = 0
+                    grid[:, 0] ^= numpy.where(high, p, t)
+                    grid[:, i] ^= t
+            q >>= one
+        for i in xrange(1, ndims):
+            grid[:, i] ^= grid[:, i - 1]
+        t = numpy.zeros(len(grid), dtype=numpy.uint64)
+        q = one << numpy.uint64(bits - 1)
+        while q > one:
+            t[(grid[:, ndims - 1] & q) != 0] ^= q - one
+            q >>= one
+        grid ^= t[:, numpy.newaxis]
+
+    @staticmethod
+    def _interleave(grid, bits):
+        """
+        Interleave the bits of grid coordinates into a single key.
+
+        The most significant bit of the first dimension becomes the most
+        significant bit of the key.
+
+        Parameters:
+            grid: A 2D Numpy NDArray of unsigned 64-bit grid coordinates
+            bits (int): The number of bits along each dimension
+
+        Returns:
+            A 1D Numpy NDArray of unsigned 64-bit integer keys
+        """
+        ndims = grid.shape[1]
+        one = numpy.uint64(1)
+        keys = numpy.zeros(len(grid), dtype=numpy.uint64)
+        for b in xrange(bits):
+            for i in xrange(ndims):
+                bit = (grid[:, i] >> numpy.uint64(b)) & one
+                keys |= bit << numpy.uint64(b * ndims + ndims - 1 - i)
+        return keys
+
+
+#==============================================================================
+# HashPartition -
+# Assign items to partitions by a stable hash of a key
+#==============================================================================
+class HashPartition(PartitionFunction):
+
+    """
+    Partition an indexable object by a stable hash of a key of each item.
+
+    Each item is assigned to the partition given by the hash of its key,
+    modulo the number of partitions, so the same key always goes to the same
+    partition (for the same number of partitions), no matter where the item
+    is in the data or which process computes the partitions.  The key of
+    each item is computed with the key function (or is the item itself, if
+    no key function is given).  Integer keys are hashed with the
+    'splitmix64' mixing function.  String keys are hashed with their CRC-32
+    checksum (then mixed), and any other key is hashed by the checksum of
+    its repr string.  (Unlike Python's built-in hash function, these hashes
+    are the same in every process and every run.)
+
+    If the keys are a 1D Numpy NDArray of integers (i.e., the data is an
+    integer Numpy NDArray and there is no key function, or the key function
+    returns an integer Numpy NDArray when applied to the whole data), the
+    hashing and grouping are done with Numpy for all of the items at once.
+    If the data is a Numpy NDArray, each partition is a Numpy NDArray.
+
+    Within each partition, the items keep their order.  If the data is not
+    indexable, then it will return the data for index=0 only, and an empty
+    list otherwise.
+
+    Attributes:
+        key: The function computing the key of each item (or None to use
+            the item itself)
+        vectorized (bool): Whether the key function can be applied to a
+            whole Numpy NDArray of items at once
+    """
+
+    MASK64 = (1 << 64) - 1
+
+    def __init__(self, key=None, vectorized=False):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            key: A function computing the key of each item.  If None, the
+                item itself is the key.
+            vectorized (bool): Whether the key function can be applied to a
+                whole Numpy NDArray of items at once, returning a Numpy
+                NDArray of keys
+        """
+        self.key = key
+        self.vectorized = vectorized
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return [[data]] + [[] for _ in xrange(size - 1)]
+        return list(self.select(data, self.indices(data, size=size)))
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return None
+        positions = self._positions(data)
+        return self._group(positions, positions, self.buckets(data, size),
+                           size)
+
+    def buckets(self, data, size):
+        """
+        Compute the partition index of every item of the data.
+
+        Parameters:
+            data: An indexable object of items
+            size (int): The number of partitions
+
+        Returns:
+            The list (or 1D Numpy NDArray) of the partition index of each
+            item
+        """
+        if self._is_ndarray(data) and (self.key is None or self.vectorized):
+            keys = data if self.key is None else self.key(data)
+            if self._is_ndarray(keys) and keys.ndim == 1 and \
+                    keys.dtype.kind in 'iub':
+                hashes = self._mix_array(keys.astype(numpy.uint64))
+                return self._bucket_array(hashes, size)
+        keys = data if self.key is None else [self.key(x) for x in data]
+        return [self._bucket(self.hash(k), size) for k in keys]
+
+    @classmethod
+    def hash(cls, key):
+        """
+        Compute the stable 64-bit hash of a key.
+
+        Parameters:
+            key: The key to hash
+
+        Returns:
+            int: The hash of the key, between 0 and 2^64 - 1
+        """
+        if isinstance(key, Integral):
+            return cls._mix(int(key) & cls.MASK64)
+        if isinstance(key, unicode):
+            key = key.encode('utf-8')
+        elif not isinstance(key, str):
+            key = repr(key)
+        return cls._mix(crc32(key) & 0xFFFFFFFF)
+
+    @classmethod
+    def _mix(cls, x):
+        """
+        Mix the bits of a 64-bit integer with the splitmix64 function.
+
+        Parameters:
+            x (int): An integer between 0 and 2^64 - 1
+
+        Returns:
+            int: The mixed integer, between 0 and 2^64 - 1
+        """
+        x = (x + 0x9E3779B97F4A7C15) & cls.MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & cls.MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & cls.MASK64
+        return x ^ (x >> 31)
+
+    @staticmethod
+    def _mix_array(x):
+        """
+        Mix the bits of a Numpy NDArray of 64-bit integers with splitmix64.
+
+        Parameters:
+            x: A 1D Numpy NDArray of unsigned 64-bit integers
+
+        Returns:
+            A 1D Numpy NDArray of the mixed unsigned 64-bit integers
+        """
+        u64 = numpy.uint64
+        with numpy.errstate(over='ignore'):
+            x = x + u64(0x9E3779B97F4A7C15)
+            x = (x ^ (x >> u64(30))) * u64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> u64(27))) * u64(0x94D049BB133111EB)
+        return x ^ (x >> u64(31))
+
+    def _bucket(self, h, size):
+        """
+        Map a hash to a partition index.
+
+        Parameters:
+            h (int): The 64-bit hash of a key
+            size (int): The number of partitions
+
+        Returns:
+            int: The partition index of the hash
+        """
+        return int(h % size)
+
+    def _bucket_array(self, hashes, size):
+        """
+        Map a Numpy NDArray of hashes to partition indices.
+
+        Parameters:
+            hashes: A 1D Numpy NDArray of unsigned 64-bit hashes
+            size (int): The number of partitions
+
+        Returns:
+            A 1D Numpy NDArray of the partition index of each hash
+        """
+        return (hashes % numpy.uint64(size)).astype(numpy.int64)
+
+
+#==============================================================================
+# ConsistentHash -
+# Assign items to partitions by jump consistent hashing of a key
+#==============================================================================
+class ConsistentHash(HashPartition):
+
+    """
+    Partition an indexable object by a consistent hash of a key of each item.
+
+    This works like the HashPartition partitioning function, except that the
+    hash of each key is mapped to a partition with the 'jump consistent
+    hash' method (Lamping and Veach, 2014), instead of by the modulo of the
+    number of partitions.  When the number of partitions changes from P to
+    P + 1, only about 1/(P + 1) of the items move (all of them to the new
+    partition), while with the HashPartition function nearly every item
+    moves.  This keeps per-partition caches and scratch files useful when
+    the number of ranks changes between runs.
+
+    For a Numpy NDArray of integer keys, the jumps are computed for all of
+    the items at once, taking O(log P) Numpy steps.
+    """
+
+    def _bucket(self, h, size):
+        """
+        Map a hash to a partition index with the jump consistent hash.
+
+        Parameters:
+            h (int): The 64-bit hash of a key
+            size (int): The number of partitions
+
+        Returns:
+            int: The partition index of the hash
+        """
+        (b, j) = (-1, 0)
+        while j < size:
+            b = j
+            h = (h * 2862933555777941757 + 1) & self.MASK64
+            j = int((b + 1) * (float(1 << 31) / float((h >> 33) + 1)))
+        return b
+
+    def _bucket_array(self, hashes, size):
+        """
+        Map a Numpy NDArray of hashes to partition indices.
+
+        Parameters:
+            hashes: A 1D Numpy NDArray of unsigned 64-bit hashes
+            size (int): The number of partitions
+
+        Returns:
+            A 1D Numpy NDArray of the partition index of each hash
+        """
+        u64 = numpy.uint64
+        h = hashes.copy()
+        b = numpy.zeros(len(h), dtype=numpy.int64)
+        j = numpy.zeros(len(h), dtype=numpy.int64)
+        active = numpy.arange(len(h))
+        while len(active) > 0:
+            b[active] = j[active]
+            with numpy.errstate(over='ignore'):
+                h[active] = h[active] * u64(2862933555777941757) + u64(1)
+            scale = float(1 << 31) / ((h[active] >> u64(33)) + 1.0)
+            j[active] = ((b[active] + 1) * scale).astype(numpy.int64)
+            active = active[j[active] < size]
+        return b
+
+
+#==============================================================================
+# RangePartition -
+# Assign items to partitions by ranges of a key, split at sampled splitters
+#==============================================================================
+class RangePartition(PartitionFunction):
+
+    """
+    Partition an indexable object into ranges of a key of each item.
+
+    The key of each item is computed with the key function (or is the item
+    itself, if no key function is given).  The keys are split into ranges
+    by a sorted list of 'splitters', and partition i holds the items with
+    keys greater than or equal to splitter i - 1 and less than splitter i.
+    Hence, every key in partition i is less than (or equal to) every key in
+    partition i + 1.  Within each partition, the items keep their order.
+
+    If no splitters are given, they are chosen from a regular sample of the
+    keys (every k-th key, taking about *oversample* keys for each partition),
+    so the partitions have roughly equal lengths unless many keys are equal.
+
+    If the keys are a 1D Numpy NDArray (i.e., the data is a 1D Numpy NDArray
+    and there is no key function, or the key function is vectorized), the
+    ranges are found with Numpy for all of the items at once.
+
+    If the data is not indexable, then it will return the data for index=0
+    only, and an empty list otherwise.
+
+    Attributes:
+        splitters (list): The sorted list of size - 1 splitters (or None to
+            choose them from a sample of the data)
+        key: The function computing the key of each item (or None to use
+            the item itself)
+        vectorized (bool): Whether the key function can be applied to a
+            whole Numpy NDArray of items at once
+        oversample (int): The number of keys sampled for each partition
+    """
+
+    def __init__(self, splitters=None, key=None, vectorized=False,
+                 oversample=16):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            splitters (list): The sorted list of splitters, which must have
+                one fewer splitter than the number of partitions.  If None,
+                the splitters are chosen from a sample of the data.
+            key: A function computing the key of each item.  If None, the
+                item itself is the key.
+            vectorized (bool): Whether the key function can be applied to a
+                whole Numpy NDArray of items at once, returning a Numpy
+                NDArray of keys
+            oversample (int): The number of keys sampled for each partition
+        """
+        self.splitters = splitters
+        self.key = key
+        self.vectorized = vectorized
+        self.oversample = oversample
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+
+        Raises:
+            ValueError: If the number of splitters does not match the size
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return [[data]] + [[] for _ in xrange(size - 1)]
+        return list(self.select(data, self.indices(data, size=size)))
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+
+        Raises:
+            ValueError: If the number of splitters does not match the size
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return None
+        keys = self.keys(data)
+        if self.splitters is None:
+            step = max(1, len(keys) // (self.oversample * size))
+            splitters = self.choose_splitters(sorted(keys[::step]), size)
+        elif len(self.splitters) != size - 1:
+            err_msg = 'Number of splitters must be one less than the size'
+            raise ValueError(err_msg)
+        else:
+            splitters = self.splitters
+
+        if self._is_ndarray(keys):
+            bins = numpy.searchsorted(splitters, keys, side='right')
+        else:
+            bins = [bisect_right(splitters, k) for k in keys]
+        positions = self._positions(data)
+        return self._group(positions, positions, bins, size)
+
+    def keys(self, data):
+        """
+        Compute the key of every item of the data.
+
+        Parameters:
+            data: An indexable object of items
+
+        Returns:
+            The list (or 1D Numpy NDArray) of the key of each item
+        """
+        if self._is_ndarray(data) and (self.key is None or self.vectorized):
+            keys = data if self.key is None else self.key(data)
+            if self._is_ndarray(keys) and keys.ndim == 1:
+                return keys
+        if self.key is None:
+            return list(data)
+        return [self.key(x) for x in data]
+
+    @staticmethod
+    def choose_splitters(sample, size):
+        """
+        Choose evenly spaced splitters from a sorted sample of keys.
+
+        Parameters:
+            sample (list): A sorted list of keys
+            size (int): The number of partitions
+
+        Returns:
+            list: The size - 1 splitters, in order
+        """
+        if len(sample) == 0:
+            return []
+        return [sample[min((i * len(sample)) // size, len(sample) - 1)]
+                for i in xrange(1, size)]
+
+
+#==============================================================================
+# KarmarkarKarp -
+# Partition by the largest differencing method
+#==============================================================================
+class KarmarkarKarp(WeightBalanced):
+
+    """
+    Partition an indexable list of pairs with the largest differencing method.
+
+    The data has the same form as for the WeightBalanced partitioning
+    function, but the items are binned with the Karmarkar-Karp (largest
+    differencing) method instead of the greedy method.  Each item starts as
+    its own partial partitioning, in which one partition holds the item and
+    the rest are empty.  The two partial partitionings with the largest
+    spread (difference between their heaviest and lightest partitions) are
+    then repeatedly combined, joining the heaviest partitions of one with
+    the lightest partitions of the other, until only one is left.
+
+    This takes O(N P log N) time for N items and P partitions, which is
+    more than the greedy method, but it typically gives much smaller
+    imbalances, especially when there are a few very heavy items.  (If
+    capacities are given, the items are binned like the WeightBalanced
+    partitioning function with capacities.)
+    """
+
+    def _bins(self, weights, size):
+        """
+        Assign each weight to a partition with the largest differencing method.
+
+        Parameters:
+            weights (list): The weights, in order from largest to smallest
+            size (int): The number of partitions
+
+        Returns:
+            list: The partition index assigned to each weight
+        """
+        # Each heap entry is (-spread, counter, totals, members), with the
+        # totals in decreasing order.  The members of each partition are
+        # stored as a tree of nested pairs (of item indices, or None for an
+        # empty partition), so joining two partitions takes O(1) time.
+        heap = []
+        empty = [None] * (size - 1)
+        zeros = [0] * (size - 1)
+        for (i, weight) in enumerate(weights):
+            heap.append((-weight, i, [weight] + zeros, [i] + empty))
+        heapify(heap)
+
+        counter = len(weights)
+        last = size - 1
+        while len(heap) > 1:
+            (_, _, totals_a, members_a) = heappop(heap)
+            (_, _, totals_b, members_b) = heappop(heap)
+            joined = []
+            for k in xrange(size):
+                (m_a, m_b) = (members_a[k], members_b[last - k])
+                if m_a is None:
+                    member = m_b
+                elif m_b is None:
+                    member = m_a
+                else:
+                    member = (m_a, m_b)
+                joined.append((totals_a[k] + totals_b[last - k], member))
+            joined.sort(key=itemgetter(0), reverse=True)
+            totals = [total for (total, _) in joined]
+            members = [member for (_, member) in joined]
+            heappush(heap, (totals[-1] - totals[0], counter, totals, members))
+            counter += 1
+
+        bins = [0] * len(weights)
+        if heap:
+            for (k, member) in enumerate(heap[0][3]):
+                stack = [member]
+                while stack:
+                    node = stack.pop()
+                    if isinstance(node, tuple):
+                        stack.extend(node)
+                    elif node is not None:
+                        bins[node] = k
+        return bins
+
+
+#==============================================================================
+# Multifit -
+# Partition by bin packing with a searched capacity
+#==============================================================================
+class Multifit(WeightBalanced):
+
+    """
+    Partition an indexable list of pairs with the multifit method.
+
+    The data has the same form as for the WeightBalanced partitioning
+    function, but the items are binned with the multifit method instead of
+    the greedy method.  The multifit method does a bisection search for the
+    smallest partition capacity for which 'first fit decreasing' bin packing
+    (put each item, from heaviest to lightest, into the first partition with
+    room for it) needs no more than the allowed number of partitions.  If the
+    greedy method happens to do better, its partitions are used instead.
+
+    Each step of the search takes O(N P) time for N items and P partitions.
+
+    Attributes:
+        iterations (int): The number of bisection steps in the search
+    """
+
+    def __init__(self, iterations=10, time_limit=None, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            iterations (int): The number of bisection steps in the search
+            time_limit (float): The largest number of seconds to spend
+                improving the partitions with local search.  If None, no
+                local search is done.
+            capacities (list): The capacity of each partition.  If given,
+                the items are binned like the WeightBalanced partitioning
+                function with capacities.
+        """
+        super(Multifit, self).__init__(time_limit=time_limit,
+                                       capacities=capacities)
+        self.iterations = iterations
+
+    def _bins(self, weights, size):
+        """
+        Assign each weight to a partition with the multifit method.
+
+        Parameters:
+            weights (list): The weights, in order from largest to smallest
+            size (int): The number of partitions
+
+        Returns:
+            list: The partition index assigned to each weight
+        """
+        best = self._greedy_bins(weights, size)
+        if len(weights) == 0:
+            return best
+        best_makespan = max(self._loads(weights, best, size))
+
+        total = sum(weights)
+        lower = max(float(total) / size, weights[0])
+        upper = max(2.0 * total / size, weights[0])
+        for _ in xrange(self.iterations):
+            capacity = 0.5 * (lower + upper)
+            bins = self._first_fit(weights, size, capacity)
+            if bins is None:
+                lower = capacity
+            else:
+                upper = capacity
+                makespan = max(self._loads(weights, bins, size))
+                if makespan < best_makespan:
+                    (best, best_makespan) = (bins, makespan)
+        return best
+
+    @staticmethod
+    def _first_fit(weights, size, capacity):
+        """
+        Pack the weights into partitions with the first fit method.
+
+        Parameters:
+            weights (list): The weights, in order from largest to smallest
+            size (int): The number of partitions
+            capacity: The largest total weight allowed in each partition
+
+        Returns:
+            list: The partition index assigned to each weight, or None if
+                the weights do not fit into size partitions
+        """
+        loads = [0] * size
+        bins = []
+        for weight in weights:
+            for k in xrange(size):
+                if loads[k] + weight <= capacity:
+                    loads[k] += weight
+                    bins.append(k)
+                    break
+            else:
+                return None
+        return bins
+
+
+#==============================================================================
+# MultiConstraint -
+# Balance one weight of each item subject to capacities on all of its weights
+#==============================================================================
+class MultiConstraint(PartitionFunction):
+
+    """
+    Partition an indexable list of pairs with vector weights and capacities.
+
+    The first index of each pair is assumed to be an item of data (which will
+    be partitioned), and the second index in each pair is assumed to be a
+    sequence of numeric weights, such as (cost, bytes).  Instead of a list of
+    pairs, the data can also be a tuple of the items and a separate 2D Numpy
+    NDArray of weights, with one row for each item.
+
+    The first weight of each item (the 'cost') is balanced across the
+    partitions, as with the WeightBalanced partitioning function, while the
+    total of every weight in each partition is kept within the capacity of
+    that partition.  The capacities are given as a sequence with one limit
+    for each weight (or None for no limit), which applies to every
+    partition, or as a list with one such sequence for each partition.
+
+    The items are taken in order of decreasing 'size' (the largest of their
+    weights, each relative to its average capacity or, if it has no limit,
+    to its average total per partition), and each is put into the partition
+    with the smallest total cost among the partitions with room for it.
+
+    Before any items are assigned, the data are checked against the
+    capacities, and a ValueError is raised if the total of any weight is
+    larger than the total capacity for it, or if any item is larger than
+    the largest capacity for one of its weights.  A ValueError is also
+    raised if, during the assignment, an item does not fit into any
+    partition.
+
+    If the data has no weights, the data is partitioned with the EqualStride
+    partitioning function.
+
+    Attributes:
+        capacities: The limit for each weight (or a list of limits for each
+            partition), or None for no limits
+        makespan: The total cost of the most costly partition from the last
+            call (or None if the data had no weights)
+        loads (list): The totals of each weight in each partition from the
+            last call (or None if the data had no weights)
+    """
+
+    _WEIGHTED = True
+
+    def __init__(self, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            capacities: A sequence with the limit for each weight (or None
+                for no limit), applying to every partition, or a list of
+                such sequences, one for each partition.  If None, no limits
+                are applied.
+        """
+        self.capacities = capacities
+        self.makespan = None
+        self.loads = None
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+
+        Raises:
+            ValueError: If the items do not fit into the capacities
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+
+        Raises:
+            ValueError: If the items do not fit into the capacities
+        """
+        self._check_size(size)
+
+        return list(self.select(data, self.indices(data, size=size)))
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+
+        Raises:
+            ValueError: If the items do not fit into the capacities
+        """
+        self._check_size(size)
+
+        vectors = self._vectors_of(data)
+        if vectors is None:
+            self.makespan = None
+            self.loads = None
+            return EqualStride().indices(data, size=size)
+
+        dims = len(vectors[0]) if vectors else 0
+        limits = self._limits(size, dims)
+        scales = self._check_capacities(vectors, limits, size)
+
+        # Take the items from largest to smallest
+        sizes = [max([w / s for (w, s) in zip(v, scales)] or [0])
+                 for v in vectors]
+        order = sorted(xrange(len(vectors)), key=sizes.__getitem__,
+                       reverse=True)
+
+        # Put each item into the least costly partition with room for it
+        loads = [[0] * dims for _ in xrange(size)]
+        heap = [(0, k) for k in xrange(size)]
+        bins = []
+        for i in order:
+            vector = vectors[i]
+            skipped = []
+            while heap:
+                (cost, k) = heappop(heap)
+                if self._fits(vector, loads[k], limits[k]):
+                    break
+                skipped.append((cost, k))
+            else:
+                err_msg = ('Item {0} with weights {1} does not fit into any '
+                           'partition').format(i, tuple(vector))
+                raise ValueError(err_msg)
+            for d in xrange(dims):
+                loads[k][d] += vector[d]
+            heappush(heap, (loads[k][0], k))
+            for entry in skipped:
+                heappush(heap, entry)
+            bins.append(k)
+
+        self.loads = loads
+        self.makespan = max([load[0] for load in loads]) if dims else 0
+
+        positions = self._positions(self._vectors_source(data))
+        if self._is_ndarray(positions):
+            order = numpy.asarray(order, dtype=int)
+        return self._group(positions, order, bins, size)
+
+    @_accepts_mappings
+    def select(self, data, indices):
+        """
+        Take the parts of the data given the positions of their items.
+
+        Parameters:
+            data: The data to be partitioned
+            indices (list): The positions of the items of each part, as
+                returned by the indices method
+
+        Returns:
+            An iterator over the parts of the data, in index order
+        """
+        weighted = self._vectors_of(data) is not None
+        for index in indices:
+            if weighted:
+                yield self._select_items(data, index)
+            else:
+                yield self._select(data, index)
+
+    @staticmethod
+    def _vectors_source(data):
+        """
+        Get the object holding the weights of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            The separate Numpy NDArray of weights, if the data is an (items,
+            weights) tuple.  The data itself, otherwise.
+        """
+        if type(data) is tuple and len(data) == 2 and \
+                PartitionFunction._is_ndarray(data[1]) and \
+                data[1].ndim in (1, 2) and \
+                PartitionFunction._is_indexable(data[0]) and \
+                len(data[0]) == len(data[1]):
+            return data[1]
+        else:
+            return data
+
+    @staticmethod
+    def _vectors_of(data):
+        """
+        Get the weights of each item of weighted data as a list.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            list: The list of the weights of each item (as a list, even if
+                the item has a single weight), or None if the data has no
+                weights
+
+        Raises:
+            ValueError: If the items do not all have the same number of
+                weights
+        """
+        source = MultiConstraint._vectors_source(data)
+        if source is not data:
+            return source.reshape(len(source), -1).tolist()
+        weights = PartitionFunction._weights_of(data)
+        if weights is None:
+            return None
+        elif PartitionFunction._is_ndarray(weights):
+            return weights.reshape(len(weights), -1).tolist()
+        vectors = [list(w) if hasattr(w, '__len__') else [w]
+                   for w in weights]
+        if len(set(len(v) for v in vectors)) > 1:
+            raise ValueError('Every item must have the same number of weights')
+        return vectors
+
+    def _item_weights(self, data):
+        """
+        Get the weights of the items of the data, as this function reads them.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            list: The list of the weights of each item (as a list, even if
+                the item has a single weight), or None if the data has no
+                weights
+        """
+        if self._is_mapping(data):
+            return super(MultiConstraint, self)._item_weights(data)
+        return self._vectors_of(data)
+
+    def _limits(self, size, dims):
+        """
+        Get the limit for each weight of each partition.
+
+        Parameters:
+            size (int): The number of partitions
+            dims (int): The number of weights of each item
+
+        Returns:
+            list: The list of limits (or None for no limit) for each weight,
+                for each partition
+
+        Raises:
+            ValueError: If the capacities do not match the number of
+                partitions or the number of weights
+        """
+        capacities = self.capacities
+        if capacities is None:
+            return [[None] * dims for _ in xrange(size)]
+        if len(capacities) > 0 and \
+                all(hasattr(c, '__len__') for c in capacities):
+            if len(capacities) != size:
+                err_msg = ('Capacities given for {0} partitions, but {1} '
+                           'partitions requested').format(len(capacities),
+                                                          size)
+                raise ValueError(err_msg)
+        else:
+            capacities = [capacities] * size
+        limits = [list(c) for c in capacities]
+        if dims > 0 and any(len(c) != dims for c in limits):
+            err_msg = 'Capacities must have one limit for each of {0} weights'
+            raise ValueError(err_msg.format(dims))
+        return limits
+
+    @staticmethod
+    def _check_capacities(vectors, limits, size):
+        """
+        Check that the weights can fit into the capacities.
+
+        Parameters:
+            vectors (list): The weights of each item
+            limits (list): The limits for each weight, for each partition
+            size (int): The number of partitions
+
+        Returns:
+            list: The scale of each weight (the average capacity or, if any
+                partition has no limit, the average total per partition)
+
+        Raises:
+            ValueError: If the total of a weight is larger than the total
+                capacity for it, or if an item is larger than the largest
+                capacity for one of its weights
+        """
+        dims = len(vectors[0]) if vectors else 0
+        scales = []
+        for d in xrange(dims):
+            total = sum(v[d] for v in vectors)
+            caps = [limit[d] for limit in limits]
+            if any(c is None for c in caps):
+                scales.append(float(total) / size or 1.0)
+                continue
+            if total > sum(caps):
+                err_msg = ('Total of weight {0} ({1}) is larger than the '
+                           'total capacity ({2})').format(d, total, sum(caps))
+                raise ValueError(err_msg)
+            largest = max(caps)
+            for (i, v) in enumerate(vectors):
+                if v[d] > largest:
+                    err_msg = ('Weight {0} of item {1} ({2}) is larger than '
+                               'the largest capacity ({3})').format(
+                                   d, i, v[d], largest)
+                    raise ValueError(err_msg)
+            scales.append(float(sum(caps)) / size or 1.0)
+        return scales
+
+    @staticmethod
+    def _fits(vector, load, limit):
+        """
+        Check if an item fits into a partition.
+
+        Parameters:
+            vector (list): The weights of the item
+            load (list): The totals of each weight in the partition
+            limit (list): The limits for each weight of the partition
+
+        Returns:
+            bool: True, if every total stays within its limit.
+                False, otherwise.
+        """
+        for (w, l, c) in zip(vector, load, limit):
+            if c is not None and l + w > c:
+                return False
+        return True
+
+
+#==============================================================================
+# Affinity -
+# Keep items sharing a key together, while balancing their total weight
+#==============================================================================
+class Affinity(PartitionFunction):
+
+    """
+    Partition an indexable object by keeping items with the same key together.
+
+    Each item has an 'affinity' key (for example, the name of the file from
+    which it is read), given by the key function.  The items are grouped by
+    key, and each group is put, whole, into one partition, so that (for
+    example) each file is opened by as few ranks as possible.  The groups
+    are assigned like the WeightBalanced partitioning function: in order of
+    decreasing total weight, each group is put into the partition with the
+    smallest total weight so far.
+
+    A group heavier than the average total weight per partition cannot be
+    kept whole without unbalancing the partitions, so only such oversized
+    groups are split, into as few contiguous pieces as make each piece no
+    heavier than the average.
+
+    The data can be a list of (item, weight) pairs (or an (items, weights)
+    tuple, like for the WeightBalanced partitioning function), in which case
+    the key function is applied to the items, or a list of unweighted items,
+    each of which is given a weight of 1.  Within each partition, the items
+    keep their order in the data.
+
+    Attributes:
+        key: The function computing the affinity key of each item (or None
+            if the items are their own keys)
+        makespan: The total weight of the heaviest partition from the last
+            call (or None if the data was not indexable)
+        spread (int): The number of distinct (key, partition) pairs from the
+            last call, i.e., the number of times a key is seen by a
+            partition (or None if the data was not indexable)
+    """
+
+    _WEIGHTED = True
+
+    def __init__(self, key=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            key: A function computing the affinity key of each item.  If
+                None, the items themselves are the keys.
+        """
+        self.key = key
+        self.makespan = None
+        self.spread = None
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            self.makespan = None
+            self.spread = None
+            return [[data]] + [[] for _ in xrange(size - 1)]
+        return list(self.select(data, self.indices(data, size=size)))
+
+    @_accepts_mappings
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if the data is not indexable
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            self.makespan = None
+            self.spread = None
+            return None
+
+        weights = self._weights_of(data)
+        if weights is None:
+            items = data
+            weights = [1] * len(data)
+        else:
+            items = self._select_items(data, self._positions(weights))
+            if self._is_ndarray(weights):
+                weights = weights.tolist()
+
+        # Group the positions of the items by key, in order of appearance
+        groups = {}
+        keys = []
+        for (i, item) in enumerate(items):
+            k = item if self.key is None else self.key(item)
+            if k not in groups:
+                groups[k] = []
+                keys.append(k)
+            groups[k].append(i)
+
+        # Split the oversized groups, and assign the pieces greedily
+        limit = float(sum(weights)) / size
+        pieces = []
+        for k in keys:
+            for piece in self._split(groups[k], weights, limit):
+                pieces.append((sum(weights[i] for i in piece), k, piece))
+        pieces.sort(key=itemgetter(0), reverse=True)
+        heap = [(0, p) for p in xrange(size)]
+        parts = [[] for _ in xrange(size)]
+        seen = set()
+        for (weight, k, piece) in pieces:
+            (total, p) = heap[0]
+            heapreplace(heap, (total + weight, p))
+            parts[p].extend(piece)
+            seen.add((k, p))
+
+        self.makespan = max(total for (total, _) in heap)
+        self.spread = len(seen)
+        return [sorted(part) for part in parts]
+
+    @staticmethod
+    def _split(group, weights, limit):
+        """
+        Split a group that is heavier than the limit into contiguous pieces.
+
+        Parameters:
+            group (list): The positions of the items of the group
+            weights (list): The weight of each item of the data
+            limit (float): The largest total weight of a group kept whole
+
+        Returns:
+            list: The list of pieces (lists of positions) of the group
+        """
+        total = sum(weights[i] for i in group)
+        if total <= limit or len(group) < 2:
+            return [group]
+        npieces = min(len(group), int(-(-total // limit)))
+        share = float(total) / npieces
+        pieces = [[]]
+        filled = 0
+        for i in group:
+            if filled >= share * len(pieces) and len(pieces) < npieces:
+                pieces.append([])
+            pieces[-1].append(i)
+            filled += weights[i]
+        return pieces
+
+
+#==============================================================================
+# Rebalance -
+# Move only the surplus items from overloaded parts to underloaded parts
+#==============================================================================
+class Rebalance(PartitionFunction):
+
+    """
+    Repartition data that is already partitioned, moving as little as possible.
+
+    The data is the list of the current parts (one for each partition),
+    where each part is a list of items, or of (item, weight) pairs (for
+    example, the remaining tasks on each rank, with estimates of how long
+    each will take).  Unweighted items are given a weight of 1.  Each part
+    has a target total weight (the average total weight or, if capacities
+    are given, a share of the total weight in proportion to the capacity of
+    its partition), and only the 'surplus' items of the parts heavier than
+    their targets are moved.
+
+    The surplus items are taken from the end of each overloaded part (which,
+    for a list of tasks, are the last to be started), skipping any item
+    whose move would leave the part further from its target than before.
+    The surplus items are then put, from heaviest to lightest, into the
+    underloaded part furthest below its target.
+
+    The new parts keep the form of the current parts (so (item, weight)
+    pairs stay pairs, ready to be rebalanced again).  The items kept in each
+    part keep their order, and the items moved into it are added at the end.
+
+    Attributes:
+        capacities (list): The capacity of each partition (or None if all
+            partitions are identical)
+    """
+
+    def __init__(self, capacities=None):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            capacities (list): The capacity of each partition, such as the
+                relative speed of the rank that holds it.  If None, all
+                partitions are identical.
+        """
+        self.capacities = capacities
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The list of the current parts
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    def plan(self, data, size=1):
+        """
+        Compute all of the new parts of the data in a single pass.
+
+        Parameters:
+            data: The list of the current parts
+
+        Keyword Arguments:
+            size (int): The number of partitions (the number of current
+                parts)
+
+        Returns:
+            list: The list of all size new parts of the data, in index order
+
+        Raises:
+            ValueError: If the number of current parts is not size
+        """
+        self._check_size(size)
+
+        parts = [list(part) for part in data]
+        moved = [set() for _ in parts]
+        received = [[] for _ in parts]
+        for (source, dest, positions) in self.moves(
+                [self._part_weights(part) for part in parts], size):
+            moved[source].update(positions)
+            received[dest].extend(parts[source][i] for i in positions)
+        return [[x for (i, x) in enumerate(part) if i not in moved[k]] +
+                received[k] for (k, part) in enumerate(parts)]
+
+    @staticmethod
+    def _part_weights(part):
+        """
+        Get the weight of each item of a part.
+
+        Parameters:
+            part (list): A list of items, or of (item, weight) pairs
+
+        Returns:
+            list: The weight of each item (1, for unweighted items)
+        """
+        weights = PartitionFunction._weights_of(part)
+        if weights is None:
+            return [1] * len(part)
+        elif PartitionFunction._is_ndarray(weights):
+            return weights.tolist()
+        else:
+            return list(weights)
+
+    def targets(self, loads, size=1):
+        """
+        Compute the target total weight of each part.
+
+        Parameters:
+            loads (list): The current total weight of each part
+
+        Keyword Arguments:
+            size (int): The number of partitions
+
+        Returns:
+            list: The target total weight of each part
+
+        Raises:
+            ValueError: If the number of loads is not size
+        """
+        if len(loads) != size:
+            err_msg = ('Loads given for {0} partitions, but {1} partitions '
+                       'requested').format(len(loads), size)
+            raise ValueError(err_msg)
+        capacities = self._capacity_list(self.capacities, size)
+        if capacities is None:
+            capacities = [1] * size
+        scale = float(sum(loads)) / sum(capacities)
+        return [scale * c for c in capacities]
+
+    def moves(self, weights, size=1):
+        """
+        Compute the moves of the surplus items from part to part.
+
+        Only the weights of the items of the overloaded parts are needed, so
+        the weights of any other part may be replaced by a list with the
+        total weight of the part as its only weight.
+
+        Parameters:
+            weights (list): The list of the weights of the items of each
+                current part
+
+        Keyword Arguments:
+            size (int): The number of partitions
+
+        Returns:
+            list: A list of (source, dest, positions) tuples, sorted by
+                source and then dest, where positions is the sorted list of
+                the positions (in the source part) of the items moved from
+                the source part to the dest part
+
+        Raises:
+            ValueError: If the number of parts is not size
+        """
+        self._check_size(size)
+
+        loads = [sum(w) for w in weights]
+        targets = self.targets(loads, size)
+
+        # Take the surplus items from the end of each overloaded part
+        surplus_items = []
+        for k in xrange(size):
+            surplus = loads[k] - targets[k]
+            for i in reversed(xrange(len(weights[k]))):
+                if surplus <= 0:
+                    break
+                if 0 < weights[k][i] < 2 * surplus:
+                    surplus_items.append((weights[k][i], k, i))
+                    surplus -= weights[k][i]
+
+        # Put each surplus item into the most underloaded part
+        heap = [(loads[k] - targets[k], k) for k in xrange(size)
+                if loads[k] < targets[k]]
+        heapify(heap)
+        destinations = {}
+        surplus_items.sort(key=itemgetter(0), reverse=True)
+        for (weight, source, i) in surplus_items:
+            if not heap:
+                break
+            (excess, dest) = heap[0]
+            heapreplace(heap, (excess + weight, dest))
+            destinations.setdefault((source, dest), []).append(i)
+        return [(source, dest, sorted(destinations[(source, dest)]))
+                for (source, dest) in sorted(destinations)]
+
+
+#==============================================================================
+# StreamPartition -
+# Base class for partitioning functions that route items from an iterator
+#==============================================================================
+class StreamPartition(PartitionFunction):
+
+    """
+    The base-class for partitioning functions that stream items from iterators.
+
+    A StreamPartition object has a stream method that consumes an iterator
+    (or any other iterable object) once, and yields each item together with
+    the index of the partition it is routed to, as soon as the item is read.
+    The items never have to be held in memory all at once, so (for example)
+    a directory walk or a file of records can be partitioned on the fly.
+    The SimpleCommMPI *partition* method uses the stream method to send
+    items to the ranks in batches, as they are read.
+
+    The __call__ and plan methods consume the iterator to build the parts,
+    so (like any other use of an iterator) they can be called only once for
+    the same iterator.  If the data is not iterable, then it will return the
+    data for index=0 only, and an empty list otherwise.
+
+    Attributes:
+        batch (int): The number of items to send to a rank in each message
+    """
+
+    def __init__(self, batch=64):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            batch (int): The number of items to send to a rank in each
+                message, when used with the SimpleCommMPI partition method
+        """
+        self.batch = batch
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    @_accepts_mappings
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if not self._is_iterable(data):
+            return [[data]] + [[] for _ in xrange(size - 1)]
+        parts = [[] for _ in xrange(size)]
+        for (k, item) in self.stream(data, size):
+            parts[k].append(item)
+        return parts
+
+    @staticmethod
+    def _is_iterable(data):
+        """
+        Check if the data object is iterable.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            bool: True, if data is an iterable object. False, otherwise.
+        """
+        try:
+            iter(data)
+        except TypeError:
+            return False
+        return True
+
+    @abstractmethod
+    def stream(self, data, size=1):
+        """
+        Route each item of the data to a partition, as it is read.
+
+        Parameters:
+            data: An iterable object
+
+        Keyword Arguments:
+            size (int): The number of partitions
+
+        Returns:
+            An iterator over (partition index, item) tuples
+        """
+        return
+
+
+#==============================================================================
+# StreamRoundRobin -
+# Route the items of an iterator to partitions in turn
+#==============================================================================
+class StreamRoundRobin(StreamPartition):
+
+    """
+    Partition the items of an iterator by dealing them out in turn.
+
+    The k-th item read is routed to partition k modulo the number of
+    partitions, so the partitions have equal lengths (to within one item)
+    and hold the same items as with the EqualStride partitioning function.
+    """
+
+    def stream(self, data, size=1):
+        """
+        Route each item of the data to a partition, as it is read.
+
+        Parameters:
+            data: An iterable object
+
+        Keyword Arguments:
+            size (int): The number of partitions
+
+        Returns:
+            An iterator over (partition index, item) tuples
+        """
+        self._check_size(size)
+
+        k = 0
+        for item in data:
+            yield (k, item)
+            k = k + 1 if k + 1 < size else 0
+
+
+#==============================================================================
+# StreamWeightBalanced -
+# Route the items of an iterator to the partition with the least weight
+#==============================================================================
+class StreamWeightBalanced(StreamPartition):
+
+    """
+    Partition the items of an iterator by balancing their estimated weight.
+
+    Each item is routed, as soon as it is read, to the partition with the
+    smallest total weight so far (the lowest index, in case of a tie).  The
+    weight of each item is estimated with the weight function (for example,
+    the size of a file), or, if no weight function is given, the items must
+    be (item, weight) pairs, and only the item in each pair is routed.
+
+    Since the items are not sorted first (as in the WeightBalanced
+    partitioning function), the balance is not as good, but the routing
+    needs only O(P) memory and O(log P) time for each item.
+
+    Attributes:
+        weight: The function estimating the weight of each item (or None
+            if the items are (item, weight) pairs)
+    """
+
+    _WEIGHTED = True
+
+    def __init__(self, weight=None, batch=64):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            weight: A function estimating the weight of each item.  If None,
+                the items must be (item, weight) pairs.
+            batch (int): The number of items to send to a rank in each
+                message, when used with the SimpleCommMPI partition method
+        """
+        super(StreamWeightBalanced, self).__init__(batch=batch)
+        self.weight = weight
+
+    def _mapping_items(self, data):
+        """
+        Get the items to partition in place of a mapping.
+
+        Parameters:
+            data: A mapping
+
+        Returns:
+            list: The list of keys, if there is a weight function.  A list
+                of (key, weight) pairs, otherwise (see the PartitionFunction
+                _mapping_items method).
+        """
+        if self.weight is None:
+            return super(StreamWeightBalanced, self)._mapping_items(data)
+        else:
+            return self._mapping_keys(data)
+
+    def stream(self, data, size=1):
+        """
+        Route each item of the data to a partition, as it is read.
+
+        Parameters:
+            data: An iterable object
+
+        Keyword Arguments:
+            size (int): The number of partitions
+
+        Returns:
+            An iterator over (partition index, item) tuples
+        """
+        self._check_size(size)
+
+        heap = [(0, k) for k in xrange(size)]
+        for item in data:
+            if self.weight is None:
+                (item, weight) = item
+            else:
+                weight = self.weight(item)
+            (total, k) = heap[0]
+            heapreplace(heap, (total + weight, k))
+            yield (k, item)
+
+
+#==============================================================================
+# Cached -
+# Remember the parts computed by another partitioning function
+#==============================================================================
+class Cached(PartitionFunction):
+
+    """
+    Remember the parts computed by another partitioning function.
+
+    The positions of the items of each part (or, if the partitioning
+    function cannot compute them, the parts themselves) are remembered for
+    each data and number of partitions, so that partitioning the same data
+    again (for example, in a later phase of the same job) skips the work of
+    the partitioning function.  The data is identified by its fingerprint
+    (see the fingerprint function), so equal data is found in the cache even
+    if it is a different object.
+
+    At most maxsize results are kept in memory, and the least recently used
+    result is dropped first.  If a directory is given, every result is also
+    saved to a file in that directory, and results not in memory are looked
+    for there, so that a restarted job can skip the planning step.  The file
+    names include a fingerprint of the class and the configuration of the
+    partitioning function (the attributes set from its constructor
+    arguments, but not those describing its last call, like its makespan),
+    so results of differently configured partitioning functions are kept
+    apart, whether or not the function was used before it was wrapped.
+    (If the attributes cannot be pickled, like a key function defined with a lambda, only the
+    class is used, and the directory should not be shared with differently
+    configured partitioning functions of the same class.)
+
+    The data must be picklable (or made of Numpy NDArrays), and data that is
+    not indexable is passed directly to the partitioning function.  On a
+    cache hit, attributes of the partitioning function that describe the
+    last call (like its makespan) are not updated.
+
+    Attributes:
+        func: The wrapped partitioning function
+        maxsize (int): The largest number of results kept in memory
+        directory (str): The directory in which the results are saved (or
+            None if they are kept only in memory)
+        hits (int): The number of calls that found their result
+        misses (int): The number of calls that computed their result
+    """
+
+    def __init__(self, func, maxsize=128, directory=None):
+        """
+        Constructor.
+
+        Parameters:
+            func: The partitioning function to wrap
+
+        Keyword Arguments:
+            maxsize (int): The largest number of results kept in memory
+            directory (str): The directory in which to save the results.
+                If None, the results are kept only in memory.
+        """
+        self.func = func
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        try:
+            config = self._config(func)
+            self._name = fingerprint((type(func).__name__, config))
+        except Exception:
+            self._name = fingerprint(type(func).__name__)
+
+    @staticmethod
+    def _config(func):
+        """
+        Get the configuration of a partitioning function.
+
+        The configuration is the value of each attribute named like an
+        argument of the constructor of the partitioning function (such as
+        its capacities, time_limit, curve, bits, or key), so attributes that
+        describe the last call (like its makespan, loads, or spread) are not
+        included.
+
+        Parameters:
+            func: The partitioning function
+
+        Returns:
+            list: The sorted list of (name, value) pairs of the configuration
+        """
+        try:
+            names = getargspec(type(func).__init__).args[1:]
+        except TypeError:
+            names = []
+        return sorted((k, getattr(func, k)) for k in names
+                      if hasattr(func, k))
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Define the common interface for all partitioning functions.
+
+        The abstract base class implements the check on the input for correct
+        format and typing.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            index (int): A partition index into a part of the data
+            size (int): The largest number of partitions allowed
+
+        Returns:
+            The indexed part of the data, assuming the data is divided into
+            size parts.
+        """
+        self._check_types(data, index, size)
+
+        return self.plan(data, size=size)[index]
+
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data in a single pass.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return self._plan(data, size)
+        (kind, result) = self._lookup(data, size)
+        if kind == 'indices':
+            return list(self.select(data, result))
+        else:
+            return result
+
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Keyword Arguments:
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The positions of the items of each of the size parts, in
+                index order, or None if they cannot be computed
+        """
+        self._check_size(size)
+
+        if not self._is_indexable(data):
+            return None
+        (kind, result) = self._lookup(data, size)
+        return result if kind == 'indices' else None
+
+    def select(self, data, indices):
+        """
+        Take the parts of the data given the positions of their items.
+
+        Parameters:
+            data: The data to be partitioned
+            indices (list): The positions of the items of each part, as
+                returned by the indices method
+
+        Returns:
+            An iterator over the parts of the data, in index order
+        """
+        if hasattr(self.func, 'select'):
+            return self.func.select(data, indices)
+        else:
+            return super(Cached, self).select(data, indices)
+
+    def _item_weights(self, data):
+        """
+        Get the weights of the items, as the wrapped function reads them.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            The weights of the items (see the PartitionFunction _item_weights
+            method), or None if the data is not weighted
+        """
+        if isinstance(self.func, PartitionFunction):
+            return self.func._item_weights(data)
+        return super(Cached, self)._item_weights(data)
+
+    def clear(self):
+        """
+        Forget the results kept in memory (but not those saved to files).
+        """
+        self._results.clear()
+
+    def _plan(self, data, size):
+        """
+        Compute all of the parts of the data with the partitioning function.
+
+        Parameters:
+            data: The data to be partitioned
+            size (int): The number of partitions to make
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        if hasattr(self.func, 'plan'):
+            return self.func.plan(data, size)
+        else:
+            return [self.func(data, i, size) for i in xrange(size)]
+
+    def _lookup(self, data, size):
+        """
+        Find (or compute and remember) the result for the data and size.
+
+        Parameters:
+            data: The data to be partitioned
+            size (int): The number of partitions to make
+
+        Returns:
+            tuple: The kind of result ('indices' or 'plan') and the
+                positions of the items of each part, or the parts
+        """
+        key = (fingerprint(data), size)
+        if key in self._results:
+            result = self._results.pop(key)
+            self.hits += 1
+        else:
+            result = self._load(key)
+            if result is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                indices = None
+                if hasattr(self.func, 'indices'):
+                    indices = self.func.indices(data, size)
+                if indices is not None:
+                    result = ('indices', indices)
+                else:
+                    result = ('plan', self._plan(data, size))
+                self._save(key, result)
+        self._results[key] = result
+        while len(self._results) > max(self.maxsize, 0):
+            self._results.popitem(last=False)
+        return result
+
+    def _filename(self, key):
+        """
+        Get the name of the file in which a result is saved.
+
+        Parameters:
+            key (tuple): The fingerprint of the data and the size
+
+        Returns:
+            str: The name of the file
+        """
+        name = '{0:015x}-{1:015x}-{2}.pkl'.format(self._name, key[0], key[1])
+        return os.path.join(self.directory, name)
+
+    def _load(self, key):
+        """
+        Load a saved result, if any.
+
+        Parameters:
+            key (tuple): The fingerprint of the data and the size
+
+        Returns:
+            tuple: The saved result, or None if there is no saved result
+        """
+        if self.directory is None:
+            return None
+        filename = self._filename(key)
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'rb') as f:
+            return load(f)
+
+    def _save(self, key, result):
+        """
+        Save a result to a file, if a directory was given.
+
+        The result is first written to a temporary file, which then replaces
+        the file, so that the file is never left half-written.
+
+        Parameters:
+            key (tuple): The fingerprint of the data and the size
+            result (tuple): The result to save
+        """
+        if self.directory is None:
+            return
+        filename = self._filename(key)
+        tmpname = '{0}.{1}.tmp'.format(filename, os.getpid())
+        with open(tmpname, 'wb') as f:
+            dump(result, f, HIGHEST_PROTOCOL)
+        os.rename(tmpname, filename)
+
+
+#==============================================================================
+# fingerprint - A fast, stable hash of the data to be partitioned
+#==============================================================================
+def fingerprint(data):
+    """
+    Compute a fingerprint of the data to be partitioned.
+
+    The fingerprint is the same in every process (and every run) for equal
+    data.  Numpy NDArrays are hashed directly from their memory (with their
+    dtype and shape), tuples are hashed element by element, mappings are
+    hashed key by key (in a stable order), and any other data is hashed from
+    its pickled form.
+
+    Parameters:
+        data: The data to be partitioned (which must be picklable)
+
+    Returns:
+        int: The fingerprint of the data, between 0 and 2^60 - 1
+    """
+    digest = md5()
+    _update_digest(digest, data)
+    return int(digest.hexdigest()[:15], 16)
+
+
+def _update_digest(digest, data):
+    """
+    Add the data to a hash digest.
+
+    Parameters:
+        digest: The hashlib object to update
+        data: The data to be hashed
+    """
+    if PartitionFunction._is_ndarray(data) and data.dtype != object:
+        digest.update('ndarray:{0}:{1}:'.format(data.dtype.str, data.shape))
+        digest.update(numpy.ascontiguousarray(data).data)
+    elif type(data) is tuple:
+        digest.update('tuple:{0}:'.format(len(data)))
+        for x in data:
+            _update_digest(digest, x)
+    elif PartitionFunction._is_mapping(data):
+        digest.update('mapping:{0}:'.format(len(data)))
+        for k in PartitionFunction._mapping_keys(data):
+            _update_digest(digest, k)
+            _update_digest(digest, data[k])
+    else:
+        digest.update(dumps(data, HIGHEST_PROTOCOL))
+
+
+#==============================================================================
+# evaluate - Measure the quality of a partition before using it
+#==============================================================================
+def _part_positions(index, length):
+    """
+    Get the integer positions of the items of a part, given its index.
+
+    Parameters:
+        index: A slice, or a list (or Numpy NDArray) of integer positions
+        length (int): The length of the data
+
+    Returns:
+        A list (or Numpy NDArray) of integer positions
+    """
+    if isinstance(index, slice):
+        return range(*index.indices(length))
+    else:
+        return index
+
+
+def _part_length(part):
+    """
+    Get the number of items in a part.
+
+    Parameters:
+        part: A part of the data
+
+    Returns:
+        int: The number of elements of a block (like those made by the
+            BlockND partitioning function), or the length of any other part
+            (or 1, if it has no length)
+    """
+    if type(part) is tuple and len(part) == 2 and type(part[0]) is tuple:
+        return part[1].size
+    elif hasattr(part, '__len__'):
+        return len(part)
+    else:
+        return 1
+
+
+def _weight_row(weight):
+    """
+    Get the components of the weight of an item.
+
+    Parameters:
+        weight: A number, or a sequence of numbers (for vector weights)
+
+    Returns:
+        list: The components of the weight
+    """
+    return list(weight) if hasattr(weight, '__len__') else [weight]
+
+
+def _component_sums(weights, ndim):
+    """
+    Sum each component of the weights of the items of a part.
+
+    Parameters:
+        weights: The weights of the items of the part
+        ndim (int): The number of components of each weight
+
+    Returns:
+        list: The total of each component of the weights
+    """
+    rows = [_weight_row(w) for w in weights]
+    return [sum(r[d] for r in rows) for d in xrange(ndim)]
+
+
+def _stream_indices(func, data, size):
+    """
+    Get the positions of the items routed to each part by a stream method.
+
+    Parameters:
+        func: The partitioning function, with a stream method
+        data: The indexable data to be partitioned
+        size (int): The number of partitions
+
+    Returns:
+        list: The list of the positions of the items of each part
+    """
+    indices = [[] for _ in xrange(size)]
+    for (i, (k, _)) in enumerate(func.stream(data, size)):
+        indices[k].append(i)
+    return indices
+
+
+def evaluate(func, data, size=1, weight=None, capacities=None):
+    """
+    Measure the quality of the partition of some data, without using it.
+
+    The data is partitioned with the partitioning function, and the number
+    of items and the total weight of each part are computed.  If the data is
+    weighted (i.e., it is a list of (item, weight) pairs, or an (items,
+    weights) tuple, or a mapping with numeric values), the weights are taken
+    from the data, as the partitioning function reads them (so, for
+    example, the weights of an (items, coords, weights) tuple given to the
+    SpaceFillingCurve partitioning function are used).  Otherwise, the
+    weight of each item (or each key of a mapping) is given by the weight
+    function or, if no weight function is given, is 1.
+
+    Wherever possible, only the positions of the items of each part are
+    computed (with the indices method of the partitioning function), and
+    the total weights are summed with Numpy, without building the parts.
+
+    The 'imbalance' is the ratio of the largest total weight of a part to
+    the mean total weight (1.0 is perfect balance), and the predicted
+    'makespan' is the largest total weight of a part, divided by the
+    capacity of its part, if capacities are given (or if the partitioning
+    function has capacities).
+
+    If the items have vector weights with more than one component (like
+    those given to the MultiConstraint partitioning function), the total
+    weights of each part, and the 'min', 'mean', and 'max' total weights,
+    are lists with one value for each component, and the 'imbalance' and
+    'makespan' are those of the bottleneck component (i.e., the largest
+    over the components).
+
+    If the partitioning function streams the items (like the
+    StreamWeightBalanced partitioning function), the positions of the items
+    are found by streaming the data once.  If the partitioning function
+    returns parts without the weights of their items, but cannot compute
+    their positions, each item is given a weight of 1.
+
+    Parameters:
+        func: The partitioning function
+        data: The data to be partitioned
+
+    Keyword Arguments:
+        size (int): The number of partitions to make
+        weight: A function returning the weight of an unweighted item (or
+            None for a weight of 1)
+        capacities (list): The capacity of each partition (or None to use
+            the capacities of the partitioning function, if any)
+
+    Returns:
+        dict: A dictionary with the number of items in each part ('counts'),
+            the total weight of each part ('weights'), the 'min', 'mean',
+            and 'max' total weight of a part, the number of 'empty' parts,
+            the 'imbalance', and the predicted 'makespan'
+    """
+    PartitionFunction._check_size(size)
+
+    if capacities is None:
+        try:
+            capacities = PartitionFunction._capacity_list(
+                getattr(func, 'capacities', None), size)
+        except (ValueError, TypeError):
+            capacities = None
+        if capacities and not all(isinstance(c, Number) for c in capacities):
+            capacities = None
+    else:
+        capacities = PartitionFunction._capacity_list(capacities, size)
+
+    if weight is not None:
+        weights = None
+    elif isinstance(func, PartitionFunction):
+        weights = func._item_weights(data)
+    elif PartitionFunction._is_mapping(data):
+        weights = PartitionFunction._mapping_weights(data)
+    else:
+        weights = PartitionFunction._weights_of(data)
+    indices = None
+    if hasattr(func, 'indices') and (weight is None or weights is not None):
+        indices = func.indices(data, size)
+    if indices is None and weights is not None and hasattr(func, 'stream') \
+            and not PartitionFunction._is_mapping(data):
+        indices = _stream_indices(func, data, size)
+    if indices is not None and all(not isinstance(i, tuple) for i in indices):
+        length = len(data[0]) if type(data) is tuple else len(data)
+        positions = [_part_positions(index, length) for index in indices]
+        counts = [len(p) for p in positions]
+        if weights is None:
+            sums = [[c] for c in counts]
+        elif numpy is not None:
+            rows = numpy.asarray(weights, dtype=float)
+            rows = rows.reshape(len(rows), -1)
+            ids = numpy.repeat(numpy.arange(size), counts)
+            pos = numpy.concatenate([numpy.asarray(p, dtype=int)
+                                     for p in positions] or [[]])
+            sums = numpy.zeros((size, rows.shape[1]))
+            numpy.add.at(sums, ids, rows[pos.astype(int)])
+            sums = sums.tolist()
+        else:
+            ndim = len(_weight_row(weights[0])) if len(weights) else 1
+            sums = [_component_sums([weights[i] for i in p], ndim)
+                    for p in positions]
+    else:
+        if hasattr(func, 'plan'):
+            parts = func.plan(data, size)
+        else:
+            parts = [func(data, i, size) for i in xrange(size)]
+        counts = [_part_length(p) for p in parts]
+        if weight is not None:
+            part_weights = [[weight(x) for x in p] for p in parts]
+        elif weights is not None and PartitionFunction._is_mapping(data):
+            part_weights = [p.values() for p in parts]
+        elif weights is not None and \
+                all(PartitionFunction._are_pairs(p) for p in parts):
+            part_weights = [[pair[1] for pair in p] for p in parts]
+        else:
+            part_weights = None
+        if part_weights is None:
+            sums = [[c] for c in counts]
+        else:
+            ndim = max([len(_weight_row(x)) for w in part_weights
+                        for x in w] or [1])
+            sums = [_component_sums(w, ndim) for w in part_weights]
+
+    components = zip(*sums)
+    means = [float(sum(c)) / size for c in components]
+    largests = [max(c) for c in components]
+    imbalances = [l / m if m > 0 else 1.0 for (l, m) in zip(largests, means)]
+    if capacities is None:
+        makespans = largests
+    else:
+        makespans = [max(float(t) / c for (t, c) in zip(comp, capacities))
+                     for comp in components]
+    if len(components) > 1:
+        totals = sums
+        smallest = [min(c) for c in components]
+        mean = means
+        largest = largests
+    else:
+        totals = [t[0] for t in sums]
+        smallest = min(totals)
+        mean = means[0]
+        largest = largests[0]
+    return {'counts': counts,
+            'weights': totals,
+            'min': smallest,
+            'mean': mean,
+            'max': largest,
+            'empty': sum(1 for c in counts if c == 0),
+            'imbalance': max(imbalances),
+            'makespan': max(makespans)}
+
+
+def compare(funcs, data, size=1, weight=None, capacities=None):
+    """
+    Compare the quality of the partitions of the same data.
+
+    Each partitioning function is evaluated (see the evaluate function) on
+    the same data, and the results are sorted from best to worst, by their
+    predicted makespan and then by their imbalance.  (The data must be
+    indexable, since it is partitioned once for each function.)
+
+    Parameters:
+        funcs (list): The partitioning functions to compare
+        data: The data to be partitioned
+
+    Keyword Arguments:
+        size (int): The number of partitions to make
+        weight: A function returning the weight of an unweighted item (or
+            None for a weight of 1)
+        capacities (list): The capacity of each partition (or None to use
+            the capacities of each partitioning function, if any)
+
+    Returns:
+        list: A list of (function, report) pairs, from best to worst, where
+            each report is the dictionary returned by the evaluate function
+    """
+    reports = [(func, evaluate(func, data, size=size, weight=weight,
+                               capacities=capacities)) for func in funcs]
+    reports.sort(key=lambda r: (r[1]['makespan'], r[1]['imbalance']))
+    return reports
@@ -36,6 +36,39 @@ master will take a part of the data for itself.  If the 'manager' is
 *Partitioning* is a *synchronous* communication call that implements a
 *static partitioning* algorithm.
 
+By default, the 'manager' rank sends each part directly to the 'worker' rank
+that owns it, so the time to partition grows linearly with the number of
+ranks.  If a *fanout* is given, the parts are instead forwarded down a
+*k-ary tree* of ranks rooted at the 'manager' rank.  Each rank in the tree
+receives the parts for all of the ranks beneath it from its parent, keeps
+its own part, and forwards the rest to its children.  The number of
+sequential message steps then grows only logarithmically with the number of
+ranks.
+
+If every rank can build the same data cheaply (for example, from the same
+configuration file), the *partition* method can instead be called with
+*local* set to True.  Each rank then computes its own part, with no messages
+at all.  (With *verify* also set to True, a cheap reduction of a fingerprint
+of the data checks that every rank was given the same data.)
+
+If the partition function has a *stream* method (like the StreamPartition
+functions), the data can be any iterator, such as a generator reading
+records from a file.  The 'manager' rank reads the iterator only once,
+routes each item to its rank as it is read, and sends the items in batches,
+so the full list of items is never held in memory.
+
+Long lists (or tuples) of plain ints, floats, or strings are *packed into
+columns* before they are sent by the *partition*, *ration*, and *collect*
+methods.  Numbers are sent as a single Numpy NDArray buffer, and strings are
+sent as one contiguous (UTF-8) byte buffer together with an array of the
+offsets of each string, instead of being pickled item by item.  The
+receiving rank rebuilds the original list (or tuple), unless the
+SimpleCommMPI object was created with *unpack* set to False (see the
+*create_comm* function), in which case a packed list is received as a 1D
+Numpy NDArray of its numbers or strings.  Short lists (of fewer than
+COLUMNAR_MIN items) and lists of mixed types are never packed, so they are
+always received as lists (or tuples).
+
 **RATIONING:**
 
 An alternative approach to the *partitioning* communication method is the
@@ -72,6 +105,92 @@ The *collect* method is a *handshake* method, meaning that while the 'manager'
 rank doesn't care which 'worker' rank sends it data, the 'manager' rank does
 acknowledge the 'worker' rank and record the 'worker' rank's identity.
 
+If a *fanout* is given, the *collect* method becomes *synchronous*.  Every
+rank makes exactly one *collect* call, and the data is merged up the same
+*k-ary tree* used for *partitioning*.  The 'manager' rank receives a list of
+the (rank, data) tuples from every 'worker' rank in a single call.
+
+**SPECULATING:**
+
+When the work is a list of independent tasks, the *speculate* method hands
+the tasks out to the 'worker' ranks one at a time (like *rationing*), applies
+a given function to each task on the 'worker' ranks, and returns the results
+to the 'manager' rank in task order (like *collecting*).  The 'manager' rank
+uses a *TaskTracker* to record when each task was dispatched and how long the
+completed tasks took.  When a 'worker' rank becomes idle and there are no new
+tasks left, any task that has been running for longer than a deadline (a
+percentile of the completed task durations, times a safety factor) is issued
+again to the idle 'worker' rank.  The first result for each task wins, and
+duplicate results are discarded.  The 'manager' rank returns as soon as every
+task has a result, and the 'worker' ranks still running a superseded copy
+return as soon as that copy finishes.
+
+*Speculating* is a *synchronous* communication call (all ranks must make
+the call) that implements a *dynamic partitioning* algorithm.
+
+**MAPPING:**
+
+The most common use of *partitioning* and *collecting* is to apply a function
+to every item of a list and gather the results, in order, on the 'manager'
+rank.  The *map* method does exactly this.  Each item is tagged with its
+position in the data before the data is partitioned (with any *partition
+function*), so the results can be put back in their original order on the
+'manager' rank in a single pass, whichever rank computed them.
+
+*Mapping* is a *synchronous* communication call (all ranks must make the
+call).
+
+**STEALING:**
+
+The *steal* method starts like *partitioning*: the data on the 'manager'
+rank is partitioned across the ranks with a *partition function*.  Each rank
+then applies a given function to each item of its own part.  When a rank
+runs out of work, it asks the other ranks, in random order, for half of
+their remaining items, and continues working on whatever it receives.  A
+rank that finds no work left to steal waits for all of the other ranks to
+finish, while still answering their requests.  All of the load-balancing is
+done directly between the ranks, without involving the 'manager' rank.
+
+*Stealing* is a *synchronous* communication call (all ranks must make the
+call) that implements a *dynamic partitioning* algorithm.
+
+**SORTING:**
+
+When the data is already distributed across the ranks, the *sort* method
+sorts it in parallel, so that each rank ends up with a sorted part of all
+of the data, every item on one rank is no greater than any item on the next
+rank, and the parts have roughly equal lengths.  The splitters between the
+parts are chosen from a regular sample of the sorted data on every rank,
+and the parts are exchanged between all of the ranks at once.
+
+*Sorting* is a *synchronous* communication call (all ranks must make the
+call).
+
+**REBALANCING:**
+
+When the work given to each rank by *partitioning* turns out to be badly
+balanced (for example, because the weights were only estimates), the ranks
+can call the *rebalance* method at a checkpoint, each with its own list of
+remaining items (or (item, weight) pairs, with updated estimates of the
+remaining work).  Every rank computes the same plan (with a Rebalance
+partition function), and only the surplus items of the overloaded ranks are
+sent, directly to the underloaded ranks, without passing through the
+'manager' rank.
+
+*Rebalancing* is a *synchronous* communication call (all ranks must make
+the call).
+
+**CALIBRATING:**
+
+When the ranks run on different kinds of nodes or cores, some ranks finish
+the same work sooner than others.  The *calibrate* method times a short
+kernel on every rank and returns the relative speed of each rank, which can
+be given as the *capacities* of a partition function (like WeightBalanced
+or EqualLength), so that each rank receives work in proportion to its speed.
+
+*Calibrating* is a *synchronous* communication call (all ranks must make
+the call).
+
 **REDUCING:**
 
 In general, it is assumed that each 'worker' rank works independently from the
@@ -119,7 +238,14 @@ See the LICENSE.txt file for details
 """
 
 from functools import partial
-from collections import defaultdict
+from itertools import chain, izip
+from collections import defaultdict, deque
+from random import shuffle
+from time import time, sleep
+from bisect import insort
+
+from partition import PartitionFunction, EqualStride, RangePartition
+from partition import Rebalance, fingerprint
 
 # Define the supported reduction operators
 OPERATORS = ['sum', 'prod', 'max', 'min']
@@ -144,10 +270,180 @@ _OP_MAP = {'sum': {'py': 'sum',
                    'mpi': 'MIN'}}
 
 
+#==============================================================================
+# _Indexed - An item of data tagged with its position in the data
+#==============================================================================
+class _Indexed(object):
+
+    """
+    An item of data tagged with its position in the original data.
+
+    This is deliberately not a tuple, so that a list of tagged items is not
+    mistaken for a list of (item, weight) pairs by the partition functions.
+
+    Attributes:
+        index (int): The position of the item in the original data
+        item: The item of data
+    """
+
+    __slots__ = ('index', 'item')
+
+    def __init__(self, index, item):
+        self.index = index
+        self.item = item
+
+
+def _index_items(data):
+    """
+    Tag each item of the data with its position in the data.
+
+    If the data is a list of (item, weight) pairs, the item in each pair is
+    tagged, so that weighted partition functions still see the weights.
+
+    Parameters:
+        data: An indexable object to be partitioned
+
+    Returns:
+        list: The list of tagged items (or tagged (item, weight) pairs)
+    """
+    if PartitionFunction._are_pairs(data):
+        return [(_Indexed(i, pair[0]), pair[1]) for i, pair in enumerate(data)]
+    else:
+        return [_Indexed(i, item) for i, item in enumerate(data)]
+
+
+def _unindex_item(tagged):
+    """
+    Split a tagged item (or tagged (item, weight) pair) from a partition.
+
+    Partition functions that balance weights return the tagged items alone,
+    while the others return the tagged (item, weight) pairs unchanged.
+
+    Parameters:
+        tagged: A tagged item, or a tagged (item, weight) pair
+
+    Returns:
+        tuple: The position of the item in the original data, and the item
+            (or the (item, weight) pair) as it would have been partitioned
+    """
+    if isinstance(tagged, _Indexed):
+        return tagged.index, tagged.item
+    else:
+        return tagged[0].index, (tagged[0].item, tagged[1])
+
+
+def _calibration_kernel(n=200000):
+    """
+    Run a short, CPU-bound loop of integer arithmetic.
+
+    Keyword Arguments:
+        n (int): The number of iterations of the loop
+
+    Returns:
+        int: The result of the loop
+    """
+    total = 0
+    for i in xrange(n):
+        total = (total + i * i) % 1000003
+    return total
+
+
+#==============================================================================
+# _Positioned - A part of the data with the positions of its items
+#==============================================================================
+class _Positioned(object):
+
+    """
+    A part of the data, with the positions of its items in the original data.
+
+    Attributes:
+        positions (list): The position of each item of the part
+        part: The part of the data
+    """
+
+    __slots__ = ('positions', 'part')
+
+    def __init__(self, positions, part):
+        self.positions = positions
+        self.part = part
+
+
+#==============================================================================
+# _MapPartition - Partition function wrapper used by the map method
+#==============================================================================
+class _MapPartition(object):
+
+    """
+    A partition function that also records where each item came from.
+
+    If the wrapped partition function can compute the positions of the items
+    of each part (with its indices method), each part is sent together with
+    the positions of its items, and the parts are taken directly from the
+    data.  Otherwise, each item of the data is tagged with its position
+    before the data is partitioned.
+
+    Attributes:
+        func: The wrapped partition function
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, data, index=0, size=1):
+        """
+        Get one part of the data, with the positions of its items.
+        """
+        return self.plan(data, size)[index]
+
+    def indices(self, data, size=1):
+        """
+        Compute the positions of the items of all of the parts of the data.
+
+        Returns:
+            list: The positions of the items of each of the size parts, or
+                None if they cannot be computed (or are not 1-dimensional)
+        """
+        if not hasattr(self.func, 'indices'):
+            return None
+        indices = self.func.indices(data, size)
+        if indices is None or any(type(i) is tuple for i in indices):
+            return None
+        return indices
+
+    def select(self, data, indices):
+        """
+        Take the parts of the data, with the positions of their items.
+
+        Returns:
+            An iterator over the _Positioned parts of the data
+        """
+        for (index, part) in izip(indices, self.func.select(data, indices)):
+            if isinstance(index, slice):
+                positions = range(index.start, index.stop, index.step)
+            else:
+                positions = list(index)
+            yield _Positioned(positions, part)
+
+    def plan(self, data, size=1):
+        """
+        Compute all of the parts of the data, with the positions of the items.
+
+        Returns:
+            list: The list of all size parts of the data, in index order
+        """
+        indices = self.indices(data, size)
+        if indices is not None:
+            return list(self.select(data, indices))
+        indexed = _index_items(data)
+        if hasattr(self.func, 'plan'):
+            return self.func.plan(indexed, size)
+        return [self.func(indexed, i, size) for i in xrange(size)]
+
+
 #==============================================================================
 # create_comm - Simple Communicator Factory Function
 #==============================================================================
-def create_comm(serial=False):
+def create_comm(serial=False, columnar=True, unpack=True):
     """
     This is a factory function for creating SimpleComm objects.
 
@@ -158,6 +454,12 @@ def create_comm(serial=False):
         serial (bool): A boolean flag with True indicating the desire for a
             serial SimpleComm instance, and False incidicating the
             desire for a parallel SimpleComm instance.
+        columnar (bool): Whether long lists (or tuples) of ints, floats, or
+            strings are packed into Numpy NDArray buffers before they are
+            sent (see SimpleCommMPI).  Ignored if serial is True.
+        unpack (bool): Whether received packed lists are rebuilt into lists
+            (or tuples), or left as Numpy NDArrays (see SimpleCommMPI).
+            Ignored if serial is True.
 
     Returns:
         SimpleComm: An instance of a SimpleComm object, either serial 
@@ -181,7 +483,7 @@ def create_comm(serial=False):
     if serial:
         return SimpleComm()
     else:
-        return SimpleCommMPI()
+        return SimpleCommMPI(columnar=columnar, unpack=unpack)
 
 
 #==============================================================================
@@ -358,7 +660,8 @@ class SimpleComm(object):
         else:
             return data
 
-    def partition(self, data=None, func=None, involved=False, tag=0):
+    def partition(self, data=None, func=None, involved=False, tag=0,
+                  fanout=None, local=False, verify=False):
         """
         Partition and send data from the 'manager' rank to 'worker' ranks.
 
@@ -386,18 +689,307 @@ class SimpleComm(object):
                 otherwise.
             tag (int): A user-defined integer tag to uniquely specify this
                 communication message.
+            fanout (int): If given, the number of children of each rank in
+                the tree used to forward the parts from the 'manager' rank.
+                If None, the 'manager' rank sends to every 'worker' rank
+                directly.
+            local (bool): If True, every rank is given the same data, and
+                each rank computes its own part, without any messages.
+            verify (bool): If True (and local is True), check that every
+                rank was given the same data.
 
         Returns:
             A (possibly partitioned) subset (i.e., part) of the data.  Depending
             on the PartitionFunction used (or if it is used at all), this method
             may return a different part on each rank.
         """
+        if func is None and PartitionFunction._is_mapping(data):
+            func = EqualStride()
         op = func if func else lambda *x: x[0][x[1]::x[2]]
         if involved:
             return op(data, 0, 1)
         else:
             return None
 
+    def map(self, func, data=None, partition=None, involved=False,
+            ordered=True, tag=0, fanout=None):
+        """
+        Apply a function to each item of the data across all ranks.
+
+        The data is partitioned across the ranks (see the *partition*
+        method), the function is applied to each item of each part, and the
+        results are collected on the 'manager' rank.  Each part is sent with
+        the positions of its items in the data (or, if the partition function
+        cannot compute the positions, each item is tagged with its position
+        before partitioning), so the results can be placed in the same order
+        as the data.  If there are no 'worker' ranks, the 'manager' rank is
+        always involved.
+
+        This call must be made by all ranks.
+
+        Parameters:
+            func: The function to apply to each item, called with the item
+                as its only argument
+
+        Keyword Arguments:
+            data: The indexable data to be mapped (needed only on the
+                'manager' rank)
+            partition: A PartitionFunction object/function used to partition
+                the data
+            involved (bool): True if a part of the data should be given to the
+                'manager' rank in addition to the 'worker' ranks. False
+                otherwise.
+            ordered (bool): True if the results should be returned in the
+                order of the data.  False if they may be returned in any
+                order.
+            tag (int): A user-defined integer tag to uniquely specify this
+                communication message.
+            fanout (int): If given, the number of children of each rank in
+                the tree used to partition the data and collect the results
+
+        Returns:
+            list: On the 'manager' rank, the list of results.  None on all
+                other ranks.
+        """
+        op = _MapPartition(partition if partition else EqualStride())
+        involved = involved or self.get_size() == 1
+        part = self.partition(data, func=op, involved=involved, tag=tag,
+                              fanout=fanout)
+        local = []
+        if isinstance(part, _Positioned):
+            local = [(index, func(item))
+                     for (index, item) in izip(part.positions, part.part)]
+        elif part is not None:
+            for tagged in part:
+                index, item = _unindex_item(tagged)
+                local.append((index, func(item)))
+
+        if self.get_size() == 1:
+            parts = [local]
+        elif fanout is not None:
+            parts = [p for (_, p) in self.collect(local, tag=tag,
+                                                  fanout=fanout) or []]
+            parts.append(local)
+        elif self.is_manager():
+            parts = [self.collect(tag=tag)[1]
+                     for _ in xrange(1, self.get_size())]
+            parts.append(local)
+        else:
+            self.collect(local, tag=tag)
+            return None
+
+        if not self.is_manager():
+            return None
+        elif ordered:
+            results = [None] * len(data)
+            for p in parts:
+                for (index, result) in p:
+                    results[index] = result
+            return results
+        else:
+            return [result for p in parts for (_, result) in p]
+
+    def speculate(self, func, data=None, percentile=90.0, factor=2.0, tag=0):
+        """
+        Apply a function to each task with speculative re-execution.
+
+        On the 'manager' rank, the tasks in the data are handed out one at a
+        time to the 'worker' ranks, which apply the function to each task and
+        send the results back.  Tasks that run for longer than a deadline are
+        issued again to idle 'worker' ranks, and the first result for each
+        task is kept.  In serial operation (or on a 1-rank communicator), the
+        function is simply applied to each task in turn.
+
+        This call must be made by all ranks.
+
+        Parameters:
+            func: The function to apply to each task, called with the task as
+                its only argument
+
+        Keyword Arguments:
+            data: The list of tasks (needed only on the 'manager' rank)
+            percentile (float): The percentile of the completed task
+                durations used to compute the deadline
+            factor (float): The factor multiplying the percentile duration
+                to give the deadline
+            tag (int): A user-defined integer tag to uniquely specify this
+                communication message
+
+        Returns:
+            list: On the 'manager' rank, the results of the function applied
+                to each task, in the order of the tasks.  None on all other
+                ranks.
+        """
+        if self.is_manager():
+            return [func(task) for task in data]
+        else:
+            return None
+
+    def steal(self, func, data=None, partition=None, involved=False, tag=0):
+        """
+        Apply a function to each item of partitioned data with work stealing.
+
+        The data is first partitioned across the ranks (see the *partition*
+        method).  Each rank then applies the function to each item of its
+        part.  When a rank runs out of items, it steals half of the remaining
+        items of another rank, until no rank has any items left.
+
+        This call must be made by all ranks.
+
+        Parameters:
+            func: The function to apply to each item, called with the item
+                as its only argument
+
+        Keyword Arguments:
+            data: The data to be partitioned across the ranks in the
+                communicator.
+            partition: A PartitionFunction object/function used to initially
+                partition the data
+            involved (bool): True if a part of the data should be given to the
+                'manager' rank in addition to the 'worker' ranks. False
+                otherwise.
+            tag (int): A user-defined integer tag to uniquely specify this
+                communication message.
+
+        Returns:
+            list: A list of (item, result) tuples, one for each item whose
+                result was computed on this rank, in the order computed
+        """
+        part = self.partition(data, func=partition, involved=involved,
+                              tag=tag)
+        if part is None:
+            return []
+        return [(item, func(item)) for item in part]
+
+    def sort(self, data=None, key=None):
+        """
+        Sort data distributed across all of the ranks.
+
+        Each rank gives its own (local) data, and each rank gets back a
+        sorted part of the data from all of the ranks.  Every item on rank i
+        is less than (or equal to) every item on rank i + 1, and the parts
+        have roughly equal lengths.
+
+        This call must be made by all ranks.
+
+        Keyword Arguments:
+            data: The local data on this rank (a list or a 1D Numpy NDArray)
+            key: A function computing the key of each item, by which the
+                items are sorted.  If None, the items themselves are sorted.
+
+        Returns:
+            The sorted part of the data on this rank (a Numpy NDArray, if the
+            data on every rank is a 1D Numpy NDArray and there is no key
+            function, or a list otherwise)
+        """
+        return self._local_sort(data, key)
+
+    def _local_sort(self, data, key):
+        """
+        Sort the data on this rank (stably).
+
+        Parameters:
+            data: The data to sort (a list or a 1D Numpy NDArray, or None
+                for no data)
+            key: A function computing the key of each item, or None
+
+        Returns:
+            The sorted data (a Numpy NDArray, if the data is a 1D Numpy
+            NDArray and there is no key function, or a list otherwise)
+        """
+        if data is None:
+            return []
+        if key is None and self._type_is_ndarray(type(data)) and \
+                data.ndim == 1:
+            return self._numpy.sort(data, kind='mergesort')
+        return sorted(data, key=key)
+
+    def rebalance(self, data=None, func=None, tag=0):
+        """
+        Move the surplus items of the overloaded ranks to underloaded ranks.
+
+        Each rank gives its own list of remaining items, or of (item,
+        weight) pairs, and gets back its new list of items, in the same
+        form.  The items kept on each rank keep their order, and the items
+        moved to it are added at the end.
+
+        This call must be made by all ranks.
+
+        Keyword Arguments:
+            data: The list of remaining items (or (item, weight) pairs) on
+                this rank
+            func: A Rebalance partition function, which computes the moves
+                of the items.  If None, the target total weight of every
+                rank is the same.
+            tag (int): A user-defined integer tag to uniquely specify the
+                messages sent
+
+        Returns:
+            list: The new list of items (or (item, weight) pairs) on this
+                rank
+        """
+        return [] if data is None else list(data)
+
+    def calibrate(self, kernel=None, repeat=3):
+        """
+        Measure the relative speed of every rank with a short kernel.
+
+        The kernel is run the given number of times on each rank, and the
+        speed of each rank is the inverse of its fastest run.  The speeds
+        are scaled so that their mean is 1, and can be given as the
+        capacities of a partition function.  (If the 'manager' rank is not
+        involved in the partitioning, leave out the first speed.)
+
+        This call must be made by all ranks.
+
+        Keyword Arguments:
+            kernel: A function (taking no arguments) representative of the
+                work to be done.  If None, a short loop of integer
+                arithmetic is used.
+            repeat (int): The number of times to run the kernel
+
+        Returns:
+            list: The relative speed of each rank, in order of rank ID
+        """
+        return self._relative_speeds([self._speed(kernel, repeat)])
+
+    @staticmethod
+    def _speed(kernel, repeat):
+        """
+        Time a kernel on this rank.
+
+        Parameters:
+            kernel: A function taking no arguments (or None for the default
+                calibration kernel)
+            repeat (int): The number of times to run the kernel
+
+        Returns:
+            float: The inverse of the time of the fastest run, in seconds
+        """
+        kernel = kernel or _calibration_kernel
+        best = None
+        for _ in xrange(max(repeat, 1)):
+            start = time()
+            kernel()
+            elapsed = time() - start
+            if best is None or elapsed < best:
+                best = elapsed
+        return 1.0 / max(best, 1e-9)
+
+    @staticmethod
+    def _relative_speeds(speeds):
+        """
+        Scale the speeds of the ranks so that their mean is 1.
+
+        Parameters:
+            speeds (list): The speed of each rank
+
+        Returns:
+            list: The relative speed of each rank
+        """
+        mean = float(sum(speeds)) / len(speeds)
+        return [s / mean for s in speeds]
+
     def ration(self, data=None, tag=0):
         """
         Send a single piece of data from the 'manager' rank to a 'worker' rank.
@@ -429,7 +1021,7 @@ class SimpleComm(object):
         err_msg = 'Rationing cannot be used in serial operation'
         raise RuntimeError(err_msg)
 
-    def collect(self, data=None, tag=0):
+    def collect(self, data=None, tag=0, fanout=None):
         """
         Send data from a 'worker' rank to the 'manager' rank.
 
@@ -441,6 +1033,9 @@ class SimpleComm(object):
         For each call to this function on a given 'worker' rank, there must
         be a matching call to this function made on the 'manager' rank.
 
+        If the `fanout` argument is given, the data is instead merged up a
+        tree of ranks, and this call must be made exactly once by all ranks.
+
         NOTE: This method cannot be used for communication between the
         'manager' rank and itself.  Attempting this will cause the code to
         hang.
@@ -449,10 +1044,16 @@ class SimpleComm(object):
             data: The data to be collected asynchronously on the manager rank.
             tag (int): A user-defined integer tag to uniquely specify this
                 communication message
+            fanout (int): If given, the number of children of each rank in
+                the tree used to merge the data on the way to the 'manager'
+                rank.  If None, each 'worker' rank sends to the 'manager'
+                rank directly.
 
         Returns:
             On the 'manager' rank, a tuple containing the source rank ID
-            and the data collected.  None on all other ranks.
+            and the data collected.  None on all other ranks.  If `fanout`
+            is given, the 'manager' rank instead receives a list of these
+            tuples from all 'worker' ranks, ordered by rank ID.
 
         Raises:
             RuntimeError: If executed during a serial or 1-rank parallel run
@@ -502,28 +1103,57 @@ class SimpleCommMPI(SimpleComm):
         PART_TAG: Partition Tag Identifier
         RATN_TAG: Ration Tag Identifier
         CLCT_TAG: Collect Tag Identifier
+        SPEC_TAG: Speculate Tag Identifier
+        STEAL_TAG: Steal Tag Identifier
         REQ_TAG: Request Identifier
         MSG_TAG: Message Identifer
         ACK_TAG: Acknowledgement Identifier
         PYT_TAG: Python send/recv Identifier
         NPY_TAG: Numpy send/recv Identifier
+        TRE_TAG: Tree-forwarded send/recv Identifier
+        COLUMNAR_MIN: The shortest list (or tuple) packed into columns
         _mpi: A reference to the mpi4py.MPI module
         _comm: A reference to the mpi4py.MPI communicator
+        _pending (list): Outstanding requests retiring 'worker' ranks that
+            were still running a superseded task when *speculate* returned
+        _columnar (bool): Whether lists of numbers or strings are packed into
+            columns before they are sent
+        _unpack (bool): Whether received columns are rebuilt into the
+            original lists (or left as Numpy NDArrays)
     """
 
     PART_TAG = 1  # Partition Tag Identifier
     RATN_TAG = 2  # Ration Tag Identifier
     CLCT_TAG = 3  # Collect Tag Identifier
+    SPEC_TAG = 4  # Speculate Tag Identifier
+    STEAL_TAG = 5  # Steal Tag Identifier
+    RBAL_TAG = 6  # Rebalance Tag Identifier
 
     REQ_TAG = 1  # Request Identifier
     MSG_TAG = 2  # Message Identifier
     ACK_TAG = 3  # Acknowledgement Identifier
     PYT_TAG = 4  # Python Data send/recv Identifier
     NPY_TAG = 5  # Numpy NDArray send/recv Identifier
+    TRE_TAG = 6  # Tree-forwarded send/recv Identifier
 
-    def __init__(self):
+    COLUMNAR_MIN = 32  # Shortest list (or tuple) packed into columns
+
+    def __init__(self, columnar=True, unpack=True):
         """
         Constructor.
+
+        Keyword Arguments:
+            columnar (bool): Whether long lists (or tuples) of ints, floats,
+                or strings are packed into Numpy NDArray buffers before they
+                are sent (if the Numpy module is available)
+            unpack (bool): Whether received columns are rebuilt into the
+                original lists (or tuples).  If False, a packed list is
+                received as a 1D Numpy NDArray of its numbers (int64 or
+                float64) or strings (a bytes 'S' or unicode 'U' array, which,
+                like any Numpy string array, drops trailing null
+                characters).  Lists of fewer than COLUMNAR_MIN items (or of
+                mixed types) are never packed, and are always received as
+                lists (or tuples).
         """
 
         # Call the base class constructor
@@ -542,6 +1172,13 @@ class SimpleCommMPI(SimpleComm):
         # The MPI communicator (by default, COMM_WORLD)
         self._comm = self._mpi.COMM_WORLD
 
+        # Outstanding requests left by the speculate method
+        self._pending = []
+
+        # Whether lists are packed into columns, and rebuilt when received
+        self._columnar = columnar and self._numpy is not None
+        self._unpack = unpack
+
     def __del__(self):
         """
         Destructor.
@@ -582,8 +1219,17 @@ class SimpleCommMPI(SimpleComm):
 
         This call must be made by all ranks.
         """
+        self._complete_pending()
         self._comm.Barrier()
 
+    def _complete_pending(self):
+        """
+        Wait for the requests left outstanding by the speculate method.
+        """
+        if self._pending:
+            self._mpi.Request.waitall(self._pending)
+            self._pending = []
+
     def allreduce(self, data, op):
         """
         Perform an MPI AllReduction operation.
@@ -626,8 +1272,10 @@ class SimpleCommMPI(SimpleComm):
         Method to generate the tag for a given MPI message
 
         Parameters:
-            method (int): One of PART_TAG, RATN_TAG, CLCT_TAG
-            message (int):  One of REQ_TAG, MSG_TAG, ACK_TAG, PYT_TAG, NPY_TAG
+            method (int): One of PART_TAG, RATN_TAG, CLCT_TAG, SPEC_TAG,
+                STEAL_TAG, RBAL_TAG
+            message (int):  One of REQ_TAG, MSG_TAG, ACK_TAG, PYT_TAG, NPY_TAG,
+                TRE_TAG
             user (int): A user-defined integer tag
 
         Returns:
@@ -636,7 +1284,419 @@ class SimpleCommMPI(SimpleComm):
         """
         return 100 * user + 10 * method + message
 
-    def partition(self, data=None, func=None, involved=False, tag=0):
+    def _tree_children(self, rank, fanout):
+        """
+        Get the ranks of the children of a rank in a k-ary tree of ranks.
+
+        The tree is rooted at the 'manager' rank, and the children of rank r
+        are the ranks fanout * r + 1 through fanout * r + fanout.
+
+        Parameters:
+            rank (int): The rank ID whose children are requested
+            fanout (int): The maximum number of children of each rank
+
+        Returns:
+            list: The rank IDs of the children of the given rank
+        """
+        first = fanout * rank + 1
+        return range(first, min(first + fanout, self.get_size()))
+
+    def _tree_parent(self, rank, fanout):
+        """
+        Get the rank of the parent of a rank in a k-ary tree of ranks.
+
+        Parameters:
+            rank (int): The rank ID whose parent is requested (must not be 0)
+            fanout (int): The maximum number of children of each rank
+
+        Returns:
+            int: The rank ID of the parent of the given rank
+        """
+        return (rank - 1) // fanout
+
+    def _tree_subtree(self, rank, fanout):
+        """
+        Get the ranks in the subtree rooted at a rank in a k-ary tree of ranks.
+
+        Parameters:
+            rank (int): The rank ID at the root of the subtree
+            fanout (int): The maximum number of children of each rank
+
+        Returns:
+            list: The rank IDs in the subtree, including the given rank
+        """
+        subtree = []
+        level = [rank]
+        while level:
+            subtree.extend(level)
+            level = [c for r in level for c in self._tree_children(r, fanout)]
+        return subtree
+
+    def _check_fanout(self, fanout):
+        """
+        Check the type and value of a tree fanout argument.
+
+        Parameters:
+            fanout (int): The maximum number of children of each rank
+
+        Raises:
+            TypeError: The fanout argument is not an int
+            ValueError: The fanout argument is less than 1
+        """
+        if type(fanout) is not int:
+            raise TypeError('Tree fanout must be an integer')
+        if fanout < 1:
+            raise ValueError('Tree fanout less than 1 is invalid')
+
+    def _tree_partition(self, data, op, involved, tag, fanout):
+        """
+        Partition and forward data down a k-ary tree of ranks.
+
+        Each rank receives from its parent a dictionary of the parts for
+        every rank in its subtree, keyed by rank ID.  It keeps its own part
+        and forwards the rest to its children, split by subtree.
+
+        Parameters:
+            data: The data to be partitioned (used on the 'manager' rank only)
+            op: The partition function
+            involved (bool): Whether the 'manager' rank receives a part
+            tag (int): A user-defined integer tag
+            fanout (int): The maximum number of children of each rank
+
+        Returns:
+            The part of the data assigned to this rank
+        """
+        rank = self.get_rank()
+        tre_tag = self._tag_offset(self.PART_TAG, self.TRE_TAG, tag)
+        if self.is_manager():
+            parts = dict(enumerate(self._plan_parts(data, op, involved)))
+        else:
+            parent = self._tree_parent(rank, fanout)
+            parts = self._comm.recv(source=parent, tag=tre_tag)
+
+        for child in self._tree_children(rank, fanout):
+            subparts = dict((r, parts.pop(r))
+                            for r in self._tree_subtree(child, fanout))
+            self._comm.send(subparts, dest=child, tag=tre_tag)
+
+        return parts[rank]
+
+    def _plan_parts(self, data, op, involved):
+        """
+        Compute the part of the data for every rank on the 'manager' rank.
+
+        If the partition function has a plan method, all of the parts are
+        computed in a single pass.  Otherwise, the partition function is
+        called once for each part.
+
+        Parameters:
+            data: The data to be partitioned
+            op: The partition function
+            involved (bool): Whether the 'manager' rank receives a part
+
+        Returns:
+            list: The part of the data for each rank, indexed by rank ID.
+                The part for the 'manager' rank is None if the 'manager' is
+                not involved.
+        """
+        j = int(not involved)
+        nparts = self.get_size() - j
+        if nparts == 0:
+            parts = []
+        elif hasattr(op, 'plan'):
+            parts = op.plan(data, nparts)
+        else:
+            parts = [op(data, i, nparts) for i in xrange(nparts)]
+        return [None] * j + list(parts)
+
+    def _iter_parts(self, data, op, involved):
+        """
+        Iterate over the part of the data for every rank on the 'manager' rank.
+
+        If the partition function has indices and select methods, only the
+        positions of the items of each part are computed up front, and each
+        part is taken from the data (as a view, wherever possible) only when
+        it is needed, so that all of the parts are never in memory at once.
+        Otherwise, all of the parts are computed first (see _plan_parts).
+
+        Parameters:
+            data: The data to be partitioned
+            op: The partition function
+            involved (bool): Whether the 'manager' rank receives a part
+
+        Returns:
+            An iterator over the part of the data for each rank, in order of
+            rank ID.  The part for the 'manager' rank is None if the
+            'manager' is not involved.
+        """
+        j = int(not involved)
+        nparts = self.get_size() - j
+        indices = None
+        if nparts > 0 and hasattr(op, 'indices') and hasattr(op, 'select'):
+            indices = op.indices(data, nparts)
+        if indices is None:
+            return iter(self._plan_parts(data, op, involved))
+        return chain([None] * j, op.select(data, indices))
+
+    @staticmethod
+    def _is_iterable(data):
+        """
+        Check if the data object is iterable.
+
+        Parameters:
+            data: The data to be partitioned
+
+        Returns:
+            bool: True, if data is an iterable object. False, otherwise.
+        """
+        try:
+            iter(data)
+        except TypeError:
+            return False
+        return True
+
+    def _stream_partition(self, data, op, involved, tag):
+        """
+        Stream the items of an iterator from the 'manager' rank to the ranks.
+
+        The iterator is consumed once, with the stream method of the
+        partition function routing each item to a rank as soon as it is
+        read.  The items for each 'worker' rank are sent in batches of the
+        given size (the batch attribute of the partition function), and
+        each 'worker' rank receives batches until it receives None, so the
+        full list of items is never held on the 'manager' rank.
+
+        Parameters:
+            data: The iterable object to be partitioned
+            op: The partition function, with a stream method
+            involved (bool): Whether the 'manager' rank receives a part
+            tag (int): A user-defined integer tag
+
+        Returns:
+            list: The items routed to the 'manager' rank, if it is involved.
+                None, otherwise.
+        """
+        j = int(not involved)
+        nparts = self.get_size() - j
+        if nparts == 0:
+            return None
+
+        # Send the handshake message to every worker rank
+        msg = {'rank': self.get_rank(), 'type': list, 'shape': None,
+               'dtype': None, 'offsets': None, 'stream': True}
+        msg_tag = self._tag_offset(self.PART_TAG, self.MSG_TAG, tag)
+        ack_tag = self._tag_offset(self.PART_TAG, self.ACK_TAG, tag)
+        pyt_tag = self._tag_offset(self.PART_TAG, self.PYT_TAG, tag)
+        acks = [involved]
+        for i in xrange(1, self.get_size()):
+            self._comm.send(msg, dest=i, tag=msg_tag)
+            acks.append(self._comm.recv(source=i, tag=ack_tag))
+
+        # Route each item, and send the batches as they fill up
+        batch = getattr(op, 'batch', 1)
+        buffers = [[] for _ in xrange(self.get_size())]
+        local = [] if involved else None
+        for (k, item) in op.stream(data, nparts):
+            i = k + j
+            if i == 0:
+                local.append(item)
+            elif acks[i]:
+                buffers[i].append(item)
+                if len(buffers[i]) >= batch:
+                    self._comm.send(buffers[i], dest=i, tag=pyt_tag)
+                    buffers[i] = []
+
+        # Send the remaining items and the end marker
+        for i in xrange(1, self.get_size()):
+            if acks[i]:
+                if buffers[i]:
+                    self._comm.send(buffers[i], dest=i, tag=pyt_tag)
+                self._comm.send(None, dest=i, tag=pyt_tag)
+
+        return local
+
+    def _local_partition(self, data, op, involved, verify):
+        """
+        Compute the part of the data for this rank, without any messages.
+
+        Every rank must be given the same data.
+
+        Parameters:
+            data: The data to be partitioned (the same on every rank)
+            op: The partition function
+            involved (bool): Whether the 'manager' rank receives a part
+            verify (bool): Whether to check that every rank was given the
+                same data
+
+        Returns:
+            The part of the data assigned to this rank (or None on the
+            'manager' rank, if it is not involved)
+
+        Raises:
+            ValueError: If verify is True and the ranks were given different
+                data
+        """
+        if verify:
+            key = fingerprint(data)
+            if self.allreduce(key, 'min') != self.allreduce(key, 'max'):
+                err_msg = 'Ranks were given different data to partition'
+                raise ValueError(err_msg)
+        j = int(not involved)
+        index = self.get_rank() - j
+        if index < 0:
+            return None
+        return op(data, index, self.get_size() - j)
+
+    def _is_block(self, part):
+        """
+        Check if a part of the data is a block with global offsets.
+
+        Blocks (like those made by the BlockND partition function) are
+        tuples of the global offsets of the block and a Numpy NDArray.
+
+        Parameters:
+            part: The part of the data to be sent
+
+        Returns:
+            bool: True, if the part is an (offsets, NDArray) tuple.
+                False, otherwise.
+        """
+        return (type(part) is tuple and len(part) == 2 and
+                type(part[0]) is tuple and
+                self._type_is_ndarray(type(part[1])))
+
+    def _send_array(self, array, dest, tag):
+        """
+        Send a Numpy NDArray, without copying it if it is a strided view.
+
+        A C-contiguous array is sent as it is.  Any other array with
+        non-negative strides (like a block or a strided slice of a larger
+        array) is described with a derived MPI datatype, built from nested
+        hvector types (of the MPI type of its elements) matching the strides
+        of the array, so MPI reads the elements directly from the memory of
+        the array.  The array is received as a C-contiguous array of the
+        same shape and dtype, so the type signatures of the send and the
+        receive match.  (An array whose dtype has no MPI type is copied into
+        a C-contiguous array first.)
+
+        Parameters:
+            array: The Numpy NDArray to send
+            dest (int): The rank ID of the receiving rank
+            tag (int): The MPI tag of the message
+        """
+        basetype = self._mpi._typedict.get(array.dtype.char)
+        if array.flags.c_contiguous or array.size == 0 or \
+                min(array.strides) < 0 or basetype is None or \
+                not array.dtype.isnative:
+            self._comm.Send(
+                self._numpy.ascontiguousarray(array), dest=dest, tag=tag)
+            return
+
+        datatype = basetype.Dup()
+        for (length, stride) in reversed(zip(array.shape, array.strides)):
+            outer = datatype.Create_hvector(length, 1, stride)
+            datatype.Free()
+            datatype = outer
+        datatype.Commit()
+
+        extent = sum((length - 1) * stride for (length, stride)
+                     in zip(array.shape, array.strides)) + array.itemsize
+        address = array.__array_interface__['data'][0]
+        buf = self._mpi.memory.fromaddress(address, extent)
+        self._comm.Send([buf, 1, datatype], dest=dest, tag=tag)
+        datatype.Free()
+
+    def _pack_columns(self, data):
+        """
+        Pack a list (or tuple) of numbers or strings into Numpy NDArrays.
+
+        Only lists (or tuples) of at least COLUMNAR_MIN items, all of exactly
+        the same type (int, float, str, or unicode), are packed.  Numbers
+        are packed into a single 1D array.  Strings (with unicode strings
+        encoded as UTF-8) are joined into one 1D array of bytes, and the
+        offset of each string in the bytes is given in a second 1D array.
+
+        Parameters:
+            data: The data to be sent
+
+        Returns:
+            tuple: A tuple of the description of the columns (to send in the
+                handshake message) and the list of Numpy NDArrays to send,
+                or None if the data is not packed
+        """
+        if not self._columnar or type(data) not in (list, tuple) or \
+                len(data) < self.COLUMNAR_MIN:
+            return None
+        kind = type(data[0])
+        if kind not in (int, float, str, unicode) or \
+                any(type(x) is not kind for x in data):
+            return None
+
+        spec = {'type': type(data), 'kind': kind, 'length': len(data)}
+        if kind in (int, float):
+            dtype = self._numpy.int64 if kind is int else self._numpy.float64
+            return spec, [self._numpy.array(data, dtype=dtype)]
+
+        if kind is unicode:
+            data = [x.encode('utf-8') for x in data]
+        offsets = self._numpy.zeros(len(data) + 1, dtype=self._numpy.int64)
+        offsets[1:] = self._numpy.cumsum([len(x) for x in data])
+        spec['nbytes'] = int(offsets[-1])
+        chars = self._numpy.frombuffer(''.join(data), dtype=self._numpy.uint8)
+        return spec, [chars, offsets]
+
+    def _send_columns(self, columns, dest, tag):
+        """
+        Send the Numpy NDArrays of packed columns.
+
+        Parameters:
+            columns (list): The Numpy NDArrays made by _pack_columns
+            dest (int): The rank ID of the receiving rank
+            tag (int): The MPI tag of the messages
+        """
+        for column in columns:
+            self._comm.Send(column, dest=dest, tag=tag)
+
+    def _recv_columns(self, spec, source, tag):
+        """
+        Receive packed columns, and rebuild the list (or tuple) they packed.
+
+        Parameters:
+            spec (dict): The description of the columns made by _pack_columns
+            source (int): The rank ID of the sending rank
+            tag (int): The MPI tag of the messages
+
+        Returns:
+            The list (or tuple) of numbers or strings, or, if this object
+            was created with unpack set to False, the 1D Numpy NDArray of
+            the numbers or strings
+        """
+        kind = spec['kind']
+        if kind in (int, float):
+            dtype = self._numpy.int64 if kind is int else self._numpy.float64
+            values = self._numpy.empty(spec['length'], dtype=dtype)
+            self._comm.Recv(values, source=source, tag=tag)
+            if not self._unpack:
+                return values
+            items = values.tolist()
+        else:
+            chars = self._numpy.empty(spec['nbytes'], dtype=self._numpy.uint8)
+            self._comm.Recv(chars, source=source, tag=tag)
+            offsets = self._numpy.empty(spec['length'] + 1,
+                                        dtype=self._numpy.int64)
+            self._comm.Recv(offsets, source=source, tag=tag)
+            joined = chars.tostring()
+            bounds = offsets.tolist()
+            items = [joined[b:e] for (b, e) in izip(bounds[:-1], bounds[1:])]
+            if kind is unicode:
+                items = [x.decode('utf-8') for x in items]
+            if not self._unpack:
+                return self._numpy.array(items,
+                                         dtype='U' if kind is unicode else 'S')
+        return items if spec['type'] is list else tuple(items)
+
+    def partition(self, data=None, func=None, involved=False, tag=0,
+                  fanout=None, local=False, verify=False):
         """
         Partition and send data from the 'manager' rank to 'worker' ranks.
 
@@ -659,25 +1719,76 @@ class SimpleCommMPI(SimpleComm):
                 the ranks in the communicator.
             func: A PartitionFunction object/function that returns
                 a part of the data given the index and assumed
-                size of the partition.
+                size of the partition.  If it has indices and select
+                methods (as all PartitionFunction objects do), only the
+                positions of the items of each part are computed, and each
+                part is taken from the data just before it is sent.
+                Otherwise, if it has a plan method, all of the parts are
+                computed in a single call to the plan method.
             involved (bool): True, if a part of the data should be given
                 to the 'manager' rank in addition to the 'worker'
                 ranks. False, otherwise.
             tag (int): A user-defined integer tag to uniquely
                 specify this communication message
+            fanout (int): If given, the number of children of each rank in
+                the tree used to forward the parts from the 'manager' rank.
+                If None, the 'manager' rank sends to every 'worker' rank
+                directly.
+            local (bool): If True, every rank is given the same data, and
+                each rank computes its own part, without any messages.
+            verify (bool): If True (and local is True), check that every
+                rank was given the same data, by comparing the minimum and
+                maximum of the fingerprints of the data across the ranks.
+
+        If the partition function has a stream method (like the
+        StreamPartition functions), and no fanout is given, the data can be
+        any iterable object (like a generator), which is read only once.
+        Each item is routed to its rank as it is read, and sent in batches,
+        so the full list of items is never built on the 'manager' rank.
+        Each rank receives the list of items routed to it.
+
+        If the data is a mapping (like a dict), each rank receives an
+        OrderedDict of only the keys in its part to their values (see the
+        partition module), and the default partitioning is an equal stride
+        across the keys, in a stable order.
+
+        Parts that are Numpy NDArray views (like the blocks made by the
+        BlockND partition function, or strided slices) are sent directly from
+        the memory of the data, without first being copied.
 
         Returns:
             A (possibly partitioned) subset (i.e., part) of the data.
             Depending on the PartitionFunction used (or if it is used at all),
             this method may return a different part on each rank.
+
+        Raises:
+            TypeError: If the fanout argument is not an int
+            ValueError: If the fanout argument is less than 1, or if verify
+                is True and the ranks were given different data
         """
+        if func is None and PartitionFunction._is_mapping(data):
+            func = EqualStride()
+        op = func if func else lambda *x: x[0][x[1]::x[2]]
+        if local:
+            return self._local_partition(data, op, involved, verify)
+        if fanout is not None:
+            self._check_fanout(fanout)
+            return self._tree_partition(data, op, involved, tag, fanout)
+
         if self.is_manager():
-            op = func if func else lambda *x: x[0][x[1]::x[2]]
-            j = int(not involved)
+            if hasattr(op, 'stream') and self._is_iterable(data) and \
+                    not PartitionFunction._is_mapping(data):
+                return self._stream_partition(data, op, involved, tag)
+            parts = self._iter_parts(data, op, involved)
+            own = next(parts)
             for i in xrange(1, self.get_size()):
 
-                # Get the part of the data to send to rank i
-                part = op(data, i - j, self.get_size() - j)
+                # Get the part of the data to send to rank i (and, for a
+                # block with global offsets, send the offsets separately)
+                part = next(parts)
+                offsets = None
+                if self._is_block(part):
+                    (offsets, part) = part
 
                 # Create the handshake message
                 msg = {}
@@ -685,6 +1796,9 @@ class SimpleCommMPI(SimpleComm):
                 msg['type'] = type(part)
                 msg['shape'] = part.shape if hasattr(part, 'shape') else None
                 msg['dtype'] = part.dtype if hasattr(part, 'dtype') else None
+                msg['offsets'] = offsets
+                columns = self._pack_columns(part)
+                msg['columns'] = columns[0] if columns else None
 
                 # Send the handshake message to the worker rank
                 msg_tag = self._tag_offset(self.PART_TAG, self.MSG_TAG, tag)
@@ -699,20 +1813,20 @@ class SimpleCommMPI(SimpleComm):
                     continue
 
                 # If OK, send the data to the worker
-                if self._type_is_ndarray(type(part)):
+                if columns is not None:
                     npy_tag = self._tag_offset(
                         self.PART_TAG, self.NPY_TAG, tag)
-                    self._comm.Send(
-                        self._numpy.array(part), dest=i, tag=npy_tag)
+                    self._send_columns(columns[1], i, npy_tag)
+                elif self._type_is_ndarray(type(part)):
+                    npy_tag = self._tag_offset(
+                        self.PART_TAG, self.NPY_TAG, tag)
+                    self._send_array(part, i, npy_tag)
                 else:
                     pyt_tag = self._tag_offset(
                         self.PART_TAG, self.PYT_TAG, tag)
                     self._comm.send(part, dest=i, tag=pyt_tag)
 
-            if involved:
-                return op(data, 0, self.get_size())
-            else:
-                return None
+            return own
         else:
 
             # Get the data message from the manager
@@ -732,7 +1846,19 @@ class SimpleCommMPI(SimpleComm):
                 return None
 
             # Receive the data
-            if self._type_is_ndarray(msg['type']):
+            if msg.get('stream'):
+                pyt_tag = self._tag_offset(
+                    self.PART_TAG, self.PYT_TAG, tag)
+                recvd = []
+                batch = self._comm.recv(source=0, tag=pyt_tag)
+                while batch is not None:
+                    recvd.extend(batch)
+                    batch = self._comm.recv(source=0, tag=pyt_tag)
+            elif msg.get('columns') is not None:
+                npy_tag = self._tag_offset(
+                    self.PART_TAG, self.NPY_TAG, tag)
+                recvd = self._recv_columns(msg['columns'], 0, npy_tag)
+            elif self._type_is_ndarray(msg['type']):
                 npy_tag = self._tag_offset(
                     self.PART_TAG, self.NPY_TAG, tag)
                 recvd = self._numpy.empty(msg['shape'], dtype=msg['dtype'])
@@ -742,8 +1868,411 @@ class SimpleCommMPI(SimpleComm):
                     self.PART_TAG, self.PYT_TAG, tag)
                 recvd = self._comm.recv(source=0, tag=pyt_tag)
 
+            if msg.get('offsets') is not None:
+                recvd = (msg['offsets'], recvd)
             return recvd
 
+    def speculate(self, func, data=None, percentile=90.0, factor=2.0, tag=0):
+        """
+        Apply a function to each task with speculative re-execution.
+
+        On the 'manager' rank, the tasks in the data are handed out one at a
+        time to the 'worker' ranks, which apply the function to each task and
+        send the results back.  Tasks that run for longer than a deadline are
+        issued again to idle 'worker' ranks, and the first result for each
+        task is kept.  On a 1-rank communicator, the function is simply
+        applied to each task in turn.
+
+        The 'manager' rank returns as soon as every task has a result.  A
+        'worker' rank still running a superseded copy of a task returns when
+        that copy finishes, and its result is discarded.
+
+        This call must be made by all ranks.
+
+        Parameters:
+            func: The function to apply to each task, called with the task as
+                its only argument
+
+        Keyword Arguments:
+            data: The list of tasks (needed only on the 'manager' rank)
+            percentile (float): The percentile of the completed task
+                durations used to compute the deadline
+            factor (float): The factor multiplying the percentile duration
+                to give the deadline
+            tag (int): A user-defined integer tag to uniquely specify this
+                communication message
+
+        Returns:
+            list: On the 'manager' rank, the results of the function applied
+                to each task, in the order of the tasks.  None on all other
+                ranks.
+        """
+        self._complete_pending()
+        if self.get_size() == 1:
+            return SimpleComm.speculate(self, func, data=data)
+        elif self.is_manager():
+            tracker = TaskTracker(percentile=percentile, factor=factor)
+            return self._speculate_manager(data, tracker, tag)
+        else:
+            return self._speculate_worker(func, tag)
+
+    def _speculate_manager(self, data, tracker, tag):
+        """
+        The 'manager' rank side of the speculate method.
+
+        Parameters:
+            data: The list of tasks
+            tracker (TaskTracker): The tracker recording the task times
+            tag (int): A user-defined integer tag
+
+        Returns:
+            list: The results of each task, in the order of the tasks
+        """
+        req_tag = self._tag_offset(self.SPEC_TAG, self.REQ_TAG, tag)
+        msg_tag = self._tag_offset(self.SPEC_TAG, self.MSG_TAG, tag)
+        ack_tag = self._tag_offset(self.SPEC_TAG, self.ACK_TAG, tag)
+        pyt_tag = self._tag_offset(self.SPEC_TAG, self.PYT_TAG, tag)
+
+        tasks = list(data)
+        results = [None] * len(tasks)
+        fresh = 0
+        idle = []
+        running = {}
+        unseen = set(xrange(1, self.get_size()))
+
+        while tracker.num_complete() < len(tasks):
+
+            # Wait for a report, polling only if idle ranks may need a copy
+            # of an overdue task
+            if idle and not self._comm.Iprobe(source=self._mpi.ANY_SOURCE,
+                                              tag=req_tag):
+                sleep(0.001)
+            else:
+                (task, rank) = self._comm.recv(source=self._mpi.ANY_SOURCE,
+                                               tag=req_tag)
+                unseen.discard(rank)
+                if task is not None:
+                    del running[rank]
+                    keep = tracker.complete(task, rank)
+                    self._comm.send(keep, dest=rank, tag=ack_tag)
+                    if keep:
+                        results[task] = self._comm.recv(source=rank,
+                                                        tag=pyt_tag)
+                idle.append(rank)
+
+            # Hand out new tasks first, then copies of overdue tasks
+            while idle:
+                if fresh < len(tasks):
+                    task = fresh
+                    fresh += 1
+                else:
+                    overdue = tracker.overdue()
+                    if not overdue:
+                        break
+                    task = overdue[0]
+                rank = idle.pop(0)
+                tracker.dispatch(task, rank)
+                running[rank] = task
+                self._comm.send((task, tasks[task]), dest=rank, tag=msg_tag)
+
+        # Retire the idle ranks and the ranks that never asked for a task
+        for rank in unseen:
+            self._comm.recv(source=rank, tag=req_tag)
+        for rank in idle + list(unseen):
+            self._comm.send(None, dest=rank, tag=msg_tag)
+
+        # Retire the ranks running superseded copies without waiting on them
+        for rank in running:
+            self._pending.append(self._comm.irecv(source=rank, tag=req_tag))
+            self._pending.append(self._comm.isend(False, dest=rank,
+                                                  tag=ack_tag))
+            self._pending.append(self._comm.isend(None, dest=rank,
+                                                  tag=msg_tag))
+
+        return results
+
+    def _speculate_worker(self, func, tag):
+        """
+        The 'worker' rank side of the speculate method.
+
+        Parameters:
+            func: The function to apply to each task
+            tag (int): A user-defined integer tag
+        """
+        req_tag = self._tag_offset(self.SPEC_TAG, self.REQ_TAG, tag)
+        msg_tag = self._tag_offset(self.SPEC_TAG, self.MSG_TAG, tag)
+        ack_tag = self._tag_offset(self.SPEC_TAG, self.ACK_TAG, tag)
+        pyt_tag = self._tag_offset(self.SPEC_TAG, self.PYT_TAG, tag)
+
+        rank = self.get_rank()
+        self._comm.send((None, rank), dest=0, tag=req_tag)
+        while True:
+            msg = self._comm.recv(source=0, tag=msg_tag)
+            if msg is None:
+                return None
+            (task, item) = msg
+            result = func(item)
+
+            # Report the finished task, and send the result only if wanted
+            self._comm.send((task, rank), dest=0, tag=req_tag)
+            if self._comm.recv(source=0, tag=ack_tag):
+                self._comm.send(result, dest=0, tag=pyt_tag)
+
+    def steal(self, func, data=None, partition=None, involved=False, tag=0):
+        """
+        Apply a function to each item of partitioned data with work stealing.
+
+        The data is first partitioned across the ranks (see the *partition*
+        method).  Each rank then applies the function to each item of its
+        part.  When a rank runs out of items, it sends a request to each of
+        the other ranks, in random order, until one of them replies with
+        half of its remaining items.  Busy ranks answer requests between
+        items.  A rank that cannot steal any items joins a non-blocking
+        barrier and answers requests with empty replies until every rank has
+        joined the barrier.
+
+        If the 'manager' rank is not involved, it does no work and is never
+        asked for items, but it still takes part in the barrier.
+
+        This call must be made by all ranks.
+
+        Parameters:
+            func: The function to apply to each item, called with the item
+                as its only argument
+
+        Keyword Arguments:
+            data: The data to be partitioned across the ranks in the
+                communicator.
+            partition: A PartitionFunction object/function used to initially
+                partition the data
+            involved (bool): True if a part of the data should be given to the
+                'manager' rank in addition to the 'worker' ranks. False
+                otherwise.
+            tag (int): A user-defined integer tag to uniquely specify this
+                communication message.
+
+        Returns:
+            list: A list of (item, result) tuples, one for each item whose
+                result was computed on this rank, in the order computed
+        """
+        part = self.partition(data, func=partition, involved=involved,
+                              tag=tag)
+
+        req_tag = self._tag_offset(self.STEAL_TAG, self.REQ_TAG, tag)
+        msg_tag = self._tag_offset(self.STEAL_TAG, self.MSG_TAG, tag)
+        rank = self.get_rank()
+        queue = deque(part) if part is not None else deque()
+        results = []
+
+        def answer_requests():
+            while self._comm.Iprobe(source=self._mpi.ANY_SOURCE, tag=req_tag):
+                thief = self._comm.recv(source=self._mpi.ANY_SOURCE,
+                                        tag=req_tag)
+                loot = [queue.pop() for _ in xrange(len(queue) // 2)]
+                loot.reverse()
+                self._comm.send(loot, dest=thief, tag=msg_tag)
+
+        if involved or not self.is_manager():
+            first = 0 if involved else 1
+            victims = [r for r in xrange(first, self.get_size()) if r != rank]
+            while True:
+                while queue:
+                    answer_requests()
+                    item = queue.popleft()
+                    results.append((item, func(item)))
+
+                # Out of work: try each victim in random order
+                shuffle(victims)
+                for victim in victims:
+                    self._comm.send(rank, dest=victim, tag=req_tag)
+                    while not self._comm.Iprobe(source=victim, tag=msg_tag):
+                        answer_requests()
+                        sleep(0.0001)
+                    queue.extend(self._comm.recv(source=victim, tag=msg_tag))
+                    if queue:
+                        break
+                if not queue:
+                    break
+
+        # Nothing left to steal: wait for the other ranks to finish
+        barrier = self._comm.Ibarrier()
+        while not barrier.Test():
+            answer_requests()
+            sleep(0.0001)
+        return results
+
+    def sort(self, data=None, key=None):
+        """
+        Sort data distributed across all of the ranks.
+
+        This is a parallel sort by regular sampling.  Each rank sorts its
+        own data and picks a regular sample of its keys.  The samples from
+        every rank are gathered on every rank, where the same splitters are
+        chosen from them, and each rank splits its sorted data into ranges
+        with a RangePartition.  Each range is then sent to the rank that owns
+        it, in a single all-to-all exchange, and the sorted runs received by
+        each rank are merged.
+
+        If the data on every rank is a 1D Numpy NDArray (of the same dtype)
+        and there is no key function, the ranges are exchanged as raw
+        buffers with a single Alltoallv call.  Otherwise, they are pickled.
+
+        This call must be made by all ranks.
+
+        Keyword Arguments:
+            data: The local data on this rank (a list or a 1D Numpy NDArray)
+            key: A function computing the key of each item, by which the
+                items are sorted.  If None, the items themselves are sorted.
+
+        Returns:
+            The sorted part of the data on this rank (a Numpy NDArray, if the
+            data on every rank is a 1D Numpy NDArray and there is no key
+            function, or a list otherwise)
+        """
+        size = self.get_size()
+        local = self._local_sort(data, key)
+        if self._type_is_ndarray(type(local)):
+            dtype = local.dtype
+            keys = local
+        else:
+            dtype = None
+            keys = local if key is None else [key(x) for x in local]
+
+        # Pick a regular sample of the local keys, and gather all samples
+        n = len(keys)
+        samples = [keys[(i * n) // size] for i in xrange(size)] if n else []
+        gathered = self._comm.allgather((dtype, samples))
+        dtypes = set(dt for (dt, _) in gathered)
+        sample = sorted(x for (_, smp) in gathered for x in smp)
+        splitters = RangePartition.choose_splitters(sample, size)
+
+        # Split the sorted local data into one range for each rank
+        if len(dtypes) == 1 and dtype is not None:
+            ranges = RangePartition(splitters=splitters).plan(local, size)
+            return self._exchange_arrays(ranges, dtype)
+        else:
+            if dtype is not None:
+                local = local.tolist()
+            func = RangePartition(splitters=splitters, key=key)
+            runs = self._comm.alltoall(func.plan(local, size))
+            return sorted((x for run in runs for x in run), key=key)
+
+    def rebalance(self, data=None, func=None, tag=0):
+        """
+        Move the surplus items of the overloaded ranks to underloaded ranks.
+
+        Each rank gives its own list of remaining items, or of (item,
+        weight) pairs, and gets back its new list of items, in the same
+        form.  The total weight of every rank is gathered on every rank,
+        and then the weights of the items of the overloaded ranks only, so
+        that every rank computes the same moves (with the moves method of
+        the Rebalance partition function).  Each overloaded rank then sends
+        its surplus items directly to the underloaded ranks, and no other
+        items are sent.  The items kept on each rank keep their order, and
+        the items moved to it are added at the end.
+
+        This call must be made by all ranks.
+
+        Keyword Arguments:
+            data: The list of remaining items (or (item, weight) pairs) on
+                this rank
+            func: A Rebalance partition function, which computes the moves
+                of the items.  If None, the target total weight of every
+                rank is the same.
+            tag (int): A user-defined integer tag to uniquely specify the
+                messages sent
+
+        Returns:
+            list: The new list of items (or (item, weight) pairs) on this
+                rank
+        """
+        op = func if func else Rebalance()
+        size = self.get_size()
+        rank = self.get_rank()
+        data = [] if data is None else list(data)
+
+        # Gather the loads, and the item weights of the overloaded ranks
+        weights = Rebalance._part_weights(data)
+        load = sum(weights)
+        loads = self._comm.allgather(load)
+        targets = op.targets(loads, size)
+        overloaded = load > targets[rank]
+        gathered = self._comm.allgather(weights if overloaded else None)
+        weights = [w if w is not None else [l]
+                   for (w, l) in zip(gathered, loads)]
+
+        # Send the surplus items, and receive the items moved to this rank
+        moves = op.moves(weights, size)
+        rbal_tag = self._tag_offset(self.RBAL_TAG, self.PYT_TAG, tag)
+        requests = []
+        moved = set()
+        for (source, dest, positions) in moves:
+            if source == rank:
+                items = [data[i] for i in positions]
+                requests.append(self._comm.isend(items, dest=dest,
+                                                 tag=rbal_tag))
+                moved.update(positions)
+        kept = [x for (i, x) in enumerate(data) if i not in moved]
+        for (source, dest, positions) in moves:
+            if dest == rank:
+                kept.extend(self._comm.recv(source=source, tag=rbal_tag))
+        self._mpi.Request.waitall(requests)
+        return kept
+
+    def calibrate(self, kernel=None, repeat=3):
+        """
+        Measure the relative speed of every rank with a short kernel.
+
+        The kernel is run the given number of times on each rank, and the
+        speed of each rank is the inverse of its fastest run.  The speeds
+        are gathered on every rank and scaled so that their mean is 1, so
+        every rank gets the same list, which can be given as the capacities
+        of a partition function.  (If the 'manager' rank is not involved in
+        the partitioning, leave out the first speed.)
+
+        This call must be made by all ranks.
+
+        Keyword Arguments:
+            kernel: A function (taking no arguments) representative of the
+                work to be done.  If None, a short loop of integer
+                arithmetic is used.
+            repeat (int): The number of times to run the kernel
+
+        Returns:
+            list: The relative speed of each rank, in order of rank ID
+        """
+        speed = self._speed(kernel, repeat)
+        return self._relative_speeds(self._comm.allgather(speed))
+
+    def _exchange_arrays(self, ranges, dtype):
+        """
+        Send one range of a sorted Numpy NDArray to each rank, and merge.
+
+        Parameters:
+            ranges (list): The sorted 1D Numpy NDArray to send to each rank
+            dtype: The dtype of the arrays on every rank
+
+        Returns:
+            The sorted 1D Numpy NDArray of the ranges received by this rank
+        """
+        numpy = self._numpy
+        itemsize = dtype.itemsize
+        sendcounts = numpy.array([len(r) for r in ranges], dtype='i')
+        recvcounts = numpy.empty_like(sendcounts)
+        self._comm.Alltoall(sendcounts, recvcounts)
+
+        sendbuf = numpy.ascontiguousarray(
+            numpy.concatenate(ranges).astype(dtype, copy=False))
+        recvbuf = numpy.empty(recvcounts.sum(), dtype=dtype)
+        senddispls = numpy.concatenate(([0], numpy.cumsum(sendcounts)[:-1]))
+        recvdispls = numpy.concatenate(([0], numpy.cumsum(recvcounts)[:-1]))
+        self._comm.Alltoallv(
+            [sendbuf.view(numpy.uint8),
+             (sendcounts * itemsize, senddispls * itemsize), self._mpi.BYTE],
+            [recvbuf.view(numpy.uint8),
+             (recvcounts * itemsize, recvdispls * itemsize), self._mpi.BYTE])
+        return numpy.sort(recvbuf, kind='mergesort')
+
     def ration(self, data=None, tag=0):
         """
         Send a single piece of data from the 'manager' rank to a 'worker' rank.
@@ -785,6 +2314,8 @@ class SimpleCommMPI(SimpleComm):
                 msg['type'] = type(data)
                 msg['shape'] = data.shape if hasattr(data, 'shape') else None
                 msg['dtype'] = data.dtype if hasattr(data, 'dtype') else None
+                columns = self._pack_columns(data)
+                msg['columns'] = columns[0] if columns else None
 
                 # Send the handshake message to the requesting worker
                 msg_tag = self._tag_offset(self.RATN_TAG, self.MSG_TAG, tag)
@@ -799,10 +2330,14 @@ class SimpleCommMPI(SimpleComm):
                     return
 
                 # If OK, send the data to the requesting worker
-                if self._type_is_ndarray(type(data)):
+                if columns is not None:
+                    npy_tag = self._tag_offset(
+                        self.RATN_TAG, self.NPY_TAG, tag)
+                    self._send_columns(columns[1], rank, npy_tag)
+                elif self._type_is_ndarray(type(data)):
                     npy_tag = self._tag_offset(
                         self.RATN_TAG, self.NPY_TAG, tag)
-                    self._comm.Send(data, dest=rank, tag=npy_tag)
+                    self._send_array(data, rank, npy_tag)
                 else:
                     pyt_tag = self._tag_offset(
                         self.RATN_TAG, self.PYT_TAG, tag)
@@ -830,7 +2365,11 @@ class SimpleCommMPI(SimpleComm):
                     return None
 
                 # Receive the data from the manager
-                if self._type_is_ndarray(msg['type']):
+                if msg.get('columns') is not None:
+                    npy_tag = self._tag_offset(
+                        self.RATN_TAG, self.NPY_TAG, tag)
+                    recvd = self._recv_columns(msg['columns'], 0, npy_tag)
+                elif self._type_is_ndarray(msg['type']):
                     npy_tag = self._tag_offset(
                         self.RATN_TAG, self.NPY_TAG, tag)
                     recvd = self._numpy.empty(msg['shape'], dtype=msg['dtype'])
@@ -844,7 +2383,37 @@ class SimpleCommMPI(SimpleComm):
             err_msg = 'Rationing cannot be used in 1-rank parallel operation'
             raise RuntimeError(err_msg)
 
-    def collect(self, data=None, tag=0):
+    def _tree_collect(self, data, tag, fanout):
+        """
+        Collect data up a k-ary tree of ranks onto the 'manager' rank.
+
+        Each rank receives a list of (rank, data) tuples from each of its
+        children, appends them to its own, and sends the merged list on to
+        its parent.
+
+        Parameters:
+            data: The data to be collected from this rank
+            tag (int): A user-defined integer tag
+            fanout (int): The maximum number of children of each rank
+
+        Returns:
+            list: On the 'manager' rank, the list of (rank, data) tuples from
+                all 'worker' ranks, ordered by rank ID.  None otherwise.
+        """
+        rank = self.get_rank()
+        tre_tag = self._tag_offset(self.CLCT_TAG, self.TRE_TAG, tag)
+        merged = [] if self.is_manager() else [(rank, data)]
+        for child in self._tree_children(rank, fanout):
+            merged.extend(self._comm.recv(source=child, tag=tre_tag))
+
+        if self.is_manager():
+            return sorted(merged, key=lambda x: x[0])
+        else:
+            parent = self._tree_parent(rank, fanout)
+            self._comm.send(merged, dest=parent, tag=tre_tag)
+            return None
+
+    def collect(self, data=None, tag=0, fanout=None):
         """
         Send data from a 'worker' rank to the 'manager' rank.
 
@@ -856,6 +2425,9 @@ class SimpleCommMPI(SimpleComm):
         For each call to this function on a given 'worker' rank, there must
         be a matching call to this function made on the 'manager' rank.
 
+        If the `fanout` argument is given, the data is instead merged up a
+        tree of ranks, and this call must be made exactly once by all ranks.
+
         NOTE: This method cannot be used for communication between the
         'manager' rank and itself.  Attempting this will cause the code to
         hang.
@@ -865,15 +2437,27 @@ class SimpleCommMPI(SimpleComm):
                 on the 'manager' rank.
             tag (int): A user-defined integer tag to uniquely
                 specify this communication message
+            fanout (int): If given, the number of children of each rank in
+                the tree used to merge the data on the way to the 'manager'
+                rank.  If None, each 'worker' rank sends to the 'manager'
+                rank directly.
 
         Returns:
             tuple: On the 'manager' rank, a tuple containing the source rank
                 ID and the the data collected.  None on all other ranks.
+                If `fanout` is given, the 'manager' rank instead receives a
+                list of these tuples from all 'worker' ranks, ordered by
+                rank ID.
 
         Raises:
             RuntimeError: If executed during a serial or 1-rank parallel run
+            TypeError: If the fanout argument is not an int
+            ValueError: If the fanout argument is less than 1
         """
-        if self.get_size() > 1:
+        if self.get_size() > 1 and fanout is not None:
+            self._check_fanout(fanout)
+            return self._tree_collect(data, tag, fanout)
+        elif self.get_size() > 1:
             if self.is_manager():
 
                 # Receive the message from the worker
@@ -894,7 +2478,12 @@ class SimpleCommMPI(SimpleComm):
                     return None
 
                 # Receive the data
-                if self._type_is_ndarray(msg['type']):
+                if msg.get('columns') is not None:
+                    npy_tag = self._tag_offset(
+                        self.CLCT_TAG, self.NPY_TAG, tag)
+                    recvd = self._recv_columns(
+                        msg['columns'], msg['rank'], npy_tag)
+                elif self._type_is_ndarray(msg['type']):
                     npy_tag = self._tag_offset(
                         self.CLCT_TAG, self.NPY_TAG, tag)
                     recvd = self._numpy.empty(msg['shape'], dtype=msg['dtype'])
@@ -913,6 +2502,8 @@ class SimpleCommMPI(SimpleComm):
                 msg['type'] = type(data)
                 msg['shape'] = data.shape if hasattr(data, 'shape') else None
                 msg['dtype'] = data.dtype if hasattr(data, 'dtype') else None
+                columns = self._pack_columns(data)
+                msg['columns'] = columns[0] if columns else None
 
                 # Send the handshake message to the manager
                 msg_tag = self._tag_offset(self.CLCT_TAG, self.MSG_TAG, tag)
@@ -927,10 +2518,14 @@ class SimpleCommMPI(SimpleComm):
                     return
 
                 # If OK, send the data to the manager
-                if self._type_is_ndarray(type(data)):
+                if columns is not None:
+                    npy_tag = self._tag_offset(
+                        self.CLCT_TAG, self.NPY_TAG, tag)
+                    self._send_columns(columns[1], 0, npy_tag)
+                elif self._type_is_ndarray(type(data)):
                     npy_tag = self._tag_offset(
                         self.CLCT_TAG, self.NPY_TAG, tag)
-                    self._comm.Send(data, dest=0, tag=npy_tag)
+                    self._send_array(data, 0, npy_tag)
                 else:
                     pyt_tag = self._tag_offset(
                         self.CLCT_TAG, self.PYT_TAG, tag)
@@ -968,13 +2563,15 @@ class SimpleCommMPI(SimpleComm):
         if self.get_size() > 1:
             allgroups = list(set(self._comm.allgather(group)))
             color = allgroups.index(group)
-            monocomm = SimpleCommMPI()
+            monocomm = SimpleCommMPI(columnar=self._columnar,
+                                     unpack=self._unpack)
             monocomm._color = color
             monocomm._group = group
             monocomm._comm = self._comm.Split(color)
 
             rank = monocomm.get_rank()
-            multicomm = SimpleCommMPI()
+            multicomm = SimpleCommMPI(columnar=self._columnar,
+                                      unpack=self._unpack)
             multicomm._color = rank
             multicomm._group = rank
             multicomm._comm = self._comm.Split(rank)
@@ -983,3 +2580,150 @@ class SimpleCommMPI(SimpleComm):
         else:
             err_msg = 'Division cannot be done on a 1-rank communicator'
             raise RuntimeError(err_msg)
+
+
+#==============================================================================
+# TaskTracker - Dispatch and completion times of tasks on the 'manager' rank
+#==============================================================================
+class TaskTracker(object):
+
+    """
+    Class to record when tasks are dispatched and completed, to find stragglers.
+
+    Each task is identified by a (hashable) task ID, and each copy of a task
+    is identified by the rank to which it was dispatched.  The first copy of
+    a task to complete gives the task's duration.  A task is *overdue* if
+    it has been running for longer than the deadline, which is the given
+    percentile of the completed task durations times the given factor.
+
+    Attributes:
+        _percentile (float): The percentile of durations used for the deadline
+        _factor (float): The factor multiplying the percentile duration
+        _min_samples (int): The number of completed tasks needed before any
+            task can be overdue
+        _copies (int): The largest number of copies of a task to run at once
+        _time: The method to use for getting the time (e.g., time.time)
+        _running (dict): A dictionary of the start times of each running copy,
+            keyed by task ID and then by rank
+        _durations (list): The sorted list of completed task durations
+        _complete (set): The set of completed task IDs
+    """
+
+    def __init__(self, percentile=90.0, factor=2.0, min_samples=1, copies=2,
+                 time=time):
+        """
+        Constructor.
+
+        Keyword Arguments:
+            percentile (float): The percentile (0 to 100) of the completed
+                task durations used to compute the deadline
+            factor (float): The factor multiplying the percentile duration
+                to give the deadline
+            min_samples (int): The number of completed tasks needed before
+                any task can be overdue
+            copies (int): The largest number of copies of a task allowed to
+                run at the same time
+            time: The function to use for measuring the time.  By default,
+                it is the Python 'time.time()' method.
+
+        Raises:
+            ValueError: The percentile is not between 0 and 100
+        """
+        if percentile < 0 or percentile > 100:
+            raise ValueError('Percentile must be between 0 and 100')
+        self._percentile = percentile
+        self._factor = factor
+        self._min_samples = max(min_samples, 1)
+        self._copies = copies
+        self._time = time
+        self._running = defaultdict(dict)
+        self._durations = []
+        self._complete = set()
+
+    def dispatch(self, task, rank):
+        """
+        Record that a copy of a task was dispatched to a rank.
+
+        Parameters:
+            task: The task ID
+            rank (int): The rank ID running the copy of the task
+        """
+        self._running[task][rank] = self._time()
+
+    def complete(self, task, rank):
+        """
+        Record that a copy of a task finished on a rank.
+
+        Parameters:
+            task: The task ID
+            rank (int): The rank ID that ran the copy of the task
+
+        Returns:
+            bool: True if this is the first copy of the task to finish
+                (i.e., its result should be kept).  False otherwise.
+        """
+        start = self._running[task].pop(rank)
+        if not self._running[task]:
+            del self._running[task]
+        if task in self._complete:
+            return False
+        self._complete.add(task)
+        insort(self._durations, self._time() - start)
+        return True
+
+    def num_complete(self):
+        """
+        Get the number of completed tasks.
+
+        Returns:
+            int: The number of tasks with at least one finished copy
+        """
+        return len(self._complete)
+
+    def is_complete(self, task):
+        """
+        Check if any copy of a task has finished.
+
+        Parameters:
+            task: The task ID
+
+        Returns:
+            bool: True if the task is complete.  False otherwise.
+        """
+        return task in self._complete
+
+    def deadline(self):
+        """
+        Get the current deadline for a running task.
+
+        Returns:
+            float: The time a task may run before it is overdue, or None if
+                too few tasks have completed to compute a deadline
+        """
+        if len(self._durations) < self._min_samples:
+            return None
+        k = int(round(self._percentile / 100.0 * (len(self._durations) - 1)))
+        return self._factor * self._durations[k]
+
+    def overdue(self):
+        """
+        Get the incomplete tasks that have run for longer than the deadline.
+
+        Only tasks with fewer than the allowed number of running copies
+        are returned, since these are the tasks worth issuing again.
+
+        Returns:
+            list: The overdue task IDs, with the longest-running first
+        """
+        deadline = self.deadline()
+        if deadline is None:
+            return []
+        now = self._time()
+        late = []
+        for task, starts in self._running.iteritems():
+            if task in self._complete or len(starts) >= self._copies:
+                continue
+            start = min(starts.values())
+            if now - start > deadline:
+                late.append((start, task))
+        return [task for (_, task) in sorted(late)]
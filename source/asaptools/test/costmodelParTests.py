@@ -0,0 +1,81 @@
+"""
+Parallel Tests for the CostModel class
+
+_______________________________________________________________________________
+Created on Oct 18, 2026
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from asaptools import simplecomm
+from asaptools.costmodel import CostModel
+from os import linesep as eol
+from mpi4py import MPI
+MPI_COMM_WORLD = MPI.COMM_WORLD
+
+
+def test_info_msg(rank, size, name, data, actual, expected):
+    rknm = ''.join(['[', str(rank), '/', str(size), '] ', str(name)])
+    spcr = ' ' * len(rknm)
+    msg = ''.join([eol,
+                   rknm, ' - Input: ', str(data), eol,
+                   spcr, ' - Actual:   ', str(actual), eol,
+                   spcr, ' - Expected: ', str(expected)])
+    return msg
+
+
+class CostModelParTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gcomm = simplecomm.create_comm()
+        self.size = MPI_COMM_WORLD.Get_size()
+        self.rank = MPI_COMM_WORLD.Get_rank()
+        tmpdir = tempfile.mkdtemp() if self.rank == 0 else None
+        self.tmpdir = MPI_COMM_WORLD.bcast(tmpdir)
+        self.filename = os.path.join(self.tmpdir, 'costs.json')
+
+    def tearDown(self):
+        MPI_COMM_WORLD.Barrier()
+        if self.rank == 0:
+            shutil.rmtree(self.tmpdir)
+
+    def testGatherRuns(self):
+        for run in xrange(1, 3):
+            model = CostModel(self.filename)
+            model.record(self.rank, 1.0 + run)
+            model.gather(self.gcomm)
+            if self.gcomm.is_manager():
+                model.save()
+            MPI_COMM_WORLD.Barrier()
+
+            actual = len(CostModel(self.filename).get_records()['default'])
+            expected = run * self.size
+            msg = test_info_msg(self.rank, self.size, 'gather', run, actual,
+                                expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+
+
+if __name__ == "__main__":
+    hline = '=' * 70
+    if MPI_COMM_WORLD.Get_rank() == 0:
+        print hline
+        print 'STANDARD OUTPUT FROM ALL TESTS:'
+        print hline
+    MPI_COMM_WORLD.Barrier()
+
+    from cStringIO import StringIO
+    mystream = StringIO()
+    tests = unittest.TestLoader().loadTestsFromTestCase(CostModelParTests)
+    unittest.TextTestRunner(stream=mystream).run(tests)
+    MPI_COMM_WORLD.Barrier()
+
+    results = MPI_COMM_WORLD.gather(mystream.getvalue())
+    if MPI_COMM_WORLD.Get_rank() == 0:
+        for rank, result in enumerate(results):
+            print hline
+            print 'TESTS RESULTS FOR RANK ' + str(rank) + ':'
+            print hline
+            print str(result)
@@ -0,0 +1,102 @@
+"""
+Unit tests (serial only) for the CostModel class
+
+_______________________________________________________________________________
+Created on Oct 18, 2026
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from asaptools import costmodel
+from asaptools.timekeeper import TimeKeeper
+from asaptools.partition import WeightBalanced
+from os import linesep
+
+
+def test_message(name, data, actual, expected):
+    spcr = ' ' * len(name)
+    return ''.join([name, ' - data:     ', str(data), linesep,
+                    spcr, ' - actual:   ', str(actual), linesep,
+                    spcr, ' - expected: ', str(expected), linesep])
+
+
+class CostModelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'costs.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testPredictLinear(self):
+        model = costmodel.CostModel()
+        for size in xrange(1, 11):
+            model.record((size, 2 * size % 3), 0.5 + 2.0 * size)
+        actual = model.predict((20, 1))
+        expected = 40.5
+        msg = test_message('predict(linear)', (20, 1), actual, expected)
+        print msg
+        self.assertAlmostEqual(actual, expected, msg=msg)
+
+    def testPredictFallbacks(self):
+        model = costmodel.CostModel()
+        actual = model.predict(5, default=3.0)
+        msg = test_message('predict(empty)', 5, actual, 3.0)
+        print msg
+        self.assertEqual(actual, 3.0, msg)
+
+        model.record(1, 2.0)
+        model.record(2, 4.0)
+        actual = model.predict(10)
+        msg = test_message('predict(mean)', 10, actual, 3.0)
+        print msg
+        self.assertEqual(model.fit(), None, msg)
+        self.assertEqual(actual, 3.0, msg)
+
+    def testSaveLoad(self):
+        model = costmodel.CostModel(self.filename, max_records=3)
+        for size in xrange(5):
+            model.record(size, size, kind='a')
+        model.record(1, 7.0, kind='b')
+        model.save()
+        actual = costmodel.CostModel(self.filename).get_records()
+        expected = {'a': [([2.0], 2.0), ([3.0], 3.0), ([4.0], 4.0)],
+                    'b': [([1.0], 7.0)]}
+        msg = test_message('save/load', None, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(os.listdir(self.tmpdir), ['costs.json'], msg)
+
+    def testRecordTimes(self):
+        times = iter([0.0, 1.0, 1.0, 4.0, 4.0, 9.0])
+        tk = TimeKeeper(time=lambda: next(times))
+        for task in ['x', 'y', 'z']:
+            tk.start(task)
+            tk.stop(task)
+        model = costmodel.CostModel()
+        model.record_times(tk, {'x': 1, 'y': 3})
+        actual = model.get_records()
+        expected = {'default': [([1.0], 1.0), ([3.0], 3.0)]}
+        msg = test_message('record_times', None, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testWeights(self):
+        model = costmodel.CostModel()
+        for size in xrange(1, 6):
+            model.record(size, 10.0 * size)
+        tasks = ['a' * n for n in [1, 4, 2, 3]]
+        actual = model.weights(tasks, features=len)
+        msg = test_message('weights', tasks, actual, None)
+        print msg
+        for ((task, weight), n) in zip(actual, [1, 4, 2, 3]):
+            self.assertAlmostEqual(weight, 10.0 * n, msg=msg)
+        parts = WeightBalanced().plan(actual, 2)
+        self.assertEqual(sorted(map(len, parts)), [2, 2], msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Parallel Tests for the CommExecutor class
+
+_______________________________________________________________________________
+Created on Oct 18, 2026
+"""
+import unittest
+
+from asaptools import simplecomm
+from asaptools.executor import CommExecutor
+from concurrent import futures
+from os import linesep as eol
+from mpi4py import MPI
+MPI_COMM_WORLD = MPI.COMM_WORLD
+
+
+def test_info_msg(rank, size, name, data, actual, expected):
+    rknm = ''.join(['[', str(rank), '/', str(size), '] ', str(name)])
+    spcr = ' ' * len(rknm)
+    msg = ''.join([eol,
+                   rknm, ' - Input: ', str(data), eol,
+                   spcr, ' - Actual:   ', str(actual), eol,
+                   spcr, ' - Expected: ', str(expected)])
+    return msg
+
+
+def square(x):
+    return x * x
+
+
+def add(x, y):
+    return x + y
+
+
+def fail(x):
+    raise ValueError(x)
+
+
+def closure(x):
+    return lambda: x
+
+
+def fail_closure(x):
+    raise ValueError(lambda: x)
+
+
+class CommExecutorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gcomm = simplecomm.create_comm()
+        self.size = MPI_COMM_WORLD.Get_size()
+        self.rank = MPI_COMM_WORLD.Get_rank()
+
+    def tearDown(self):
+        pass
+
+    def testSubmit(self):
+        data = range(10)
+        with CommExecutor(self.gcomm) as executor:
+            if self.gcomm.is_manager():
+                fs = [executor.submit(square, x) for x in data]
+                actual = [f.result() for f in fs]
+            else:
+                actual = None
+        expected = map(square, data) if self.gcomm.is_manager() else None
+        msg = test_info_msg(
+            self.rank, self.size, 'submit', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testAsCompleted(self):
+        data = range(10)
+        with CommExecutor(self.gcomm) as executor:
+            if self.gcomm.is_manager():
+                fs = [executor.submit(square, x) for x in data]
+                actual = sorted(f.result() for f in futures.as_completed(fs))
+            else:
+                actual = None
+        expected = map(square, data) if self.gcomm.is_manager() else None
+        msg = test_info_msg(
+            self.rank, self.size, 'as_completed', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testMapChunked(self):
+        data = range(23)
+        with CommExecutor(self.gcomm) as executor:
+            if self.gcomm.is_manager():
+                actual = list(executor.map(add, data, data, chunksize=4))
+            else:
+                actual = None
+        expected = map(add, data, data) if self.gcomm.is_manager() else None
+        msg = test_info_msg(
+            self.rank, self.size, 'map(chunksize=4)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testException(self):
+        with CommExecutor(self.gcomm) as executor:
+            if self.gcomm.is_manager():
+                future = executor.submit(fail, 3)
+                self.assertRaises(ValueError, future.result)
+
+    def testUnpicklable(self):
+        if self.size == 1:
+            return
+        with CommExecutor(self.gcomm) as executor:
+            if self.gcomm.is_manager():
+                fs = [executor.submit(lambda x: x, 1),
+                      executor.submit(closure, 2),
+                      executor.submit(fail_closure, 3),
+                      executor.submit(square, 4)]
+                actual = [f.exception(timeout=30) for f in fs[:3]]
+                actual.append(fs[3].result(timeout=30))
+            else:
+                actual = None
+        if self.gcomm.is_manager():
+            msg = test_info_msg(
+                self.rank, self.size, 'unpicklable', None, actual, None)
+            print msg
+            self.assertIsInstance(actual[0], Exception, msg)
+            self.assertIsInstance(actual[1], RuntimeError, msg)
+            self.assertIsInstance(actual[2], RuntimeError, msg)
+            self.assertEqual(actual[3], 16, msg)
+
+    def testSerial(self):
+        data = range(10)
+        scomm = simplecomm.create_comm(serial=True)
+        with CommExecutor(scomm, max_workers=2) as executor:
+            actual = list(executor.map(lambda x: -x, data, chunksize=3))
+        expected = [-x for x in data]
+        msg = test_info_msg(
+            self.rank, self.size, 'serial map', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        with CommExecutor(scomm) as executor:
+            actual = executor._pool._max_workers
+        expected = futures.ThreadPoolExecutor()._max_workers
+        msg = test_info_msg(
+            self.rank, self.size, 'serial max_workers', None, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+
+if __name__ == "__main__":
+    hline = '=' * 70
+    if MPI_COMM_WORLD.Get_rank() == 0:
+        print hline
+        print 'STANDARD OUTPUT FROM ALL TESTS:'
+        print hline
+    MPI_COMM_WORLD.Barrier()
+
+    from cStringIO import StringIO
+    mystream = StringIO()
+    tests = unittest.TestLoader().loadTestsFromTestCase(CommExecutorTests)
+    unittest.TextTestRunner(stream=mystream).run(tests)
+    MPI_COMM_WORLD.Barrier()
+
+    results = MPI_COMM_WORLD.gather(mystream.getvalue())
+    if MPI_COMM_WORLD.Get_rank() == 0:
+        for rank, result in enumerate(results):
+            print hline
+            print 'TESTS RESULTS FOR RANK ' + str(rank) + ':'
+            print hline
+            print str(result)
@@ -106,6 +106,213 @@ class partitionArrayTests(unittest.TestCase):
             print msg
             self.assertEqual(actual, expected, msg)
 
+    def testWeightBalancedSeparate(self):
+        items = numpy.arange(500) * 10
+        weights = numpy.random.RandomState(17).randint(0, 20, 500)
+        pairs = zip(items.tolist(), weights.tolist())
+        for size in [1, 7, 64]:
+            actual = partition.WeightBalanced().plan((items, weights), size)
+            expected = partition.WeightBalanced().plan(pairs, size)
+            msg = test_info_msg(
+                'WeightBalanced', '<random>', None, size, actual, expected)
+            for (a, e) in zip(actual, expected):
+                self.assertTrue(isinstance(a, numpy.ndarray), msg)
+                numpy.testing.assert_array_equal(a, e, msg)
+
+    def testMultiConstraintSeparate(self):
+        items = numpy.arange(500) * 10
+        weights = numpy.random.RandomState(17).randint(1, 20, (500, 2))
+        pairs = zip(items.tolist(), map(tuple, weights.tolist()))
+        for size in [1, 7, 64]:
+            limit = weights[:, 1].sum() * 1.2 / size
+            pfunc = partition.MultiConstraint(capacities=(None, limit))
+            actual = pfunc.plan((items, weights), size)
+            expected = pfunc.plan(pairs, size)
+            msg = test_info_msg(
+                'MultiConstraint', '<random>', None, size, pfunc.loads, limit)
+            print msg
+            self.assertTrue(max(l[1] for l in pfunc.loads) <= limit, msg)
+            for (a, e) in zip(actual, expected):
+                self.assertTrue(isinstance(a, numpy.ndarray), msg)
+                numpy.testing.assert_array_equal(a, e, msg)
+
+    def testFingerprint(self):
+        data = numpy.arange(100)
+        actual = partition.fingerprint((data, data[::2]))
+        expected = partition.fingerprint((numpy.arange(100),
+                                          numpy.arange(0, 100, 2)))
+        msg = test_info_msg('fingerprint', '<arange>', None, None, actual,
+                            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertNotEqual(partition.fingerprint(data),
+                            partition.fingerprint(data.astype(float)), msg)
+        self.assertNotEqual(partition.fingerprint(data),
+                            partition.fingerprint(data.reshape(10, 10)), msg)
+        self.assertNotEqual(partition.fingerprint(range(5)),
+                            partition.fingerprint(range(6)), msg)
+
+    def testEvaluate(self):
+        items = numpy.arange(1000)
+        weights = numpy.random.RandomState(17).rand(1000)
+        for size in [1, 7, 64]:
+            pfunc = partition.WeightBalanced()
+            actual = partition.evaluate(pfunc, (items, weights), size)
+            msg = test_info_msg('evaluate', '<random>', None, size,
+                                actual['makespan'], pfunc.makespan)
+            print msg
+            self.assertEqual(sum(actual['counts']), 1000, msg)
+            self.assertAlmostEqual(actual['makespan'], pfunc.makespan,
+                                   msg=msg)
+            self.assertAlmostEqual(sum(actual['weights']), weights.sum(),
+                                   msg=msg)
+
+        items = range(8)
+        coords = numpy.arange(16.0).reshape(8, 2)
+        weights = numpy.array([100.0] + [1.0] * 7)
+        data = (items, coords, weights)
+        for pfunc in [partition.SpaceFillingCurve(),
+                      partition.Cached(partition.SpaceFillingCurve())]:
+            actual = partition.evaluate(pfunc, data, 2)
+            msg = test_info_msg('evaluate', data, None, 2, actual, None)
+            print msg
+            self.assertEqual(actual['weights'], [100.0, 7.0], msg)
+            self.assertEqual(actual['counts'], [1, 7], msg)
+
+        actual = partition.evaluate(partition.BlockND(),
+                                    numpy.zeros((4, 6)), 4)
+        msg = test_info_msg('evaluate', '<zeros>', None, 4, actual, None)
+        print msg
+        self.assertEqual(actual['counts'], [6, 6, 6, 6], msg)
+
+    def testContiguousWeighted(self):
+        items = numpy.arange(1000)
+        weights = numpy.random.RandomState(17).rand(1000)
+        for size in [1, 7, 64]:
+            pfunc = partition.ContiguousWeighted()
+            actual = pfunc.plan((items, weights), size)
+            msg = test_info_msg('ContiguousWeighted', '<random>', None, size,
+                                pfunc.makespan, weights.sum() / size)
+            print msg
+            numpy.testing.assert_array_equal(numpy.concatenate(actual), items)
+            for part in actual:
+                self.assertTrue(part.base is items, msg)
+            loads = [weights[part].sum() for part in actual]
+            self.assertAlmostEqual(max(loads), pfunc.makespan, msg=msg)
+            self.assertTrue(pfunc.makespan <= weights.sum() / size + 1, msg)
+
+    def testBlockND(self):
+        data = numpy.arange(6 * 8 * 2).reshape(6, 8, 2)
+        pfunc = partition.BlockND(axes=(0, 1))
+        for size in [1, 4, 6, 7]:
+            grid = pfunc.grid(data.shape, size)
+            actual = pfunc.plan(data, size)
+            msg = test_info_msg('BlockND', data.shape, None, size,
+                                [(o, b.shape) for (o, b) in actual], grid)
+            print msg
+            self.assertEqual(numpy.prod(grid), size, msg)
+            self.assertEqual(grid[2], 1, msg)
+            self.assertEqual(len(actual), size, msg)
+            covered = numpy.zeros(data.shape, dtype=int)
+            for (i, (offsets, block)) in enumerate(actual):
+                self.assertEqual(pfunc(data, i, size)[0], offsets, msg)
+                self.assertTrue(numpy.may_share_memory(block, data), msg)
+                index = tuple(slice(o, o + n)
+                              for (o, n) in zip(offsets, block.shape))
+                numpy.testing.assert_array_equal(data[index], block, msg)
+                covered[index] += 1
+            self.assertTrue((covered == 1).all(), msg)
+        self.assertEqual(partition.BlockND().grid((100, 100), 16), (4, 4))
+        self.assertEqual(partition.BlockND().grid((400, 100), 16), (8, 2))
+
+    def testSpaceFillingCurve(self):
+        coords = numpy.indices((8, 8)).reshape(2, -1).T
+        items = numpy.arange(64)
+        for curve in ['hilbert', 'morton']:
+            pfunc = partition.SpaceFillingCurve(curve=curve, bits=3)
+            actual = pfunc.plan((items, coords), 4)
+            quadrants = [set(map(tuple, coords[part] // 4)) for part in actual]
+            msg = test_info_msg('SpaceFillingCurve', curve, None, 4,
+                                quadrants, '4 distinct quadrants')
+            print msg
+            self.assertTrue(all(len(q) == 1 for q in quadrants), msg)
+            self.assertEqual(len(set.union(*quadrants)), 4, msg)
+
+        path = coords[partition.SpaceFillingCurve(bits=3).plan(
+            (items, coords), 1)[0]]
+        steps = numpy.abs(numpy.diff(path, axis=0)).sum(axis=1)
+        self.assertTrue((steps == 1).all())
+
+        weights = numpy.ones(64)
+        weights[:8] = 8
+        actual = partition.SpaceFillingCurve(bits=3).plan(
+            (items, coords, weights), 4)
+        loads = [weights[part].sum() for part in actual]
+        self.assertEqual(sorted(numpy.concatenate(actual)), range(64))
+        self.assertTrue(max(loads) <= weights.sum() / 4 + 8, loads)
+
+    def testHashVectorized(self):
+        data = numpy.arange(-100, 5000)
+        for pfunc in [partition.HashPartition(), partition.ConsistentHash(),
+                      partition.HashPartition(key=lambda x: x // 10,
+                                              vectorized=True)]:
+            for size in [1, 7, 16]:
+                actual = pfunc.plan(data, size)
+                expected = pfunc.plan(data.tolist(), size)
+                msg = test_info_msg(type(pfunc).__name__, '<range>', None,
+                                    size, actual, expected)
+                print msg
+                for (a, e) in zip(actual, expected):
+                    self.assertTrue(isinstance(a, numpy.ndarray), msg)
+                    numpy.testing.assert_array_equal(a, e, msg)
+
+    def testIndices(self):
+        data = numpy.arange(60).reshape(20, 3)
+        weights = numpy.arange(20) % 7
+        inputs = [(partition.EqualLength(), data),
+                  (partition.EqualStride(), data),
+                  (partition.BlockND(), data),
+                  (partition.WeightBalanced(), (data, weights)),
+                  (partition.SortedStride(), (data, weights)),
+                  (partition.ContiguousWeighted(), (data, weights)),
+                  (partition.SpaceFillingCurve(), (data, data[:, :2])),
+                  (partition.HashPartition(), data[:, 0]),
+                  (partition.RangePartition(), data[:, 0])]
+        for (pfunc, pdata) in inputs:
+            indices = pfunc.indices(pdata, 4)
+            actual = list(pfunc.select(pdata, indices))
+            expected = pfunc.plan(pdata, 4)
+            msg = test_info_msg(type(pfunc).__name__ + '.indices', '<array>',
+                                indices, 4, actual, expected)
+            print msg
+            for (a, e) in zip(actual, expected):
+                if type(e) is tuple:
+                    self.assertEqual(a[0], e[0], msg)
+                    (a, e) = (a[1], e[1])
+                numpy.testing.assert_array_equal(a, e, msg)
+                if isinstance(pfunc, (partition.EqualLength,
+                                      partition.EqualStride,
+                                      partition.BlockND,
+                                      partition.ContiguousWeighted)):
+                    self.assertTrue(numpy.may_share_memory(a, data), msg)
+
+    def testPlan(self):
+        pfuncs = [partition.EqualLength(), partition.EqualStride(),
+                  partition.SortedStride(), partition.WeightBalanced(),
+                  partition.ContiguousWeighted(), partition.HashPartition(),
+                  partition.ConsistentHash()]
+        for pfunc in pfuncs:
+            for inp in self.inputs:
+                weights = numpy.array([(3 - i) ** 2 for i in inp[0]])
+                data = numpy.dstack((inp[0], weights))[0]
+                actual = pfunc.plan(data, inp[2])
+                expected = [pfunc(data, i, inp[2]) for i in xrange(inp[2])]
+                msg = test_info_msg(type(pfunc).__name__ + '.plan', data,
+                                    None, inp[2], actual, expected)
+                print msg
+                for (a, e) in zip(actual, expected):
+                    numpy.testing.assert_array_equal(a, e, msg)
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testBasicInt']
@@ -5,9 +5,15 @@ Created on Feb 4, 2015
 
 @author: Kevin Paul <kpaul@ucar.edu>
 """
+import os
+import shutil
+import tempfile
 import unittest
 from asaptools import partition
 from os import linesep
+from random import Random
+from operator import itemgetter
+from collections import OrderedDict
 
 
 def test_info_msg(name, data, index, size, actual, expected):
@@ -104,6 +110,491 @@ class partitionTests(unittest.TestCase):
             print msg
             self.assertEqual(actual, expected, msg)
 
+    def testWeightBalancedGreedy(self):
+        rng = Random(17)
+        data = [(i, rng.randint(0, 20)) for i in xrange(500)]
+        for size in [1, 7, 64]:
+            sorted_pairs = sorted(data, key=itemgetter(1), reverse=True)
+            expected = [[] for _ in xrange(size)]
+            weights = [0] * size
+            for (item, weight) in sorted_pairs:
+                k = min(enumerate(weights), key=itemgetter(1))[0]
+                expected[k].append(item)
+                weights[k] += weight
+            actual = partition.WeightBalanced().plan(data, size)
+            msg = test_info_msg(
+                'WeightBalanced', '<random>', None, size, actual, expected)
+            self.assertEqual(actual, expected, msg)
+
+    def testKarmarkarKarp(self):
+        data = [('a', 8), ('b', 7), ('c', 6), ('d', 5), ('e', 4)]
+        pfunc = partition.KarmarkarKarp()
+        actual = pfunc.plan(data, 2)
+        expected = [['b', 'd', 'e'], ['a', 'c']]
+        msg = test_info_msg('KarmarkarKarp', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(sorted(map(sorted, actual)),
+                         sorted(map(sorted, expected)), msg)
+        self.assertEqual(pfunc.makespan, 16, msg)
+        lpt = partition.WeightBalanced()
+        lpt.plan(data, 2)
+        self.assertEqual(lpt.makespan, 17, msg)
+
+    def testMultifit(self):
+        data = [('a', 3), ('b', 3), ('c', 2), ('d', 2), ('e', 2)]
+        pfunc = partition.Multifit()
+        actual = pfunc.plan(data, 2)
+        expected = [['a', 'b'], ['c', 'd', 'e']]
+        msg = test_info_msg('Multifit', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.makespan, 6, msg)
+
+    def testLocalSearch(self):
+        data = [('a', 3), ('b', 3), ('c', 2), ('d', 2), ('e', 2)]
+        pfunc = partition.WeightBalanced(time_limit=1.0)
+        actual = pfunc.plan(data, 2)
+        expected = [['c', 'd', 'e'], ['a', 'b']]
+        msg = test_info_msg('WeightBalanced', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(sorted(map(sorted, actual)),
+                         sorted(map(sorted, expected)), msg)
+        self.assertEqual(pfunc.makespan, 6, msg)
+
+    def testMakespans(self):
+        rng = Random(23)
+        data = [(i, rng.choice([1, 2, 3, 50, 100])) for i in xrange(200)]
+        lpt = partition.WeightBalanced()
+        pfuncs = [partition.KarmarkarKarp(), partition.Multifit(),
+                  partition.WeightBalanced(time_limit=1.0),
+                  partition.KarmarkarKarp(time_limit=1.0)]
+        for size in [2, 7, 16]:
+            lpt.plan(data, size)
+            for pfunc in pfuncs:
+                actual = pfunc.plan(data, size)
+                loads = [sum(dict(data)[i] for i in part) for part in actual]
+                name = type(pfunc).__name__
+                msg = test_info_msg(name, '<random>', None, size,
+                                    pfunc.makespan, lpt.makespan)
+                self.assertEqual(sorted(sum(actual, [])), range(200), msg)
+                self.assertEqual(pfunc.makespan, max(loads), msg)
+                if not isinstance(pfunc, partition.KarmarkarKarp):
+                    self.assertTrue(pfunc.makespan <= lpt.makespan, msg)
+
+    def testMultiConstraint(self):
+        data = [('a', (5, 1)), ('b', (4, 3)), ('c', (3, 3)), ('d', (2, 1)),
+                ('e', (2, 2))]
+        pfunc = partition.MultiConstraint(capacities=(None, 5))
+        actual = pfunc.plan(data, 2)
+        expected = [['a', 'c', 'd'], ['b', 'e']]
+        msg = test_info_msg('MultiConstraint', data, None, 2, actual,
+                            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.makespan, 10, msg)
+        self.assertEqual(pfunc.loads, [[10, 5], [6, 5]], msg)
+
+        pfunc = partition.MultiConstraint(capacities=[(None, 6), (8, 4)])
+        actual = pfunc.plan(data, 2)
+        msg = test_info_msg('MultiConstraint', data, None, 2, actual,
+                            pfunc.capacities)
+        print msg
+        for (load, limit) in zip(pfunc.loads, pfunc.capacities):
+            self.assertTrue(all(c is None or l <= c
+                                for (l, c) in zip(load, limit)), msg)
+
+        for capacities in [(None, 4), (None, 2.5), (1, None), [(None, 5)],
+                           (None, 5, 5)]:
+            pfunc = partition.MultiConstraint(capacities=capacities)
+            self.assertRaises(ValueError, pfunc.plan, data, 2)
+        pfunc = partition.MultiConstraint(capacities=(None, 4))
+        self.assertRaises(ValueError, pfunc.plan,
+                          [('x', (1, 3)), ('y', (1, 3)), ('z', (1, 2))], 2)
+
+    def testCapacities(self):
+        data = [(i, 1) for i in xrange(12)]
+        capacities = [1, 2, 1]
+        pfuncs = [partition.EqualLength(capacities),
+                  partition.WeightBalanced(capacities=capacities),
+                  partition.ContiguousWeighted(capacities)]
+        for pfunc in pfuncs:
+            actual = pfunc.plan(data, 3)
+            msg = test_info_msg(type(pfunc).__name__, data, None, 3,
+                                map(len, actual), [3, 6, 3])
+            print msg
+            self.assertEqual(map(len, actual), [3, 6, 3], msg)
+            self.assertRaises(ValueError, pfunc.plan, data, 2)
+
+        data = [('a', 4), ('b', 3), ('c', 3), ('d', 2)]
+        pfunc = partition.WeightBalanced(capacities=[1, 2])
+        actual = pfunc.plan(data, 2)
+        expected = [['b'], ['a', 'c', 'd']]
+        msg = test_info_msg('WeightBalanced', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.makespan, 4.5, msg)
+
+        pfunc = partition.ContiguousWeighted([2, 2, 2])
+        actual = pfunc.plan([(i, 1) for i in xrange(12)], 3)
+        expected = [range(0, 4), range(4, 8), range(8, 12)]
+        msg = test_info_msg('ContiguousWeighted', data, None, 3, actual,
+                            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.makespan, 2, msg)
+        self.assertRaises(ValueError, partition.EqualLength([1, 0]).plan,
+                          range(5), 2)
+
+    def testAffinity(self):
+        data = [(('f1', 'T'), 2), (('f2', 'U'), 1), (('f1', 'V'), 1),
+                (('f3', 'T'), 3), (('f2', 'X'), 1), (('f1', 'Q'), 1)]
+        pfunc = partition.Affinity(key=itemgetter(0))
+        actual = pfunc.plan(data, 2)
+        expected = [[('f1', 'T'), ('f1', 'V'), ('f1', 'Q')],
+                    [('f2', 'U'), ('f3', 'T'), ('f2', 'X')]]
+        msg = test_info_msg('Affinity', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.makespan, 5, msg)
+        self.assertEqual(pfunc.spread, 3, msg)
+
+        data = ['a', 'b', 'a', 'a', 'a', 'a', 'c', 'b']
+        pfunc = partition.Affinity()
+        actual = pfunc.plan(data, 3)
+        expected = [['a', 'a', 'a'], ['a', 'a', 'c'], ['b', 'b']]
+        msg = test_info_msg('Affinity', data, None, 3, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.spread, 4, msg)
+
+    def testContiguousWeighted(self):
+        data = [('a', 1), ('b', 9), ('c', 1), ('d', 1), ('e', 8), ('f', 1)]
+        results = [[['a', 'b', 'c', 'd', 'e', 'f']],
+                   [['a', 'b'], ['c', 'd', 'e', 'f']],
+                   [['a', 'b'], ['c', 'd', 'e'], ['f']],
+                   [['a'], ['b'], ['c', 'd'], ['e', 'f'], [], []]]
+        makespans = [21, 11, 10, 9]
+        for (expected, makespan) in zip(results, makespans):
+            pfunc = partition.ContiguousWeighted()
+            actual = pfunc.plan(data, len(expected))
+            msg = test_info_msg('ContiguousWeighted', data, None,
+                                len(expected), actual, expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+            self.assertEqual(pfunc.makespan, makespan, msg)
+
+    def testHashPartition(self):
+        data = ['a', 'b', 'c', u'd', (1, 2), 10, 11]
+        pfunc = partition.HashPartition()
+        actual = pfunc.plan(data, 3)
+        expected = [pfunc.hash(x) % 3 for x in data]
+        msg = test_info_msg('HashPartition', data, None, 3, actual, expected)
+        print msg
+        for (i, part) in enumerate(actual):
+            self.assertEqual(part, [x for (x, k) in zip(data, expected)
+                                    if k == i], msg)
+        self.assertEqual(pfunc.hash('a'), pfunc.hash(u'a'), msg)
+        self.assertEqual(partition.HashPartition(key=len).plan(
+            ['a', 'bb', 'cc', 'ddd'], 2)[pfunc.hash(2) % 2], ['bb', 'cc'])
+
+    def testConsistentHash(self):
+        data = range(-100, 5000)
+        pfunc = partition.ConsistentHash()
+        for size in [1, 7, 16]:
+            before = pfunc.buckets(data, size)
+            after = pfunc.buckets(data, size + 1)
+            moved = [b for (a, b) in zip(before, after) if a != b]
+            msg = test_info_msg('ConsistentHash', '<range>', None, size,
+                                len(moved), len(data) / (size + 1))
+            print msg
+            self.assertTrue(all(b == size for b in moved), msg)
+            self.assertTrue(len(moved) < 1.2 * len(data) / (size + 1), msg)
+
+    def testRangePartition(self):
+        data = [('a', 5), ('b', 1), ('c', 9), ('d', 3), ('e', 7), ('f', 3)]
+        pfunc = partition.RangePartition(splitters=[3, 7], key=itemgetter(1))
+        actual = pfunc.plan(data, 3)
+        expected = [[('b', 1)], [('a', 5), ('d', 3), ('f', 3)],
+                    [('c', 9), ('e', 7)]]
+        msg = test_info_msg('RangePartition', data, None, 3, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertRaises(ValueError, pfunc.plan, data, 2)
+
+        data = Random(5).sample(xrange(1000), 1000)
+        actual = partition.RangePartition().plan(data, 4)
+        msg = test_info_msg('RangePartition', '<random>', None, 4,
+                            map(len, actual), 250)
+        print msg
+        for (lower, upper) in zip(actual[:-1], actual[1:]):
+            self.assertTrue(max(lower) < min(upper), msg)
+        self.assertTrue(all(125 <= len(part) <= 375 for part in actual), msg)
+
+    def testStreamPartition(self):
+        data = xrange(10)
+        actual = partition.StreamRoundRobin().plan(iter(data), 3)
+        expected = partition.EqualStride().plan(range(10), 3)
+        msg = test_info_msg('StreamRoundRobin', data, None, 3, actual,
+                            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        data = [('a', 4), ('b', 1), ('c', 2), ('d', 5), ('e', 1)]
+        actual = partition.StreamWeightBalanced().plan(iter(data), 2)
+        expected = [['a', 'e'], ['b', 'c', 'd']]
+        msg = test_info_msg('StreamWeightBalanced', data, None, 2, actual,
+                            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        data = ['aaaa', 'b', 'cc', 'ddddd', 'e']
+        pfunc = partition.StreamWeightBalanced(weight=len)
+        actual = [pfunc((s for s in data), i, 2) for i in xrange(2)]
+        expected = [['aaaa', 'e'], ['b', 'cc', 'ddddd']]
+        msg = test_info_msg('StreamWeightBalanced', data, None, 2, actual,
+                            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        actual = partition.StreamRoundRobin().plan(5, 2)
+        msg = test_info_msg('StreamRoundRobin', 5, None, 2, actual,
+                            [[5], []])
+        print msg
+        self.assertEqual(actual, [[5], []], msg)
+        self.assertEqual(partition.StreamRoundRobin().indices(data, 2), None)
+
+    def testRebalance(self):
+        data = [[('a', 3), ('b', 3), ('c', 3), ('d', 3)], [('e', 1)], []]
+        pfunc = partition.Rebalance()
+        actual = pfunc.plan(data, 3)
+        expected = [[('a', 3)], [('e', 1), ('c', 3)], [('b', 3), ('d', 3)]]
+        msg = test_info_msg('Rebalance', data, None, 3, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+        self.assertEqual(pfunc.moves([[3, 3, 3, 3], [1], [0]], 3),
+                         [(0, 1, [2]), (0, 2, [1, 3])], msg)
+
+        data = [[], range(9)]
+        actual = partition.Rebalance(capacities=[2, 1]).plan(data, 2)
+        expected = [[3, 4, 5, 6, 7, 8], [0, 1, 2]]
+        msg = test_info_msg('Rebalance', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        data = [[1, 2], [3, 4]]
+        actual = partition.Rebalance().plan(data, 2)
+        msg = test_info_msg('Rebalance', data, None, 2, actual, data)
+        print msg
+        self.assertEqual(actual, data, msg)
+        self.assertRaises(ValueError, partition.Rebalance().plan, data, 3)
+
+    def testCached(self):
+        data = [(i, i % 5) for i in xrange(20)]
+        pfunc = partition.Cached(partition.WeightBalanced(), maxsize=1)
+        expected = partition.WeightBalanced().plan(data, 3)
+        actual = [pfunc.plan(data, 3), pfunc.plan(list(data), 3),
+                  [pfunc(data, i, 3) for i in xrange(3)]]
+        msg = test_info_msg('Cached', data, None, 3, actual, expected)
+        print msg
+        self.assertEqual(actual, [expected] * 3, msg)
+        self.assertEqual((pfunc.hits, pfunc.misses), (4, 1), msg)
+
+        pfunc.plan(data, 4)
+        pfunc.plan(data, 3)
+        self.assertEqual((pfunc.hits, pfunc.misses), (4, 3), msg)
+        self.assertEqual(pfunc.plan(5, 2), [[5], []], msg)
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            partition.Cached(partition.SortedStride(),
+                             directory=tmpdir).plan(data, 3)
+            pfunc = partition.Cached(partition.SortedStride(),
+                                     directory=tmpdir)
+            actual = pfunc.plan(data, 3)
+            expected = partition.SortedStride().plan(data, 3)
+            msg = test_info_msg('Cached', data, None, 3, actual, expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+            self.assertEqual((pfunc.hits, pfunc.misses), (1, 0), msg)
+            self.assertEqual(len(os.listdir(tmpdir)), 1, msg)
+
+            used = partition.WeightBalanced(capacities=[1, 2, 3])
+            used.plan(data[:5], 3)
+            partition.Cached(used, directory=tmpdir).plan(data, 3)
+            pfunc = partition.Cached(partition.WeightBalanced(
+                capacities=[1, 2, 3]), directory=tmpdir)
+            pfunc.plan(data, 3)
+            self.assertEqual((pfunc.hits, pfunc.misses), (1, 0), msg)
+            partition.Cached(partition.WeightBalanced(),
+                             directory=tmpdir).plan(data, 3)
+            self.assertEqual(len(os.listdir(tmpdir)), 3, msg)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testEvaluate(self):
+        data = [('a', 5), ('b', 1), ('c', 9), ('d', 3), ('e', 7), ('f', 3)]
+        actual = partition.evaluate(partition.EqualStride(), data, 2)
+        expected = {'counts': [3, 3], 'weights': [21, 7], 'min': 7,
+                    'mean': 14.0, 'max': 21, 'empty': 0, 'imbalance': 1.5,
+                    'makespan': 21}
+        msg = test_info_msg('evaluate', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        pfunc = partition.WeightBalanced(capacities=[1, 3])
+        actual = partition.evaluate(pfunc, data, 2)
+        msg = test_info_msg('evaluate', data, None, 2, actual, None)
+        print msg
+        self.assertEqual(actual['weights'], [6, 22], msg)
+        self.assertAlmostEqual(actual['makespan'], 22 / 3.0, msg=msg)
+
+        data = ['aa', 'b', 'cccc', '']
+        actual = partition.evaluate(partition.EqualLength(), data, 3,
+                                    weight=len)
+        msg = test_info_msg('evaluate', data, None, 3, actual, None)
+        print msg
+        self.assertEqual(actual['counts'], [2, 1, 1], msg)
+        self.assertEqual(actual['weights'], [3, 4, 0], msg)
+
+    def testEvaluateWeighted(self):
+        data = zip('abcdefghij', [5, 1, 9, 3, 7, 3, 2, 8, 4, 6])
+        weights = dict(data)
+        pfuncs = [partition.SortedStride(), partition.WeightBalanced(),
+                  partition.KarmarkarKarp(), partition.Multifit(),
+                  partition.ContiguousWeighted(), partition.MultiConstraint(),
+                  partition.Affinity(), partition.StreamWeightBalanced()]
+        for pfunc in pfuncs:
+            actual = partition.evaluate(pfunc, data, 3)
+            expected = [sum(weights[x] for x in p)
+                        for p in pfunc.plan(data, 3)]
+            msg = test_info_msg('evaluate', data, None, 3, actual, expected)
+            print msg
+            self.assertEqual(actual['weights'], expected, msg)
+            self.assertAlmostEqual(actual['imbalance'],
+                                   max(expected) / 16.0, msg=msg)
+
+        data = [(i, (i % 3 + 1, 5 - i % 4)) for i in xrange(10)]
+        pfunc = partition.MultiConstraint()
+        actual = partition.evaluate(pfunc, data, 3)
+        vectors = dict(data)
+        expected = [[sum(vectors[x][d] for x in p) for d in xrange(2)]
+                    for p in pfunc.plan(data, 3)]
+        msg = test_info_msg('evaluate', data, None, 3, actual, expected)
+        print msg
+        self.assertEqual(actual['weights'], expected, msg)
+        self.assertEqual(actual['max'], [max(w[d] for w in expected)
+                                         for d in xrange(2)], msg)
+        self.assertEqual(actual['makespan'], max(actual['max']), msg)
+
+    def testCompare(self):
+        data = [('a', 5), ('b', 1), ('c', 9), ('d', 3), ('e', 7), ('f', 3)]
+        pfuncs = [partition.EqualStride(), partition.WeightBalanced(),
+                  partition.KarmarkarKarp()]
+        actual = [(type(f).__name__, r['makespan'])
+                  for (f, r) in partition.compare(pfuncs, data, 2)]
+        expected = [('KarmarkarKarp', 14), ('WeightBalanced', 15),
+                    ('EqualStride', 21)]
+        msg = test_info_msg('compare', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testMapping(self):
+        data = {'d': 2, 'a': 5, 'c': 3, 'e': 4, 'b': 1}
+        actual = partition.EqualStride().plan(data, 2)
+        expected = [{'a': 5, 'c': 3, 'e': 4}, {'b': 1, 'd': 2}]
+        msg = test_info_msg('EqualStride', data, None, 2, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        actual = partition.WeightBalanced().plan(data, 3)
+        expected = [{'a': 5}, {'e': 4, 'b': 1}, {'c': 3, 'd': 2}]
+        msg = test_info_msg('WeightBalanced', data, None, 3, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        data = OrderedDict(('v{0}'.format(i), {'dims': i}) for i in
+                           xrange(5, 0, -1))
+        pfuncs = [partition.EqualLength(), partition.SortedStride(),
+                  partition.WeightBalanced(), partition.HashPartition(),
+                  partition.RangePartition(), partition.Affinity(),
+                  partition.StreamRoundRobin(),
+                  partition.StreamWeightBalanced(weight=len)]
+        for pfunc in pfuncs:
+            actual = pfunc.plan(data, 2)
+            msg = test_info_msg(type(pfunc).__name__, data, None, 2, actual,
+                                None)
+            print msg
+            self.assertTrue(all(type(p) is OrderedDict for p in actual), msg)
+            self.assertEqual(sorted(k for p in actual for k in p),
+                             sorted(data), msg)
+            self.assertEqual(actual, [pfunc(data, i, 2) for i in xrange(2)],
+                             msg)
+            indices = pfunc.indices(data, 2)
+            if indices is not None:
+                self.assertEqual(list(pfunc.select(data, indices)), actual,
+                                 msg)
+        self.assertEqual(partition.EqualLength().plan(data, 2)[0].keys(),
+                         ['v5', 'v4', 'v3'])
+
+        data = {'a': 5, 'b': 1, 'c': 9, 'd': 3}
+        actual = partition.evaluate(partition.EqualStride(), data, 2)
+        msg = test_info_msg('evaluate', data, None, 2, actual, None)
+        print msg
+        self.assertEqual(actual['weights'], [14, 4], msg)
+        self.assertEqual(partition.fingerprint(data),
+                         partition.fingerprint(dict(reversed(data.items()))))
+
+    def testPlan(self):
+        pfuncs = [partition.Duplicate(), partition.EqualLength(),
+                  partition.EqualStride(), partition.SortedStride(),
+                  partition.WeightBalanced(), partition.KarmarkarKarp(),
+                  partition.Multifit(), partition.ContiguousWeighted(),
+                  partition.HashPartition(), partition.ConsistentHash(),
+                  partition.RangePartition(), partition.MultiConstraint(),
+                  partition.Affinity()]
+        for pfunc in pfuncs:
+            for inp in self.inputs:
+                data = zip(inp[0], [(3 - i) ** 2 for i in inp[0]])
+                actual = pfunc.plan(data, inp[2])
+                expected = [pfunc(data, i, inp[2]) for i in xrange(inp[2])]
+                msg = test_info_msg(type(pfunc).__name__ + '.plan', data,
+                                    None, inp[2], actual, expected)
+                print msg
+                self.assertEqual(actual, expected, msg)
+
+    def testIndices(self):
+        pfuncs = [partition.Duplicate(), partition.EqualLength(),
+                  partition.EqualStride(), partition.SortedStride(),
+                  partition.WeightBalanced(), partition.KarmarkarKarp(),
+                  partition.Multifit(), partition.ContiguousWeighted(),
+                  partition.HashPartition(), partition.ConsistentHash(),
+                  partition.RangePartition(), partition.MultiConstraint(),
+                  partition.Affinity()]
+        for pfunc in pfuncs:
+            for inp in self.inputs:
+                for data in [inp[0], zip(inp[0], [(3 - i) ** 2 for i in inp[0]])]:
+                    indices = pfunc.indices(data, inp[2])
+                    actual = list(pfunc.select(data, indices))
+                    expected = pfunc.plan(data, inp[2])
+                    msg = test_info_msg(type(pfunc).__name__ + '.indices',
+                                        data, indices, inp[2], actual, expected)
+                    print msg
+                    self.assertEqual(len(indices), inp[2], msg)
+                    self.assertEqual(actual, expected, msg)
+        self.assertEqual(partition.EqualStride().indices(5, 2), None)
+
+    def testDocstrings(self):
+        for name in dir(partition):
+            obj = getattr(partition, name)
+            if isinstance(obj, type) and \
+                    issubclass(obj, partition.PartitionFunction):
+                self.assertTrue('__doc__' in obj.__dict__ and
+                                obj.__doc__ is not None, name)
+
+    def testPlanOutOfBounds(self):
+        self.assertRaises(IndexError, partition.EqualLength().plan, [1], 0)
+        self.assertRaises(TypeError, partition.WeightBalanced().plan, [1], 1.)
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testBasicInt']
@@ -15,7 +15,7 @@ import unittest
 import numpy as np
 
 from asaptools import simplecomm
-from asaptools.partition import EqualStride, Duplicate
+from asaptools.partition import EqualStride, EqualLength, Duplicate
 from os import linesep
 from mpi4py import MPI
 MPI_COMM_WORLD = MPI.COMM_WORLD
@@ -141,6 +141,26 @@ class SimpleCommP1STests(unittest.TestCase):
         print msg
         self.assertEqual(sresult, presult, msg)
 
+    def testPartitionLocal(self):
+        data = range(10)
+        sresult = self.scomm.partition(data, func=EqualLength(),
+                                       involved=True, local=True)
+        presult = self.pcomm.partition(data, func=EqualLength(),
+                                       involved=True, local=True,
+                                       verify=True)
+        msg = test_info_msg('partition(local)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+
+    def testPartitionMapping(self):
+        data = dict((str(i), i) for i in xrange(5))
+        sresult = self.scomm.partition(data, involved=True)
+        presult = self.pcomm.partition(data, involved=True)
+        msg = test_info_msg('partition(mapping)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+        self.assertEqual(sresult, data, msg)
+
     def testPartitionList(self):
         data = range(5 + self.rank)
         sresult = self.scomm.partition(data, func=EqualStride())
@@ -157,6 +177,16 @@ class SimpleCommP1STests(unittest.TestCase):
         print msg
         self.assertEqual(sresult, presult, msg)
 
+    def testPartitionListInvolvedTree(self):
+        data = range(5 + self.rank)
+        sresult = self.scomm.partition(data, func=EqualStride(), involved=True,
+                                       fanout=2)
+        presult = self.pcomm.partition(data, func=EqualStride(), involved=True,
+                                       fanout=2)
+        msg = test_info_msg('partition(list, T, k=2)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+
     def testPartitionArray(self):
         data = np.arange(2 + self.rank)
         sresult = self.scomm.partition(data)
@@ -173,6 +203,63 @@ class SimpleCommP1STests(unittest.TestCase):
         print msg
         np.testing.assert_array_equal(sresult, presult, msg)
 
+    def testMap(self):
+        data = range(5 + self.rank)
+        sresult = self.scomm.map(lambda x: 2 * x, data)
+        presult = self.pcomm.map(lambda x: 2 * x, data)
+        msg = test_info_msg('map(list)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+
+    def testSpeculate(self):
+        data = range(5 + self.rank)
+        sresult = self.scomm.speculate(lambda x: 2 * x, data)
+        presult = self.pcomm.speculate(lambda x: 2 * x, data)
+        msg = test_info_msg('speculate(list)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+
+    def testStealInvolved(self):
+        data = range(5 + self.rank)
+        sresult = self.scomm.steal(lambda x: 2 * x, data, involved=True)
+        presult = self.pcomm.steal(lambda x: 2 * x, data, involved=True)
+        msg = test_info_msg('steal(list, T)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+
+    def testSort(self):
+        data = [5, 3, 9, 1, 7]
+        sresult = self.scomm.sort(data, key=lambda x: -x)
+        presult = self.pcomm.sort(data, key=lambda x: -x)
+        msg = test_info_msg('sort(list)', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+
+    def testRebalance(self):
+        data = [('a', 3), ('b', 1)]
+        sresult = self.scomm.rebalance(data)
+        presult = self.pcomm.rebalance(data)
+        msg = test_info_msg('rebalance()', data, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+        self.assertEqual(sresult, data, msg)
+
+    def testCalibrate(self):
+        sresult = self.scomm.calibrate(kernel=lambda: None)
+        presult = self.pcomm.calibrate(kernel=lambda: None)
+        msg = test_info_msg('calibrate()', None, sresult, presult)
+        print msg
+        self.assertEqual(sresult, presult, msg)
+        self.assertEqual(sresult, [1.0], msg)
+
+    def testSortArray(self):
+        data = np.array([5, 3, 9, 1, 7])
+        sresult = self.scomm.sort(data)
+        presult = self.pcomm.sort(data)
+        msg = test_info_msg('sort(array)', data, sresult, presult)
+        print msg
+        np.testing.assert_array_equal(sresult, presult, msg)
+
     def testRationError(self):
         data = 10
         self.assertRaises(RuntimeError, self.scomm.ration, data)
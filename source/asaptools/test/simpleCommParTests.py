@@ -9,8 +9,13 @@ Created on Feb 4, 2015
 import unittest
 import numpy as np
 
+from time import sleep
+
 from asaptools import simplecomm
-from asaptools.partition import EqualStride, Duplicate
+from asaptools.partition import EqualStride, EqualLength, Duplicate
+from asaptools.partition import WeightBalanced, BlockND, ContiguousWeighted
+from asaptools.partition import StreamRoundRobin, StreamWeightBalanced
+from asaptools.partition import Rebalance, PartitionFunction
 from os import linesep as eol
 from mpi4py import MPI
 MPI_COMM_WORLD = MPI.COMM_WORLD
@@ -209,6 +214,196 @@ class SimpleCommParTests(unittest.TestCase):
         print msg
         np.testing.assert_array_equal(actual, expected, msg)
 
+    def testPartitionListTree(self):
+        if self.gcomm.is_manager():
+            data = range(10)
+        else:
+            data = None
+        actual = self.gcomm.partition(data, fanout=2)
+        if self.gcomm.is_manager():
+            expected = None
+        else:
+            expected = range(self.rank - 1, 10, self.size - 1)
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(list, k=2)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testPartitionListInvolvedTree(self):
+        if self.gcomm.is_manager():
+            data = range(10)
+        else:
+            data = None
+        actual = self.gcomm.partition(data, involved=True, fanout=3)
+        expected = range(self.rank, 10, self.size)
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(list, T, k=3)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testPartitionArrayTree(self):
+        if self.gcomm.is_manager():
+            data = np.arange(10)
+        else:
+            data = None
+        actual = self.gcomm.partition(data, func=EqualStride(), involved=True,
+                                      fanout=1)
+        expected = np.arange(self.rank, 10, self.size)
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(array, T, k=1)', data, actual, expected)
+        print msg
+        np.testing.assert_array_equal(actual, expected, msg)
+
+    def testPartitionArrayBlocks(self):
+        full = np.arange(12 * 10 * 3, dtype='f8').reshape(12, 10, 3)
+        data = full if self.gcomm.is_manager() else None
+        func = BlockND(axes=(0, 1))
+        actual = self.gcomm.partition(data, func=func, involved=True)
+        expected = func(full, self.rank, self.size)
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(blocks, T)', None, actual[0],
+            expected[0])
+        print msg
+        self.assertEqual(actual[0], expected[0], msg)
+        np.testing.assert_array_equal(actual[1], expected[1], msg)
+
+    def testPartitionArrayWeighted(self):
+        items = np.arange(40).reshape(20, 2)
+        weights = np.arange(20) % 3 + 1
+        data = (items, weights) if self.gcomm.is_manager() else None
+        actual = self.gcomm.partition(data, func=ContiguousWeighted(),
+                                      involved=True)
+        expected = ContiguousWeighted()((items, weights), self.rank, self.size)
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(weighted, T)', None, actual,
+            expected)
+        print msg
+        np.testing.assert_array_equal(actual, expected, msg)
+
+    def testPartitionLocal(self):
+        data = range(50)
+        for involved in [True, False]:
+            actual = self.gcomm.partition(data, func=EqualLength(),
+                                          involved=involved, local=True,
+                                          verify=True)
+            expected = self.gcomm.partition(data, func=EqualLength(),
+                                            involved=involved)
+            msg = test_info_msg(
+                self.rank, self.size, 'partition(local)', data, actual,
+                expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+
+    def testPartitionLocalVerify(self):
+        data = range(50) if self.rank > 0 else range(49)
+        if self.size > 1:
+            self.assertRaises(ValueError, self.gcomm.partition, data,
+                              local=True, verify=True)
+        else:
+            actual = self.gcomm.partition(data, involved=True, local=True,
+                                          verify=True)
+            self.assertEqual(actual, range(49))
+
+    def testPartitionMapping(self):
+        data = dict(('v{0:02d}'.format(i), {'size': i}) for i in xrange(20))
+        for involved in [True, False]:
+            actual = self.gcomm.partition(
+                data if self.gcomm.is_manager() else None,
+                func=EqualLength(), involved=involved)
+            if involved:
+                expected = EqualLength().plan(data, self.size)[self.rank]
+            elif self.rank > 0:
+                expected = EqualLength().plan(data, self.size - 1)[
+                    self.rank - 1]
+            else:
+                expected = None
+            msg = test_info_msg(
+                self.rank, self.size, 'partition(mapping)', data, actual,
+                expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+
+    def testPartitionColumns(self):
+        datasets = [range(100), [i / 4.0 for i in xrange(100)],
+                    ['file{0}.nc'.format(i) for i in xrange(100)],
+                    tuple(u'var\u00e9{0}'.format(i) for i in xrange(100))]
+        for data in datasets:
+            actual = self.gcomm.partition(data, func=EqualLength(),
+                                          involved=True)
+            expected = EqualLength()(data, self.rank, self.size)
+            msg = test_info_msg(
+                self.rank, self.size, 'partition(columns)', data, actual,
+                expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+            self.assertEqual(type(actual), type(expected), msg)
+            self.assertEqual([type(x) for x in actual],
+                             [type(x) for x in expected], msg)
+
+    def testPartitionColumnsArrays(self):
+        comm = simplecomm.create_comm(unpack=False)
+        data = range(comm.COLUMNAR_MIN * self.size)
+        actual = comm.partition(data, func=EqualStride())
+        if self.rank > 0:
+            expected = data[self.rank - 1::self.size - 1]
+            self.assertTrue(isinstance(actual, np.ndarray))
+            actual = actual.tolist()
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(arrays)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+        if self.size == 1:
+            return
+        datasets = [['a' * (i % 3) for i in xrange(40)],
+                    [u'\u00e9' * (i % 3) for i in xrange(40)], range(5)]
+        if self.gcomm.is_manager():
+            actual = [[comm.ration(data) for _ in xrange(1, self.size)]
+                      for data in datasets]
+            expected = [[None] * (self.size - 1)] * len(datasets)
+        else:
+            recvd = [comm.ration() for _ in datasets]
+            actual = [(type(x), getattr(x, 'dtype', None), list(x))
+                      for x in recvd]
+            expected = [(np.ndarray, np.dtype('S2'), datasets[0]),
+                        (np.ndarray, np.dtype('U2'), datasets[1]),
+                        (list, None, datasets[2])]
+        msg = test_info_msg(
+            self.rank, self.size, 'ration(arrays)', datasets, actual,
+            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testPartitionStream(self):
+        data = (i for i in xrange(50)) if self.gcomm.is_manager() else None
+        actual = self.gcomm.partition(data, func=StreamRoundRobin(batch=4),
+                                      involved=True)
+        expected = range(50)[self.rank::self.size]
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(stream, T)', None, actual,
+            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testPartitionStreamWeighted(self):
+        data = ((i, i % 3 + 1) for i in xrange(30)) \
+            if self.gcomm.is_manager() else None
+        actual = self.gcomm.partition(data, func=StreamWeightBalanced(),
+                                      involved=False)
+        if self.gcomm.is_manager():
+            expected = None
+        else:
+            items = [(i, i % 3 + 1) for i in xrange(30)]
+            expected = StreamWeightBalanced()(
+                iter(items), self.rank - 1, self.size - 1)
+        msg = test_info_msg(
+            self.rank, self.size, 'partition(stream, F)', None, actual,
+            expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
     def testCollectInt(self):
         if self.gcomm.is_manager():
             data = None
@@ -245,6 +440,23 @@ class SimpleCommParTests(unittest.TestCase):
         else:
             self.assertEqual(actual, expected, msg)
 
+    def testCollectColumns(self):
+        if self.gcomm.is_manager():
+            data = None
+            actual = sorted(self.gcomm.collect()
+                            for _ in xrange(1, self.size))
+            expected = [(i, tuple(str(i * j) for j in xrange(50)))
+                        for i in xrange(1, self.size)]
+        else:
+            data = tuple(str(self.rank * j) for j in xrange(50))
+            actual = self.gcomm.collect(data)
+            expected = None
+        self.gcomm.sync()
+        msg = test_info_msg(
+            self.rank, self.size, 'collect(columns)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
     def testCollectArray(self):
         if self.gcomm.is_manager():
             data = None
@@ -265,6 +477,250 @@ class SimpleCommParTests(unittest.TestCase):
         else:
             self.assertEqual(actual, expected, msg)
 
+    def testCollectArrayView(self):
+        if self.gcomm.is_manager():
+            data = None
+            actual = sorted((i, x.tolist()) for (i, x) in
+                            [self.gcomm.collect() for _ in xrange(1, self.size)])
+            expected = [(i, (np.arange(20).reshape(4, 5) + i)[::2, 1::2].tolist())
+                        for i in xrange(1, self.size)]
+        else:
+            data = (np.arange(20).reshape(4, 5) + self.rank)[::2, 1::2]
+            actual = self.gcomm.collect(data)
+            expected = None
+        self.gcomm.sync()
+        msg = test_info_msg(
+            self.rank, self.size, 'collect(view)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testCollectArrayViewDtypes(self):
+        for dtype in ['f4', 'f8', 'c16', 'i2']:
+            base = np.arange(30, dtype=dtype).reshape(5, 6)
+            if self.gcomm.is_manager():
+                data = None
+                actual = sorted((i, x.dtype.str, x.tolist()) for (i, x) in
+                                [self.gcomm.collect()
+                                 for _ in xrange(1, self.size)])
+                expected = [(i, base.dtype.str, (base + i)[1::2, ::3].tolist())
+                            for i in xrange(1, self.size)]
+            else:
+                data = (base + self.rank)[1::2, ::3]
+                actual = self.gcomm.collect(data)
+                expected = None
+            self.gcomm.sync()
+            msg = test_info_msg(
+                self.rank, self.size, 'collect(view, {0})'.format(dtype),
+                data, actual, expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+
+    def testCollectListTree(self):
+        data = range(self.rank)
+        if self.size == 1:
+            self.assertRaises(RuntimeError, self.gcomm.collect, data,
+                              fanout=2)
+            return
+        actual = self.gcomm.collect(data, fanout=2)
+        if self.gcomm.is_manager():
+            expected = [(i, range(i)) for i in xrange(1, self.size)]
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'collect(list, k=2)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testMapList(self):
+        data = range(13) if self.gcomm.is_manager() else None
+        actual = self.gcomm.map(lambda x: x * x, data)
+        if self.gcomm.is_manager():
+            expected = [x * x for x in data]
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'map(list)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testMapDict(self):
+        if self.gcomm.is_manager():
+            data = dict(('k{0:02d}'.format(i), i) for i in xrange(20))
+        else:
+            data = None
+        pfuncs = [EqualStride(), EqualLength()]
+        actuals = [self.gcomm.map(lambda k: k, data, partition=pfunc)
+                   for pfunc in pfuncs]
+        if self.gcomm.is_manager():
+            expected = PartitionFunction._mapping_keys(data)
+        else:
+            expected = None
+        for actual in actuals:
+            msg = test_info_msg(self.rank, self.size, 'map(dict)', data,
+                                actual, expected)
+            print msg
+            self.assertEqual(actual, expected, msg)
+
+    def testMapWeightedInvolved(self):
+        if self.gcomm.is_manager():
+            data = [(str(x), (x % 4) + 1) for x in xrange(11)]
+        else:
+            data = None
+        actual = self.gcomm.map(lambda x: x + '!', data,
+                                partition=WeightBalanced(), involved=True)
+        if self.gcomm.is_manager():
+            expected = [x + '!' for (x, _) in data]
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'map(pairs, T)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testMapUnorderedTree(self):
+        data = range(17) if self.gcomm.is_manager() else None
+        actual = self.gcomm.map(lambda x: -x, data, partition=EqualLength(),
+                                ordered=False, fanout=2)
+        if self.gcomm.is_manager():
+            actual = sorted(actual)
+            expected = sorted(-x for x in data)
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'map(list, F, k=2)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testSpeculate(self):
+        data = range(3 * self.size) if self.gcomm.is_manager() else None
+        actual = self.gcomm.speculate(lambda x: x * x, data)
+        if self.gcomm.is_manager():
+            expected = [x * x for x in data]
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'speculate(list)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testSpeculateStraggler(self):
+        rank = self.rank
+        slow = [True]
+
+        def func(x):
+            if rank == 1 and slow[0]:
+                slow[0] = False
+                sleep(1.0)
+            else:
+                sleep(0.01)
+            return x + 1
+
+        data = range(2 * self.size) if self.gcomm.is_manager() else None
+        actual = self.gcomm.speculate(func, data, percentile=50.0)
+        self.gcomm.sync()
+        if self.gcomm.is_manager():
+            expected = [x + 1 for x in data]
+        else:
+            expected = None
+        msg = test_info_msg(
+            self.rank, self.size, 'speculate(straggler)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testSteal(self):
+        rank = self.rank
+
+        def func(x):
+            if rank == 1:
+                sleep(0.05)
+            return 2 * x
+
+        data = range(10 * self.size) if self.gcomm.is_manager() else None
+        local = self.gcomm.steal(func, data, partition=EqualLength(),
+                                 involved=True)
+        actual = sorted(sum(MPI_COMM_WORLD.allgather(local), []))
+        expected = [(x, 2 * x) for x in xrange(10 * self.size)]
+        msg = test_info_msg(
+            self.rank, self.size, 'steal(list)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testStealUninvolved(self):
+        data = range(7) if self.gcomm.is_manager() else None
+        local = self.gcomm.steal(lambda x: -x, data)
+        if self.gcomm.is_manager():
+            self.assertEqual(local, [], 'Uninvolved manager did some work')
+        actual = sorted(sum(MPI_COMM_WORLD.allgather(local), []))
+        expected = [] if self.size == 1 else [(x, -x) for x in xrange(7)]
+        msg = test_info_msg(
+            self.rank, self.size, 'steal(list, F)', data, actual, expected)
+        print msg
+        self.assertEqual(actual, expected, msg)
+
+    def testCalibrate(self):
+        actual = self.gcomm.calibrate(repeat=2)
+        parts = MPI_COMM_WORLD.allgather(actual)
+        msg = test_info_msg(self.rank, self.size, 'calibrate()', None,
+                            actual, None)
+        print msg
+        self.assertEqual(len(actual), self.size, msg)
+        self.assertTrue(all(c > 0 for c in actual), msg)
+        self.assertAlmostEqual(sum(actual), self.size, msg=msg)
+        self.assertTrue(all(p == actual for p in parts), msg)
+
+        data = [(i, 1) for i in xrange(10 * self.size)] \
+            if self.gcomm.is_manager() else None
+        part = self.gcomm.partition(
+            data, func=WeightBalanced(capacities=actual), involved=True)
+        self.assertEqual(len(part),
+                         len(WeightBalanced(capacities=actual)(
+                             [(i, 1) for i in xrange(10 * self.size)],
+                             self.rank, self.size)), msg)
+
+    def testRebalance(self):
+        n = 10 * self.size
+        data = [('t%d' % i, 1) for i in xrange(n)] \
+            if self.gcomm.is_manager() else []
+        actual = self.gcomm.rebalance(data)
+        parts = MPI_COMM_WORLD.allgather(actual)
+        msg = test_info_msg(self.rank, self.size, 'rebalance(pairs)', data,
+                            actual, None)
+        print msg
+        self.assertEqual(len(actual), 10, msg)
+        self.assertEqual(sorted(sum(parts, [])), sorted(
+            ('t%d' % i, 1) for i in xrange(n)), msg)
+
+        data = range(self.rank * 3)
+        actual = self.gcomm.rebalance(data)
+        parts = MPI_COMM_WORLD.allgather(actual)
+        expected = Rebalance().plan(
+            [range(r * 3) for r in xrange(self.size)], self.size)
+        msg = test_info_msg(self.rank, self.size, 'rebalance(list)', data,
+                            actual, expected[self.rank])
+        print msg
+        self.assertEqual(parts, expected, msg)
+
+    def testSortArray(self):
+        data = np.arange(200 * self.size)[self.rank::self.size][::-1]
+        actual = self.gcomm.sort(data)
+        parts = MPI_COMM_WORLD.allgather(actual)
+        msg = test_info_msg(self.rank, self.size, 'sort(array)', data,
+                            [len(p) for p in parts], 200 * self.size)
+        print msg
+        np.testing.assert_array_equal(np.concatenate(parts),
+                                      np.arange(200 * self.size), msg)
+        self.assertTrue(len(actual) < 2 * 200, msg)
+
+    def testSortList(self):
+        data = ['x%03d' % i for i in xrange(self.rank, 100, self.size)]
+        actual = self.gcomm.sort(data, key=lambda x: -int(x[1:]))
+        parts = MPI_COMM_WORLD.allgather(actual)
+        expected = ['x%03d' % i for i in xrange(99, -1, -1)]
+        msg = test_info_msg(self.rank, self.size, 'sort(list)', data, actual,
+                            None)
+        print msg
+        self.assertEqual(sum(parts, []), expected, msg)
+
     def testRationInt(self):
         if self.gcomm.is_manager():
             data = range(1, self.size)
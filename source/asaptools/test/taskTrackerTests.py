@@ -0,0 +1,71 @@
+"""
+Unit tests (serial only) for the TaskTracker class
+
+_______________________________________________________________________________
+Created on Oct 18, 2026
+"""
+import unittest
+
+from asaptools.simplecomm import TaskTracker
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TaskTrackerTests(unittest.TestCase):
+
+    """
+    Tests for the TaskTracker class
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = TaskTracker(percentile=50.0, factor=2.0,
+                                   time=self.clock)
+
+    def test_bad_percentile(self):
+        self.assertRaises(ValueError, TaskTracker, percentile=101)
+
+    def test_first_result_wins(self):
+        self.tracker.dispatch('a', 1)
+        self.tracker.dispatch('a', 2)
+        self.assertTrue(self.tracker.complete('a', 2),
+                        'First copy of task not kept')
+        self.assertFalse(self.tracker.complete('a', 1),
+                         'Duplicate copy of task not discarded')
+        self.assertEqual(self.tracker.num_complete(), 1,
+                         'Wrong number of completed tasks')
+
+    def test_no_deadline_without_samples(self):
+        self.tracker.dispatch(0, 1)
+        self.clock.now = 100.0
+        self.assertEqual(self.tracker.deadline(), None,
+                         'Deadline computed without completed tasks')
+        self.assertEqual(self.tracker.overdue(), [],
+                         'Task overdue without completed tasks')
+
+    def test_overdue(self):
+        for task in xrange(3):
+            self.tracker.dispatch(task, task + 1)
+        self.clock.now = 1.0
+        self.tracker.complete(0, 1)
+        self.clock.now = 2.0
+        self.tracker.complete(1, 2)
+        self.assertEqual(self.tracker.deadline(), 4.0,
+                         'Deadline incorrect')
+        self.clock.now = 4.5
+        self.assertEqual(self.tracker.overdue(), [2],
+                         'Overdue task not found')
+        self.tracker.dispatch(2, 1)
+        self.assertEqual(self.tracker.overdue(), [],
+                         'Task with enough copies reported overdue')
+
+
+if __name__ == "__main__":
+    unittest.main()